@@ -9,9 +9,13 @@ Creates a backup at graph.json.pre-financial-clean before modifying.
 """
 import json
 import shutil
+import sys
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from kg_financial_profile import fiscal_year_template
+
 GRAPH_PATH = Path("/Users/thomasjones/hc-cdaio-kg/graph.json")
 BACKUP_PATH = GRAPH_PATH.with_suffix(".pre-financial-clean")
 
@@ -80,88 +84,7 @@ UNIVERSAL_BAGGAGE = {
 
 def new_fiscal_year_template():
     """Return the universal fiscal year entry with all nulls."""
-    return {
-        "period_type": None,
-        "recurring_revenue": None,
-        "non_recurring_revenue": None,
-        "cost_of_revenue": None,
-        "operating_expense": None,
-        "capex": None,
-        "depreciation_amortization": None,
-        "headcount_cost": None,
-        "budget": None,
-        "spend_to_date": None,
-        "run_rate": None,
-        "run_rate_basis": None,
-        "intercompany_adjustment": None,
-        "fully_loaded_cost": None,
-        "fte_count": None,
-        "contractor_count": None,
-        "contract_value": None,
-        "debt_obligations": None,
-        "deferred_revenue": None,
-        "dso_days": None,
-        "dpo_days": None,
-        "forecast_revenue": None,
-        "forecast_cost": None,
-        "confidence_tier": "T4",
-        "confidence_rationale": "",
-        "allocation_method": "",
-        "fully_loaded_cost_method": None,
-        "consolidation_method": None,
-        "consolidation_scope": None,
-        "derived_confidence_tier": None,
-        "balance_sheet": {
-            "cash": None,
-            "accounts_receivable": None,
-            "ar_aging_0_30": None,
-            "ar_aging_31_60": None,
-            "ar_aging_61_90": None,
-            "ar_aging_90_plus": None,
-            "accounts_payable": None,
-            "inventory": None,
-            "fixed_assets": None,
-            "debt": None,
-            "equity": None,
-        },
-        "contract_detail": {
-            "start_date": None,
-            "end_date": None,
-            "contract_currency": None,
-            "contract_type": None,
-            "payment_schedule": None,
-            "auto_renewal": None,
-            "renewal_probability_pct": None,
-        },
-        "unit_economics": {
-            "units": None,
-            "revenue_per_unit": None,
-            "cost_per_unit": None,
-            "cac": None,
-            "ltv": None,
-            "monthly_churn_rate": None,
-            "nrr_pct": None,
-        },
-        "allocation_detail": {
-            "basis": None,
-            "parent_entity_id": None,
-            "allocation_pct": None,
-            "allocation_rationale": None,
-        },
-        "cost_of_revenue_detail": {
-            "hardware": None,
-            "cloud_infrastructure": None,
-            "support_labor": None,
-            "third_party_licenses": None,
-            "other": None,
-        },
-        "compliance_costs": {
-            "tax_provision": None,
-            "regulatory_cost": None,
-            "audit_cost": None,
-            "compliance_cost": None,
-        },
-    }
+    return fiscal_year_template()
 
 def new_financial_profile():
     """Return the universal financial_profile with FY2024 and FY2023."""
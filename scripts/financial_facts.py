@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+financial_facts.py — Query financial_profile values as one fact table.
+
+Refreshes the local fact store (.kg_financial_facts.sqlite, see
+lib/kg_financial_facts.py) from entities/*.json — only type files that
+changed since the last run are re-read — then prints the metric inventory,
+or aggregates for one metric.
+
+Usage:
+    python3 scripts/financial_facts.py                                  # metric inventory
+    python3 scripts/financial_facts.py --metric budget --fiscal-year FY2024
+    python3 scripts/financial_facts.py --metric headcount_cost --by confidence_tier --type department
+    python3 scripts/financial_facts.py --rebuild                        # drop the store first
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from kg_financial_facts import GROUP_COLUMNS, FinancialFactStore
+
+
+def _money(value: float) -> str:
+    return f"{value:,.0f}" if abs(value) >= 1000 else f"{value:,.2f}"
+
+
+def main():
+    repo_root = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description="Financial fact table over financial_profile values")
+    parser.add_argument("--data-dir", type=Path, default=repo_root,
+                        help="Directory containing entities/*.json (default: repo root)")
+    parser.add_argument("--store", type=Path, default=repo_root / ".kg_financial_facts.sqlite",
+                        help="Fact store (default: .kg_financial_facts.sqlite)")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the store and extract every file")
+    parser.add_argument("--metric", help="Aggregate this metric (dotted for sub-objects, e.g. balance_sheet.cash)")
+    parser.add_argument("--fiscal-year", help="Only this fiscal year (e.g. FY2024)")
+    parser.add_argument("--type", dest="entity_type", help="Only entities of this entity_type")
+    parser.add_argument("--by", choices=GROUP_COLUMNS, default="entity_type",
+                        help="Group --metric by this column (default: entity_type)")
+    args = parser.parse_args()
+
+    if not (args.data_dir / "entities").is_dir():
+        print(f"ERROR: {args.data_dir / 'entities'} not found")
+        sys.exit(1)
+    if args.rebuild and args.store.exists():
+        args.store.unlink()
+
+    store = FinancialFactStore(args.store)
+    try:
+        started = time.perf_counter()
+        result = store.refresh(args.data_dir)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"→ {result['facts']} facts; refreshed {len(result['refreshed'])} of {result['files']} "
+              f"type files in {elapsed:.0f} ms")
+        for name in result["invalid"]:
+            print(f"  WARNING: {name} is not a JSON array of entities — no facts extracted")
+        if result["duplicates"]:
+            print(f"  WARNING: {len(result['duplicates'])} entity ids defined more than once — "
+                  f"only the last record counts: {', '.join(result['duplicates'][:5])}")
+
+        if args.metric:
+            rows = store.totals(args.metric, args.fiscal_year, args.entity_type, args.by)
+            label = " ".join(filter(None, [args.metric, args.fiscal_year, args.entity_type]))
+            print(f"\n  {label} by {args.by}")
+            for r in rows:
+                print(f"  {str(r[args.by]):<32} n={r['count']:<5} sum={_money(r['sum']):>18} "
+                      f"mean={_money(r['mean']):>16}  [{_money(r['min'])} .. {_money(r['max'])}]")
+            print(f"\n  {len(rows)} groups")
+        else:
+            metrics = store.metrics()
+            for m in metrics:
+                print(f"  {m['metric']:<40} {m['facts']:>6} facts  {m['entities']:>5} entities")
+            if not metrics:
+                print("  No numeric financial_profile values populated yet")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
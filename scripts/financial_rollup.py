@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+financial_rollup.py — Roll financial_profile metrics up the organizational hierarchy.
+
+Sums budget, operating_expense, headcount_cost and fte_count from systems,
+departments, initiatives and products up through organizational_unit and
+product_portfolio (see lib/kg_financial_rollup.py for the edges and the
+allocation rules), in one bottom-up pass over graph.json.
+
+Usage:
+    python3 scripts/financial_rollup.py                                  # top units and portfolios
+    python3 scripts/financial_rollup.py --metric budget --fiscal-year FY2023 --top 10
+    python3 scripts/financial_rollup.py --entity ou-001 --metric headcount_cost   # breakdown
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from kg_financial_rollup import ROLLUP_METRICS, FinancialRollup
+from kg_index import GraphIndex
+
+REPORT_TYPES = ("organizational_unit", "product_portfolio")
+
+
+def _fmt(value) -> str:
+    return "—" if value is None else f"{value:,.0f}"
+
+
+def main():
+    repo_root = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description="Financial rollups over the organizational hierarchy")
+    parser.add_argument("--graph", type=Path, default=repo_root / "graph.json",
+                        help="Path to graph.json (default: repo root)")
+    parser.add_argument("--metric", choices=ROLLUP_METRICS, action="append",
+                        help="Metric to report (repeatable; default: all)")
+    parser.add_argument("--fiscal-year", help="Fiscal year (default: the latest in the graph)")
+    parser.add_argument("--type", dest="entity_types", action="append",
+                        help=f"entity_type to list (repeatable; default: {', '.join(REPORT_TYPES)})")
+    parser.add_argument("--top", type=int, default=15, help="Entities listed per type (default: 15)")
+    parser.add_argument("--entity", help="Print the child breakdown of one entity instead")
+    args = parser.parse_args()
+
+    if not args.graph.exists():
+        print(f"ERROR: {args.graph} not found")
+        sys.exit(1)
+    with open(args.graph) as f:
+        graph = json.load(f)
+
+    started = time.perf_counter()
+    rollup = FinancialRollup(GraphIndex.from_graph(graph))
+    elapsed = (time.perf_counter() - started) * 1000
+    years = rollup.fiscal_years()
+    if not years:
+        print("No financial_profile fiscal years in the graph")
+        return
+    fiscal_year = args.fiscal_year or years[-1]
+    if fiscal_year not in years:
+        print(f"ERROR: {fiscal_year} not in graph (have: {', '.join(years)})")
+        sys.exit(1)
+    metrics = args.metric or list(ROLLUP_METRICS)
+
+    print(f"→ {len(rollup.edge_child)} hierarchy edges, {len(years)} fiscal years rolled up in {elapsed:.0f} ms")
+    if rollup.duplicates:
+        print(f"  WARNING: {len(rollup.duplicates)} entity ids defined more than once — "
+              f"only the last record counts: {', '.join(rollup.duplicates[:5])}")
+    for child, parent in rollup.cycles:
+        print(f"  WARNING: cycle — edge {child} -> {parent} ignored")
+
+    if args.entity:
+        if args.entity not in rollup.graph:
+            print(f"ERROR: {args.entity} not found")
+            sys.exit(1)
+        for metric in metrics:
+            b = rollup.breakdown(args.entity, fiscal_year, metric)
+            print(f"\n  {args.entity} {metric} {fiscal_year}: own {_fmt(b['own'])}, rolled {_fmt(b['rolled'])}")
+            for c in b["children"]:
+                print(f"    {c['entity_id']:<40} {c['weight']:>6.1%}  {_fmt(c['contribution']):>18}")
+        return
+
+    for etype in args.entity_types or REPORT_TYPES:
+        for metric in metrics:
+            rows = rollup.top(etype, fiscal_year, metric, args.top)
+            print(f"\n  {etype} — {metric} {fiscal_year}")
+            if not rows:
+                print("    no values reported yet")
+            for r in rows:
+                print(f"    {r['entity_id']:<12} {str(r['name'])[:40]:<40} own {_fmt(r['own']):>16}"
+                      f"  rolled {_fmt(r['rolled']):>18}  ({r['children']} children)")
+
+
+if __name__ == "__main__":
+    main()
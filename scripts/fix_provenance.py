@@ -1,112 +1,241 @@
 #!/usr/bin/env python3
+"""
+fix_provenance.py — Move inline provenance tags out of entity descriptions.
+
+Descriptions written during research carry tags such as
+"[CONFIRMED - 0.9]", "Source: docs.rackspace.com ..." and "DNS: ...".
+This backfill parses them into the entity's provenance block
+(confidence_level, primary_data_source, assessment_methodology) and
+strips them from the description.
+
+Works on the per-type files (entities/<type>.json), one file per task in a
+process pool. A single combined trigger regex skips descriptions that
+contain nothing to extract, the methodology keywords are matched in one
+scan, and only files with at least one changed entity are rewritten.
+
+Usage:
+    python3 scripts/fix_provenance.py --dry-run              # diff of what would change
+    python3 scripts/fix_provenance.py                        # rewrite changed type files
+    python3 scripts/fix_provenance.py --types vendor,system --jobs 4
+"""
+
+import argparse
+import copy
+import difflib
 import json
+import os
 import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+ASSESSED_BY = "Thomas Jones"
+ASSESSED_DATE = "2026-02-25"
+
+CONFIDENCE_TAG = re.compile(r'\[(CONFIRMED|INFERRED)\s*-\s*([\d.]+|[^\]]+)\]')
+NUMBER = re.compile(r'([\d.]+)')
+SOURCE = re.compile(r'Source:\s*([^.]+?)(?:\.|$)', re.IGNORECASE)
+CLEAN_TAG = re.compile(r'\[(CONFIRMED|INFERRED)[^\]]+\]')
+CLEAN_SOURCE = re.compile(r'Source:\s*[^.]+\.', re.IGNORECASE)
+CLEAN_DNS = re.compile(r'DNS:\s*[^.]+\.')
+WHITESPACE = re.compile(r'\s+')
+
+# Everything extract_provenance() can act on: a confidence tag, a source,
+# a DNS note, or whitespace the cleanup would normalize. Descriptions with
+# no hit are returned unchanged without running the individual patterns.
+TRIGGER = re.compile(r'\[(?:CONFIRMED|INFERRED)|(?i:source:)|DNS:|\s\s|[^\S ]|^\s|\s$')
+
+# Methodology keywords as one alternation; a single scan yields every method present
+METHODOLOGIES = (
+    ("dns", "DNS reconnaissance"),
+    ("docs", "Public documentation analysis"),
+    ("linkedin", "LinkedIn OSINT"),
+    ("github", "GitHub reconnaissance"),
+    ("sec", "SEC filings analysis"),
+)
+METHOD_SCANNER = re.compile(
+    r'(?P<dns>DNS:|(?i:dns records))'
+    r'|(?P<docs>(?i:docs\.rackspace\.com))'
+    r'|(?P<linkedin>(?i:linkedin))'
+    r'|(?P<github>(?i:github))'
+    r'|(?P<sec>(?i:10-K|10-Q|SEC filing))'
+)
+
 
 def extract_provenance(desc):
-    if not desc:
+    if not desc or not isinstance(desc, str) or not TRIGGER.search(desc):
         return None
-    
+
     result = {}
-    
+
     # Extract confidence
-    conf_match = re.search(r'\[(CONFIRMED|INFERRED)\s*-\s*([\d.]+|[^\]]+)\]', desc)
+    conf_match = CONFIDENCE_TAG.search(desc)
     if conf_match:
-        conf_value = conf_match.group(2)
-        num_match = re.search(r'([\d.]+)', conf_value)
+        num_match = NUMBER.search(conf_match.group(2))
         result['confidence'] = num_match.group(1) if num_match else '0.85'
-    
+
     # Extract sources
-    source_match = re.search(r'Source:\s*([^.]+?)(?:\.|$)', desc, re.IGNORECASE)
+    source_match = SOURCE.search(desc)
     if source_match:
         result['sources'] = source_match.group(1).strip()
-    
+
     # Detect methodology
-    methods = []
-    if re.search(r'DNS:', desc) or re.search(r'dns records', desc, re.I):
-        methods.append('DNS reconnaissance')
-    if re.search(r'docs\.rackspace\.com', desc, re.I):
-        methods.append('Public documentation analysis')
-    if re.search(r'linkedin', desc, re.I):
-        methods.append('LinkedIn OSINT')
-    if re.search(r'github', desc, re.I):
-        methods.append('GitHub reconnaissance')
-    if re.search(r'10-K|10-Q|SEC filing', desc, re.I):
-        methods.append('SEC filings analysis')
-    
+    found = {m.lastgroup for m in METHOD_SCANNER.finditer(desc)}
+    methods = [label for key, label in METHODOLOGIES if key in found]
     if methods:
         result['methodology'] = ', '.join(methods)
-    
+
     # Clean description
-    clean = desc
-    clean = re.sub(r'\[(CONFIRMED|INFERRED)[^\]]+\]', '', clean)
-    clean = re.sub(r'Source:\s*[^.]+\.', '', clean, flags=re.IGNORECASE)
-    clean = re.sub(r'DNS:\s*[^.]+\.', '', clean)
-    clean = re.sub(r'\s+', ' ', clean).strip()
+    clean = CLEAN_TAG.sub('', desc)
+    clean = CLEAN_SOURCE.sub('', clean)
+    clean = CLEAN_DNS.sub('', clean)
+    clean = WHITESPACE.sub(' ', clean).strip()
     result['clean_desc'] = clean
-    
+
     return result if (result.get('confidence') or result.get('sources') or clean != desc) else None
 
-# Load graph
-with open('/Users/thomasjones/hc-cdaio-kg/graph.json', 'r') as f:
-    graph = json.load(f)
-
-print(f"Loaded {len(graph['entities'])} entities")
-
-# Process all entities
-total_updated = 0
-for i, entity in enumerate(graph['entities']):
-    desc = entity.get('description', '')
-    parsed = extract_provenance(desc)
-    
-    if not parsed:
-        continue
-    
-    # Ensure provenance exists
+
+def empty_provenance() -> dict:
+    return {
+        'data_quality_score': {
+            'completeness_pct': None,
+            'accuracy_confidence': '',
+            'timeliness_score': '',
+            'consistency_score': ''
+        },
+        'primary_data_source': '',
+        'last_assessed_date': None,
+        'assessed_by': '',
+        'assessment_methodology': '',
+        'confidence_level': '',
+        'attestation_status': None,
+        'known_data_gaps': []
+    }
+
+
+def apply_provenance(entity: dict, parsed: dict, assessed_by: str, assessed_date: str) -> None:
+    """Write parsed tags into the entity's provenance and clean its description."""
     if 'provenance' not in entity:
-        entity['provenance'] = {
-            'data_quality_score': {
-                'completeness_pct': None,
-                'accuracy_confidence': '',
-                'timeliness_score': '',
-                'consistency_score': ''
-            },
-            'primary_data_source': '',
-            'last_assessed_date': None,
-            'assessed_by': '',
-            'assessment_methodology': '',
-            'confidence_level': '',
-            'attestation_status': None,
-            'known_data_gaps': []
-        }
-    
-    # Update description
+        entity['provenance'] = empty_provenance()
+    prov = entity['provenance']
+    quality = prov.setdefault('data_quality_score', {})
+
     entity['description'] = parsed['clean_desc']
-    
-    # Update provenance
+
     if parsed.get('confidence'):
-        entity['provenance']['confidence_level'] = parsed['confidence']
-        entity['provenance']['data_quality_score']['accuracy_confidence'] = parsed['confidence']
-    
+        prov['confidence_level'] = parsed['confidence']
+        quality['accuracy_confidence'] = parsed['confidence']
+
     if parsed.get('sources'):
-        entity['provenance']['primary_data_source'] = parsed['sources']
-    
+        prov['primary_data_source'] = parsed['sources']
+
     if parsed.get('methodology'):
-        entity['provenance']['assessment_methodology'] = parsed['methodology']
-    
-    entity['provenance']['last_assessed_date'] = '2026-02-25'
-    entity['provenance']['assessed_by'] = 'Thomas Jones'
-    entity['provenance']['data_quality_score']['timeliness_score'] = 'Current'
-    entity['provenance']['data_quality_score']['consistency_score'] = 'Verified'
-    
-    total_updated += 1
-    
-    if (i + 1) % 100 == 0:
-        print(f"Processed {i+1} entities...")
-
-print(f"\nTotal updated: {total_updated} entities")
-
-# Write back
-with open('/Users/thomasjones/hc-cdaio-kg/graph.json', 'w') as f:
-    json.dump(graph, f, indent=2)
-
-print("✅ Graph updated and saved")
+        prov['assessment_methodology'] = parsed['methodology']
+
+    prov['last_assessed_date'] = assessed_date
+    prov['assessed_by'] = assessed_by
+    quality['timeliness_score'] = 'Current'
+    quality['consistency_score'] = 'Verified'
+
+
+def _entity_diff(path: str, before: dict, after: dict) -> str:
+    label = f"{path}:{after.get('id', '?')}"
+    return "".join(difflib.unified_diff(
+        json.dumps(before, indent=2).splitlines(keepends=True),
+        json.dumps(after, indent=2).splitlines(keepends=True),
+        fromfile=label, tofile=label,
+    ))
+
+
+def process_type_file(task: Tuple[str, str, str, bool]) -> dict:
+    """Backfill one entities/<type>.json; rewrites it only if an entity changed."""
+    path, assessed_by, assessed_date, dry_run = task
+    text = Path(path).read_text()
+    records = json.loads(text)
+
+    changed = 0
+    diffs: List[str] = []
+    for entity in records:
+        if not isinstance(entity, dict):
+            continue
+        parsed = extract_provenance(entity.get('description', ''))
+        if not parsed:
+            continue
+        before = copy.deepcopy(entity)
+        apply_provenance(entity, parsed, assessed_by, assessed_date)
+        if entity != before:
+            changed += 1
+            if dry_run:
+                diffs.append(_entity_diff(path, before, entity))
+
+    if changed and not dry_run:
+        # Same layout as kg-split (indent=2), keeping the file's trailing newline or lack of one
+        out = json.dumps(records, indent=2) + ("\n" if text.endswith("\n") else "")
+        tmp = Path(f"{path}.{os.getpid()}.tmp")
+        tmp.write_text(out)
+        os.replace(tmp, path)
+
+    return {"path": path, "entities": len(records), "changed": changed, "diffs": diffs}
+
+
+def run_backfill(data_dir: Path, types: Optional[List[str]] = None, dry_run: bool = False,
+                 jobs: int = 1, assessed_by: str = ASSESSED_BY,
+                 assessed_date: str = ASSESSED_DATE) -> List[dict]:
+    """Process every (or the selected) entity type file; one result per file."""
+    files = sorted((data_dir / "entities").glob("*.json"))
+    if types:
+        files = [f for f in files if f.stem in types]
+    tasks = [(str(f), assessed_by, assessed_date, dry_run) for f in files]
+    if jobs <= 1 or len(tasks) <= 1:
+        return [process_type_file(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(process_type_file, tasks))
+
+
+def main():
+    repo_root = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description="Move inline provenance tags from descriptions into provenance")
+    parser.add_argument("--data-dir", type=Path, default=repo_root,
+                        help="Directory containing entities/*.json (default: repo root)")
+    parser.add_argument("--types", default="",
+                        help="Comma-separated entity types to process (default: all)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print a diff of each entity that would change; write nothing")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Process type files in N worker processes (default: 1, serial)")
+    parser.add_argument("--assessed-by", default=ASSESSED_BY,
+                        help=f"provenance.assessed_by for updated entities (default: {ASSESSED_BY})")
+    parser.add_argument("--assessed-date", default=ASSESSED_DATE,
+                        help=f"provenance.last_assessed_date for updated entities (default: {ASSESSED_DATE})")
+    args = parser.parse_args()
+
+    if not (args.data_dir / "entities").is_dir():
+        print(f"ERROR: {args.data_dir / 'entities'} not found")
+        sys.exit(1)
+
+    types = [t.strip() for t in args.types.split(",") if t.strip()]
+    started = time.perf_counter()
+    results = run_backfill(args.data_dir, types, args.dry_run, args.jobs,
+                           args.assessed_by, args.assessed_date)
+    elapsed = time.perf_counter() - started
+
+    for r in results:
+        for diff in r["diffs"]:
+            sys.stdout.write(diff)
+
+    scanned = sum(r["entities"] for r in results)
+    changed = [r for r in results if r["changed"]]
+    verb = "would update" if args.dry_run else "updated"
+    print(f"\nScanned {scanned} entities in {len(results)} type files ({elapsed:.2f}s)")
+    for r in changed:
+        print(f"  {Path(r['path']).name:<32} {verb} {r['changed']} entities")
+    print(f"Total {verb}: {sum(r['changed'] for r in changed)} entities in {len(changed)} files")
+    if changed and not args.dry_run:
+        print("Rebuild graph.json: python3 scripts/lib/kg-build.py . graph.json")
+
+
+if __name__ == "__main__":
+    main()
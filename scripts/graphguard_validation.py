@@ -3,15 +3,31 @@
 GraphGuard — Graph Integrity and Consistency Validation
 hc-enterprise-kg quality module
 
-Validates the knowledge graph across 8 integrity dimensions:
+Validates the knowledge graph across 9 integrity dimensions:
   1. Referential Integrity   — no dangling relationship references
   2. Duplicate Detection     — fuzzy name matching within types
   3. Orphan Detection        — entities with zero relationships
-  4. Hierarchical Consistency — parent-child value propagation checks
+  4. Hierarchical Consistency — parent-child value propagation, transitive
+                                availability ceilings and dependency cycles
   5. Provenance Completeness — required provenance fields populated
   6. Temporal Coherence      — date field logical consistency
-  7. Schema Conformance      — entity_type field alignment
+  7. Schema Conformance      — entity_type alignment and relationship
+                                (source, type, target) pattern conformance
   8. Relational Density       — relationship count vs expected range
+  9. Embedded References     — id-valued entity fields vs relationship edges
+
+Usage:
+    python3 scripts/graphguard_validation.py [--graph graph.json] [--checks referential,orphans]
+    python3 scripts/graphguard_validation.py --list-checks
+    python3 scripts/graphguard_validation.py --checks embedded --emit-derived-edges derived.json
+
+    In-process:  run_graphguard(graph, checks=["referential", "orphans"]) -> report
+
+Checks are registered with @register_check and declare the shared indexes
+they read (@register_index: adjacency, type buckets, degrees, parsed
+dates, ...); each index is built at most once per run and
+only when a selected check needs it. Id, type, degree and adjacency
+lookups are views over one scripts/lib/kg_index.py GraphIndex.
 
 Outputs:
   - Per-check pass/fail with finding details
@@ -20,19 +36,24 @@ Outputs:
   - Remediation recommendations
 """
 
+import time
+_STARTED = time.perf_counter()
+
+import argparse
 import json
 import sys
+import uuid
 from pathlib import Path
-from datetime import datetime
-from collections import defaultdict
-from typing import Dict, List, Any, Tuple
+from datetime import datetime, timezone
+from collections import ChainMap, defaultdict
+from collections.abc import Mapping
+from typing import Callable, Dict, List, Any, Tuple
 
-try:
-    from rapidfuzz import fuzz
-except ImportError:
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "rapidfuzz", "--break-system-packages", "-q"])
-    from rapidfuzz import fuzz
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+import kg_similarity
+from kg_index import GraphIndex
+from kg_similarity import similar_pairs
+from kg_temporal import TemporalIndex
 
 ASSESSMENT_DATE = "2026-03-04"
 
@@ -66,32 +87,335 @@ EXPECTED_DENSITY = {
     "incident": (1, 3, 8),
 }
 
-# Valid relationship schemas (source_type -> relationship_type -> target_type)
-# Not exhaustive; used for spot-checking
+# Relationship schema: relationship_type -> allowed (source_type, target_type) pairs.
+# One entry per relationships/*.json file; compiled into an integer-coded
+# conformance table by compile_relationship_schema().
+RISK_AFFECTED_TYPES = (
+    "business_capability", "control", "customer", "data_asset", "department",
+    "initiative", "jurisdiction", "organizational_unit", "policy", "product",
+    "product_portfolio", "regulation", "role", "site", "system", "vendor",
+)
+
+RELATIONSHIP_SCHEMA = {
+    "addresses": {("control", "risk"), ("initiative", "risk")},
+    "affects": {("incident", "data_asset"), ("incident", "system")}
+               | {("risk", t) for t in RISK_AFFECTED_TYPES},
+    "applies_to": {("control", "system"), ("policy", "data_domain"), ("risk", "control"),
+                   ("risk", "organizational_unit"), ("risk", "regulation"), ("risk", "system")},
+    "belongs_to": {("product", "product_portfolio"), ("role", "department"), ("role", "organizational_unit")},
+    "buys": {("customer", "product")},
+    "connects_to": {("integration", "data_asset"), ("integration", "system")},
+    "contains": {("data_domain", "data_asset"), ("market_segment", "customer"),
+                 ("product_portfolio", "product")},
+    "contracts_with": {("contract", "vendor"), ("vendor", "department")},
+    "creates_risk": {("vendor", "risk")},
+    "delivers": {("system", "product")},
+    "depends_on": {("business_capability", "system"), ("integration", "network"),
+                   ("integration", "system"), ("system", "system")},
+    "drives": {("initiative", "business_capability"), ("initiative", "control"), ("initiative", "product")},
+    "enables": {("product", "business_capability")},
+    "enforces": {("control", "policy")},
+    "funded_by": {("initiative", "organizational_unit")},
+    "governed_by": {("organizational_unit", "policy"), ("policy", "regulation")},
+    "governs": {("contract", "customer"), ("contract", "data_asset"), ("contract", "system"),
+                ("data_domain", "system"), ("policy", "control"), ("policy", "data_asset"),
+                ("policy", "organizational_unit"), ("policy", "system")},
+    "has_role": {("person", "role")},
+    "holds": {("customer", "contract")},
+    "hosted_on": {("data_asset", "system"), ("system", "site"), ("system", "system")},
+    "hosts": {("site", "system")},
+    "impacted_by": {("business_capability", "risk"), ("product", "risk"),
+                    ("system", "incident"), ("system", "risk")},
+    "impacts": {("incident", "system"), ("initiative", "business_capability"), ("initiative", "risk")},
+    "implements": {("policy", "regulation"), ("product", "product_portfolio"),
+                   ("product_portfolio", "product_portfolio")},
+    "integrates_with": {("system", "system")},
+    "located_at": {("data_asset", "site"), ("network", "site"), ("organizational_unit", "site"),
+                   ("site", "location"), ("system", "site")},
+    "located_in": {("contract", "geography"), ("customer", "geography"), ("data_asset", "system"),
+                   ("department", "geography"), ("department", "organizational_unit"),
+                   ("geography", "geography"), ("location", "geography"), ("network", "geography"),
+                   ("network", "network"), ("network", "system"), ("organizational_unit", "geography"),
+                   ("organizational_unit", "organizational_unit"), ("role", "department"),
+                   ("site", "geography")},
+    "managed_by": {("data_asset", "department"), ("data_asset", "person"), ("data_domain", "department"),
+                   ("department", "person"), ("system", "department"), ("system", "person")},
+    "mitigates": {("control", "risk"), ("control", "system"), ("risk", "control")},
+    "processes": {("vendor", "data_asset")},
+    "provides_service": {("system", "organizational_unit"), ("vendor", "department")},
+    "regulates": {("jurisdiction", "geography")},
+    "reports_to": {("person", "person")},
+    "serves": {("organizational_unit", "market_segment"), ("product", "customer"),
+               ("product", "market_segment"), ("product_portfolio", "customer"),
+               ("product_portfolio", "market_segment"), ("system", "customer")},
+    "staffed_by": {("organizational_unit", "person")},
+    "stores": {("system", "data_asset")},
+    "subject_of": {("customer", "data_asset")},
+    "subject_to": {("business_capability", "regulation"), ("contract", "jurisdiction"),
+                   ("contract", "regulation"), ("customer", "regulation"), ("data_asset", "data_domain"),
+                   ("data_asset", "regulation"), ("data_domain", "jurisdiction"), ("data_domain", "policy"),
+                   ("data_domain", "regulation"), ("jurisdiction", "jurisdiction"),
+                   ("location", "jurisdiction"), ("market_segment", "regulation"),
+                   ("network", "jurisdiction"), ("network", "regulation"),
+                   ("organizational_unit", "jurisdiction"), ("organizational_unit", "regulation"),
+                   ("product", "regulation"), ("product_portfolio", "regulation"),
+                   ("regulation", "jurisdiction"), ("site", "jurisdiction")},
+    "supplied_by": {("system", "vendor")},
+    "supplies": {("vendor", "product_portfolio"), ("vendor", "system")},
+    "supports": {("business_capability", "department"), ("business_capability", "organizational_unit"),
+                 ("initiative", "business_capability"), ("policy", "policy"),
+                 ("product_portfolio", "business_capability"), ("product_portfolio", "organizational_unit"),
+                 ("system", "business_capability"), ("vendor", "product_portfolio")},
+    "works_in": {("person", "department")},
+}
+
+# Flattened (source_type, relationship_type, target_type) triples
 VALID_PATTERNS = {
-    ("system", "depends_on", "system"),
-    ("system", "hosted_on", "system"),
-    ("system", "hosted_on", "site"),
-    ("system", "stores", "data_asset"),
-    ("system", "integrates_with", "system"),
-    ("data_asset", "hosted_on", "system"),
-    ("person", "has_role", "role"),
-    ("person", "works_in", "department"),
-    ("person", "reports_to", "person"),
-    ("vendor", "supplies", "system"),
-    ("vendor", "contracts_with", "department"),
-    ("risk", "mitigates", "control"),
-    ("control", "mitigates", "risk"),
-    ("control", "enforces", "policy"),
-    ("policy", "applies_to", "data_domain"),
-    ("policy", "governs", "data_asset"),
-    ("regulation", "subject_to", "jurisdiction"),
-    ("department", "managed_by", "person"),
-    ("department", "located_in", "geography"),
-    ("role", "belongs_to", "department"),
+    (src, rtype, tgt)
+    for rtype, pairs in RELATIONSHIP_SCHEMA.items()
+    for src, tgt in pairs
 }
 
 
+class CompiledSchema:
+    """Integer-coded (source_type, relationship_type, target_type) conformance table.
+
+    Entity and relationship types are mapped to dense codes (0 = unknown) and
+    the triple (s, r, t) to the flat cell (s * R + r) * T + t. Conformance
+    and the full triple histogram then cost one scan over an int column.
+    """
+    def __init__(self, entity_types, schema: Dict[str, set]):
+        self.entity_types = ["<unknown>"] + sorted(entity_types)
+        self.rel_types = ["<unknown>"] + sorted(schema)
+        self.type_code = {t: i for i, t in enumerate(self.entity_types)}
+        self.rel_code = {r: i for i, r in enumerate(self.rel_types)}
+        self.n_types = len(self.entity_types)
+        self.n_rels = len(self.rel_types)
+        self.allowed = bytearray(self.n_types * self.n_rels * self.n_types)
+        for rtype, pairs in schema.items():
+            for src, tgt in pairs:
+                self.allowed[self.cell(self.type_code[src], self.rel_code[rtype], self.type_code[tgt])] = 1
+
+    def cell(self, s: int, r: int, t: int) -> int:
+        return (s * self.n_rels + r) * self.n_types + t
+
+    def triple(self, cell: int) -> Tuple[str, str, str]:
+        rest, t = divmod(cell, self.n_types)
+        s, r = divmod(rest, self.n_rels)
+        return self.entity_types[s], self.rel_types[r], self.entity_types[t]
+
+    def histogram(self, codes) -> List[int]:
+        """Count relationships per (s, r, t) cell from (s, r, t) code tuples."""
+        counts = [0] * len(self.allowed)
+        n_rels, n_types = self.n_rels, self.n_types
+        for s, r, t in codes:
+            counts[(s * n_rels + r) * n_types + t] += 1
+        return counts
+
+
+def compile_relationship_schema(schema: Dict[str, set] = None) -> CompiledSchema:
+    schema = RELATIONSHIP_SCHEMA if schema is None else schema
+    entity_types = set(EXPECTED_DENSITY)
+    for pairs in schema.values():
+        for src, tgt in pairs:
+            entity_types.update((src, tgt))
+    return CompiledSchema(entity_types, schema)
+
+# Relationship types whose target must be up for the source to be up.
+# Used for transitive availability ceilings and dependency cycle detection.
+AVAILABILITY_DEPENDENCY_TYPES = {"depends_on", "hosted_on"}
+
+
+class EmbeddedRefSpec:
+    """An id-valued entity field that mirrors a relationship.
+
+    The derived edge is (entity -[relationship_type]-> referenced id), or the
+    reverse when reverse=True. Any relationship of a type in `accepts`
+    between the same two entities, in either direction, counts as a match.
+    """
+    def __init__(self, entity_type: str, field: str, relationship_type: str,
+                 accepts: Tuple[str, ...] = (), reverse: bool = False, many: bool = False):
+        self.entity_type = entity_type
+        self.field = field
+        self.relationship_type = relationship_type
+        self.accepts = frozenset((relationship_type,) + tuple(accepts))
+        self.reverse = reverse
+        self.many = many
+
+    @property
+    def label(self) -> str:
+        return f"{self.entity_type}.{self.field}"
+
+
+EMBEDDED_REFERENCES = [
+    EmbeddedRefSpec("data_asset", "system_id", "stores", accepts=("located_in", "hosted_on"), reverse=True),
+    EmbeddedRefSpec("data_asset", "owner_id", "managed_by"),
+    EmbeddedRefSpec("system", "vendor_id", "supplied_by", accepts=("supplies",)),
+    EmbeddedRefSpec("system", "owner_id", "managed_by"),
+    EmbeddedRefSpec("system", "department_id", "managed_by"),
+    EmbeddedRefSpec("incident", "affected_system_ids", "affects", accepts=("impacts", "impacted_by"), many=True),
+    EmbeddedRefSpec("contract", "covers_systems", "governs", many=True),
+    EmbeddedRefSpec("contract", "vendor_id", "contracts_with"),
+    EmbeddedRefSpec("person", "holds_roles", "has_role", many=True),
+    EmbeddedRefSpec("person", "current_roles", "has_role", many=True),
+]
+
+
+def _embedded_ids(value: Any) -> List[str]:
+    """Ids from a scalar, list of ids, or list of {"id"/"*_id": ...} objects."""
+    if not value:
+        return []
+    items = value if isinstance(value, list) else [value]
+    ids = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get("id") or next((v for k, v in item.items() if k.endswith("_id") and v), None)
+        if isinstance(item, str) and item.strip():
+            ids.append(item.strip())
+    return ids
+
+
+class EmbeddedRefIndex:
+    """Embedded foreign keys materialized as edges and joined against relationships.
+
+    One pass over entities extracts every embedded reference; one pass over
+    relationships builds a hash index keyed by the unordered endpoint pair.
+    Each reference is then resolved with a single dict lookup into one of:
+    matched, missing (no edge), dangling (id not in graph) or contradiction
+    (single-valued field disagrees with the edges that do exist).
+    """
+    def __init__(self, entities: List[dict], relationships: List[dict], entity_map: Mapping,
+                 specs: List[EmbeddedRefSpec] = None):
+        specs_by_type = defaultdict(list)
+        for spec in (EMBEDDED_REFERENCES if specs is None else specs):
+            specs_by_type[spec.entity_type].append(spec)
+
+        pair_types = defaultdict(set)
+        neighbours = defaultdict(set)  # (entity id, relationship_type) -> ids on the other end
+        for rel in relationships:
+            sid, tid, rtype = rel.get("source_id"), rel.get("target_id"), rel.get("relationship_type")
+            if not isinstance(sid, str) or not isinstance(tid, str):
+                continue
+            pair_types[(sid, tid) if sid <= tid else (tid, sid)].add(rtype)
+            neighbours[(sid, rtype)].add(tid)
+            neighbours[(tid, rtype)].add(sid)
+
+        self.matched: List[tuple] = []
+        self.missing: List[tuple] = []
+        self.dangling: List[tuple] = []
+        self.contradictions: List[tuple] = []
+
+        for e in entities:
+            for spec in specs_by_type.get(e.get("entity_type"), ()):
+                eid = e["id"]
+                for ref in _embedded_ids(e.get(spec.field)):
+                    row = (spec, eid, ref)
+                    if ref not in entity_map:
+                        self.dangling.append(row)
+                        continue
+                    key = (eid, ref) if eid <= ref else (ref, eid)
+                    if pair_types.get(key, set()) & spec.accepts:
+                        self.matched.append(row)
+                        continue
+                    if not spec.many:
+                        ref_type = entity_map[ref].get("entity_type")
+                        others = [
+                            other for rtype in spec.accepts for other in neighbours.get((eid, rtype), ())
+                            if other in entity_map and entity_map[other].get("entity_type") == ref_type
+                        ]
+                        if others:
+                            self.contradictions.append(row + (sorted(set(others)),))
+                            continue
+                    self.missing.append(row)
+
+    def derived_edges(self, created_at: str) -> List[dict]:
+        """Relationship records for embedded references that have no matching edge."""
+        edges = []
+        seen = set()
+        for spec, eid, ref in self.missing:
+            sid, tid = (ref, eid) if spec.reverse else (eid, ref)
+            key = (sid, tid, spec.relationship_type)
+            if key in seen:
+                continue
+            seen.add(key)
+            edges.append({
+                "created_at": created_at,
+                "updated_at": created_at,
+                "valid_from": None,
+                "valid_until": None,
+                "version": 1,
+                "id": str(uuid.uuid5(uuid.NAMESPACE_URL, "hc-cdaio-kg/derived/" + "/".join(key))),
+                "relationship_type": spec.relationship_type,
+                "source_id": sid,
+                "target_id": tid,
+                "weight": 1.0,
+                "confidence": 0.7,
+                "properties": {"derived_from": spec.label},
+            })
+        return edges
+
+
+def condense_scc(nodes: List[str], successors: Dict[str, List[str]]) -> Tuple[Dict[str, int], List[List[str]]]:
+    """Condense a directed graph into its strongly connected components.
+
+    Iterative Tarjan, O(V + E). Returns (component_of, components) where
+    components are emitted in reverse topological order: every component
+    appears after all components reachable from it, so a single forward
+    sweep over the list visits dependencies before their dependents.
+    """
+    index_of: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack = set()
+    stack: List[str] = []
+    component_of: Dict[str, int] = {}
+    components: List[List[str]] = []
+    counter = 0
+
+    for root in nodes:
+        if root in index_of:
+            continue
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors.get(root, ())))]
+
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index_of:
+                    index_of[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[child])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component_of[member] = len(components)
+                    members.append(member)
+                    if member == node:
+                        break
+                members.reverse()
+                components.append(members)
+
+    return component_of, components
+
+
 class Finding:
     """A single GraphGuard finding."""
     def __init__(self, check: str, severity: str, message: str, entity_ids: list = None, recommendation: str = ""):
@@ -111,22 +435,109 @@ class Finding:
         }
 
 
+class CheckSpec:
+    """A registered GraphGuard check and the precomputed indexes it reads."""
+    def __init__(self, name: str, method: Callable, requires: Tuple[str, ...], description: str):
+        self.name = name
+        self.method = method
+        self.requires = requires
+        self.description = description
+
+
+# Registries populated by @register_index / @register_check below.
+# Check order is registration order, which is the report order.
+INDEX_BUILDERS: Dict[str, Callable[["GraphGuard"], Any]] = {}
+CHECK_REGISTRY: Dict[str, CheckSpec] = {}
+
+
+def register_index(name: str):
+    """Register a builder for a shared index, built at most once per GraphGuard."""
+    def decorator(fn):
+        INDEX_BUILDERS[name] = fn
+        return fn
+    return decorator
+
+
+def register_check(name: str, requires: Tuple[str, ...] = (), description: str = ""):
+    """Register a GraphGuard method as a selectable check."""
+    def decorator(fn):
+        unknown = set(requires) - set(INDEX_BUILDERS)
+        if unknown:
+            raise ValueError(f"Check '{name}' requires unregistered indexes: {sorted(unknown)}")
+        CHECK_REGISTRY[name] = CheckSpec(name, fn, tuple(requires), description)
+        return fn
+    return decorator
+
+
+@register_index("graph")
+def _build_graph_index(guard: "GraphGuard") -> GraphIndex:
+    return GraphIndex(guard.entities, guard.relationships)
+
+
+# Views over the shared GraphIndex, kept as named indexes so checks declare
+# what they read
+
+@register_index("entity_map")
+def _build_entity_map(guard: "GraphGuard") -> Mapping:
+    graph = guard.index("graph")
+    # GraphGuard resolves a duplicated id to its last record (GraphIndex: first)
+    last = {eid: graph.entities[rows[-1]] for eid, rows in graph.duplicates.items()}
+    return ChainMap(last, graph.entity_map) if last else graph.entity_map
+
+
+@register_index("adjacency")
+def _build_adjacency(guard: "GraphGuard") -> Tuple[Mapping, Mapping]:
+    graph = guard.index("graph")
+    return graph.outgoing, graph.incoming
+
+
+@register_index("type_buckets")
+def _build_type_buckets(guard: "GraphGuard") -> Dict[str, List[dict]]:
+    return guard.index("graph").type_buckets()
+
+
+@register_index("degree")
+def _build_degree(guard: "GraphGuard") -> Mapping:
+    return guard.index("graph").degree_map
+
+
+@register_index("temporal")
+def _build_temporal(guard: "GraphGuard") -> TemporalIndex:
+    return TemporalIndex.from_entities(guard.entities)
+
+
+@register_index("embedded_refs")
+def _build_embedded_refs(guard: "GraphGuard") -> EmbeddedRefIndex:
+    return EmbeddedRefIndex(guard.entities, guard.relationships, guard.entity_map)
+
+
 class GraphGuard:
     def __init__(self, graph: dict):
         self.entities = graph.get("entities", [])
         self.relationships = graph.get("relationships", [])
-        self.entity_map = {e["id"]: e for e in self.entities}
         self.findings: List[Finding] = []
+        self.pattern_histogram: Dict[Tuple[str, str, str], int] = {}
+        self._indexes: Dict[str, Any] = {}
 
-        # Build adjacency
-        self.outgoing = defaultdict(list)
-        self.incoming = defaultdict(list)
-        for rel in self.relationships:
-            sid = rel.get("source_id")
-            tid = rel.get("target_id")
-            self.outgoing[sid].append(rel)
-            self.incoming[tid].append(rel)
+    def index(self, name: str) -> Any:
+        """Return a shared index, building it on first use."""
+        if name not in self._indexes:
+            self._indexes[name] = INDEX_BUILDERS[name](self)
+        return self._indexes[name]
+
+    @property
+    def entity_map(self) -> Mapping:
+        return self.index("entity_map")
+
+    @property
+    def outgoing(self) -> Mapping:
+        return self.index("adjacency")[0]
+
+    @property
+    def incoming(self) -> Mapping:
+        return self.index("adjacency")[1]
 
+    @register_check("referential", requires=("entity_map",), description="No dangling relationship references")
     def check_referential_integrity(self):
         """Check 1: No dangling references in relationships."""
         entity_ids = set(self.entity_map.keys())
@@ -159,28 +570,21 @@ class GraphGuard:
                 f"All {len(self.relationships)} relationships have valid source and target entities"
             ))
 
+    @register_check("duplicates", requires=("type_buckets",), description="Fuzzy name matching within types")
     def check_duplicates(self, threshold: float = 0.85):
         """Check 2: Fuzzy duplicate detection within entity types."""
-        by_type = defaultdict(list)
-        for e in self.entities:
-            by_type[e.get("entity_type", "unknown")].append(e)
+        by_type = self.index("type_buckets")
 
         duplicates = []
         for etype, elist in by_type.items():
-            for i, e1 in enumerate(elist):
-                for e2 in elist[i + 1:]:
-                    n1 = e1.get("name", "")
-                    n2 = e2.get("name", "")
-                    if not n1 or not n2:
-                        continue
-                    sim = fuzz.ratio(n1.lower(), n2.lower()) / 100.0
-                    if sim >= threshold:
-                        duplicates.append({
-                            "id1": e1["id"], "name1": n1,
-                            "id2": e2["id"], "name2": n2,
-                            "similarity": round(sim, 3),
-                            "type": etype,
-                        })
+            names = [e.get("name", "") for e in elist]
+            for i, j, sim in similar_pairs(names, threshold):
+                duplicates.append({
+                    "id1": elist[i]["id"], "name1": names[i],
+                    "id2": elist[j]["id"], "name2": names[j],
+                    "similarity": round(sim, 3),
+                    "type": etype,
+                })
 
         if duplicates:
             severity = "HIGH" if len(duplicates) > 5 else "MEDIUM"
@@ -201,16 +605,14 @@ class GraphGuard:
                 "No duplicates detected above threshold"
             ))
 
+    @register_check("orphans", requires=("degree",), description="Entities with zero relationships")
     def check_orphans(self):
         """Check 3: Entities with zero relationships."""
-        connected = set()
-        for rel in self.relationships:
-            connected.add(rel.get("source_id"))
-            connected.add(rel.get("target_id"))
+        degree = self.index("degree")
 
         orphans = []
         for e in self.entities:
-            if e["id"] not in connected:
+            if not degree.get(e["id"]):
                 orphans.append({"id": e["id"], "type": e.get("entity_type"), "name": e.get("name", "")[:50]})
 
         if orphans:
@@ -235,10 +637,13 @@ class GraphGuard:
                 "All entities have at least one relationship"
             ))
 
+    @register_check("hierarchy", requires=("entity_map", "adjacency"), description="Parent-child value propagation, availability closure, cycles")
     def check_hierarchical_consistency(self):
         """Check 4: Parent-child relational value consistency.
         Examples: department budget should not exceed parent org_unit budget.
-        Risk residual_risk_level should not exceed inherent_risk_level."""
+        Risk residual_risk_level should not exceed inherent_risk_level.
+        Availability must not exceed the ceiling of the full depends_on/hosted_on
+        closure, and dependency cycles are reported."""
         inconsistencies = []
 
         # Check risk: residual should not be worse than inherent
@@ -270,10 +675,31 @@ class GraphGuard:
                 if s_uptime and t_uptime and s_uptime > t_uptime:
                     inconsistencies.append({
                         "entity_id": source["id"],
+                        "limiting_id": target["id"],
                         "issue": f"System '{source.get('name','')}' claims {s_uptime}% uptime but depends on '{target.get('name','')}' with only {t_uptime}% uptime",
                         "type": "availability_hierarchy"
                     })
 
+        direct_pairs = {(i["entity_id"], i["limiting_id"]) for i in inconsistencies if "limiting_id" in i}
+        closure_violations, cycles = self._availability_closure()
+        inconsistencies.extend(v for v in closure_violations if (v["entity_id"], v["limiting_id"]) not in direct_pairs)
+
+        if cycles:
+            cycle_ids = [eid for members in cycles for eid in members]
+            self.findings.append(Finding(
+                "hierarchical_consistency", "MEDIUM",
+                f"{len(cycles)} dependency cycles found across {len(cycle_ids)} entities ({'/'.join(sorted(AVAILABILITY_DEPENDENCY_TYPES))})",
+                entity_ids=cycle_ids,
+                recommendation="Break circular dependencies or document the shared failure domain"
+            ))
+            for members in sorted(cycles, key=len, reverse=True)[:5]:
+                names = [self.entity_map.get(m, {}).get("name", m)[:30] for m in members[:4]]
+                more = f" (+{len(members) - 4} more)" if len(members) > 4 else ""
+                self.findings.append(Finding(
+                    "hierarchical_consistency", "INFO",
+                    f"  [dependency_cycle] {len(members)} entities: {', '.join(names)}{more}"
+                ))
+
         if inconsistencies:
             self.findings.append(Finding(
                 "hierarchical_consistency", "HIGH",
@@ -286,12 +712,80 @@ class GraphGuard:
                     "hierarchical_consistency", "INFO",
                     f"  [{inc['type']}] {inc['entity_id']}: {inc['issue']}"
                 ))
-        else:
+        elif not cycles:
             self.findings.append(Finding(
                 "hierarchical_consistency", "PASS",
                 "No hierarchical consistency violations detected"
             ))
 
+    def _availability_closure(self) -> Tuple[List[dict], List[List[str]]]:
+        """Transitive availability ceilings over depends_on/hosted_on chains.
+
+        An entity can be no more available than the least available entity
+        anywhere in its dependency closure. The graph is condensed into SCCs
+        and ceilings are propagated once in topological order, so the whole
+        closure costs O(V + E) instead of a DFS per entity. Members of a
+        cycle share one ceiling, since each depends on all of the others.
+
+        Returns (violations, cycles).
+        """
+        successors = defaultdict(list)
+        nodes = []
+        seen = set()
+        for sid, edges in self.outgoing.items():
+            for rel in edges:
+                if rel.get("relationship_type") not in AVAILABILITY_DEPENDENCY_TYPES:
+                    continue
+                tid = rel.get("target_id")
+                if tid not in self.entity_map:
+                    continue  # Dangling edges are reported by referential integrity
+                successors[sid].append(tid)
+                for eid in (sid, tid):
+                    if eid not in seen:
+                        seen.add(eid)
+                        nodes.append(eid)
+
+        component_of, components = condense_scc(nodes, successors)
+
+        def uptime(eid):
+            val = (self.entity_map[eid].get("availability_design") or {}).get("designed_uptime_pct")
+            return val if isinstance(val, (int, float)) and not isinstance(val, bool) else None
+
+        # ceiling[c] = (uptime, limiting entity id) or None when nothing in the closure declares uptime
+        ceiling: List[Any] = [None] * len(components)
+        cycles = []
+        for c, members in enumerate(components):
+            best = None
+            for eid in members:
+                u = uptime(eid)
+                if u is not None and (best is None or u < best[0]):
+                    best = (u, eid)
+                for tid in successors.get(eid, ()):
+                    tc = component_of[tid]
+                    if tc != c and ceiling[tc] is not None and (best is None or ceiling[tc][0] < best[0]):
+                        best = ceiling[tc]
+            ceiling[c] = best
+            if len(members) > 1 or members[0] in successors.get(members[0], ()):
+                cycles.append(members)
+
+        violations = []
+        for eid in nodes:
+            own = uptime(eid)
+            bound = ceiling[component_of[eid]]
+            if own is None or bound is None or bound[1] == eid or own <= bound[0]:
+                continue
+            source = self.entity_map[eid]
+            limiter = self.entity_map[bound[1]]
+            violations.append({
+                "entity_id": eid,
+                "limiting_id": bound[1],
+                "issue": f"'{source.get('name','')}' claims {own}% uptime but its dependency chain is bounded by '{limiter.get('name','')}' at {bound[0]}% uptime",
+                "type": "availability_closure"
+            })
+
+        return violations, cycles
+
+    @register_check("provenance", requires=(), description="Required provenance fields populated")
     def check_provenance_completeness(self):
         """Check 5: Required provenance fields populated."""
         required_prov_fields = ["primary_data_source", "last_assessed_date", "assessed_by", "confidence_level"]
@@ -325,26 +819,16 @@ class GraphGuard:
                 f"  {field}: missing on {count} entities ({pct:.1f}%)"
             ))
 
+    @register_check("temporal", requires=("temporal",), description="Date field logical consistency")
     def check_temporal_coherence(self):
-        """Check 6: Date field logical consistency."""
+        """Check 6: Date field logical consistency, compared on parsed day ordinals."""
+        temporal = self.index("temporal")
         incoherent = []
 
-        for e in self.entities:
-            temporal = e.get("temporal", {})
-            eff = temporal.get("effective_date")
-            exp = temporal.get("expiration_date")
-            last_rev = temporal.get("last_review_date")
-            next_rev = temporal.get("next_review_date")
-
-            try:
-                if eff and exp:
-                    if str(eff) > str(exp):
-                        incoherent.append({"id": e["id"], "issue": f"effective_date ({eff}) > expiration_date ({exp})"})
-                if last_rev and next_rev:
-                    if str(last_rev) > str(next_rev):
-                        incoherent.append({"id": e["id"], "issue": f"last_review_date ({last_rev}) > next_review_date ({next_rev})"})
-            except (TypeError, ValueError):
-                pass
+        for earlier, later in (("effective_date", "expiration_date"), ("last_review_date", "next_review_date")):
+            for pos in temporal.violations(earlier, later):
+                t = self.entities[pos].get("temporal") or {}
+                incoherent.append({"id": temporal.ids[pos], "issue": f"{earlier} ({t.get(earlier)}) > {later} ({t.get(later)})"})
 
         if incoherent:
             self.findings.append(Finding(
@@ -359,13 +843,28 @@ class GraphGuard:
                 "All temporal fields are logically consistent"
             ))
 
+        invalid = temporal.invalid_counts()
+        if invalid:
+            self.findings.append(Finding(
+                "temporal_coherence", "LOW",
+                f"{sum(invalid.values())} unparseable date values found",
+                recommendation="Normalize dates to ISO 8601 (YYYY-MM-DD)"
+            ))
+            for name, count in sorted(invalid.items(), key=lambda x: -x[1]):
+                self.findings.append(Finding("temporal_coherence", "INFO", f"  {name}: {count} unparseable"))
+
+        overdue = temporal.before("next_review_date", ASSESSMENT_DATE)
+        due_soon = temporal.due_within("next_review_date", ASSESSMENT_DATE, 30)
+        if overdue or due_soon:
+            self.findings.append(Finding(
+                "temporal_coherence", "INFO",
+                f"  Reviews: {len(overdue)} overdue, {len(due_soon)} due within 30 days of {ASSESSMENT_DATE}"
+            ))
+
+    @register_check("density", requires=("degree",), description="Relationship count vs expected range")
     def check_relational_density(self):
         """Check 7: Relationship count per entity vs expected range."""
-        # Count relationships per entity
-        rel_count = defaultdict(int)
-        for rel in self.relationships:
-            rel_count[rel.get("source_id")] += 1
-            rel_count[rel.get("target_id")] += 1
+        rel_count = self.index("degree")
 
         under_connected = []
         over_connected = []
@@ -409,8 +908,10 @@ class GraphGuard:
                 "All entities within expected relationship density range"
             ))
 
+    @register_check("schema", requires=("entity_map",), description="Entity types and relationship patterns vs schema")
     def check_schema_conformance(self):
-        """Check 8: Entity types match known schema types."""
+        """Check 8: Entity types match known schema types, and every relationship
+        matches an allowed (source_type, relationship_type, target_type) triple."""
         known_types = set(EXPECTED_DENSITY.keys())
         unknown_types = defaultdict(int)
 
@@ -433,19 +934,136 @@ class GraphGuard:
                 f"All {len(self.entities)} entities use valid schema types"
             ))
 
+        self._check_relationship_patterns()
+
+    def _check_relationship_patterns(self):
+        """Single pass over integer-coded relationship triples against the compiled schema."""
+        schema = compile_relationship_schema()
+        type_code = schema.type_code
+        rel_code = schema.rel_code
+        entity_code = {eid: type_code.get(e.get("entity_type"), 0) for eid, e in self.entity_map.items()}
+
+        codes = [
+            (entity_code.get(rel.get("source_id"), 0),
+             rel_code.get(rel.get("relationship_type"), 0),
+             entity_code.get(rel.get("target_id"), 0))
+            for rel in self.relationships
+        ]
+        counts = schema.histogram(codes)
+        self.pattern_histogram = {
+            schema.triple(cell): n for cell, n in enumerate(counts) if n
+        }
+
+        violations = []
+        unresolved = 0
+        for cell, n in enumerate(counts):
+            if not n or schema.allowed[cell]:
+                continue
+            src, rtype, tgt = schema.triple(cell)
+            if rtype != "<unknown>" and "<unknown>" in (src, tgt):
+                unresolved += n  # dangling endpoint or unknown entity type, reported elsewhere
+                continue
+            violations.append((cell, (src, rtype, tgt), n))
+
+        if violations:
+            total = sum(n for _, _, n in violations)
+            bad_cells = {cell for cell, _, _ in violations}
+            self.findings.append(Finding(
+                "schema_conformance", "MEDIUM",
+                f"{total} relationships across {len(violations)} (source, relationship, target) patterns not in schema",
+                entity_ids=[rel.get("source_id") for rel, code in zip(self.relationships, codes)
+                            if schema.cell(*code) in bad_cells],
+                recommendation="Re-type or reverse these relationships, or extend RELATIONSHIP_SCHEMA if the pattern is valid"
+            ))
+            for _, (src, rtype, tgt), n in sorted(violations, key=lambda x: -x[2]):
+                label = rtype if rtype != "<unknown>" else "unknown relationship_type"
+                self.findings.append(Finding(
+                    "schema_conformance", "INFO",
+                    f"  {src} -[{label}]-> {tgt}: {n} relationships"
+                ))
+        else:
+            self.findings.append(Finding(
+                "schema_conformance", "PASS",
+                f"All {len(self.relationships) - unresolved} resolvable relationships match "
+                f"{len(self.pattern_histogram)} schema patterns"
+            ))
+
+    @register_check("embedded", requires=("entity_map", "embedded_refs"), description="Embedded id fields vs relationship files")
+    def check_embedded_references(self):
+        """Check 9: Embedded foreign-key fields reconciled against relationship edges."""
+        refs = self.index("embedded_refs")
+        total = len(refs.matched) + len(refs.missing) + len(refs.dangling) + len(refs.contradictions)
+
+        if refs.dangling:
+            self.findings.append(Finding(
+                "embedded_references", "HIGH",
+                f"{len(refs.dangling)} embedded ids reference entities that do not exist",
+                entity_ids=[eid for _, eid, _ in refs.dangling],
+                recommendation="Clear or correct the embedded id fields"
+            ))
+            for spec, eid, ref in refs.dangling[:10]:
+                self.findings.append(Finding("embedded_references", "INFO", f"  {spec.label}: {eid} → '{ref}' (not found)"))
+
+        if refs.contradictions:
+            self.findings.append(Finding(
+                "embedded_references", "MEDIUM",
+                f"{len(refs.contradictions)} embedded ids contradict the relationship files",
+                entity_ids=[eid for _, eid, _, _ in refs.contradictions],
+                recommendation="Decide which side is authoritative and align the embedded field and the edges"
+            ))
+            for spec, eid, ref, others in refs.contradictions[:10]:
+                self.findings.append(Finding(
+                    "embedded_references", "INFO",
+                    f"  {spec.label}: {eid} embeds '{ref}' but {'/'.join(sorted(spec.accepts))} edges point to {', '.join(others[:3])}"
+                ))
+
+        if refs.missing:
+            self.findings.append(Finding(
+                "embedded_references", "LOW",
+                f"{len(refs.missing)} embedded references have no matching relationship",
+                entity_ids=[eid for _, eid, _ in refs.missing],
+                recommendation="Add the derived edges (--emit-derived-edges) or clear the embedded field"
+            ))
+            by_field = defaultdict(int)
+            for spec, _, _ in refs.missing:
+                by_field[spec.label] += 1
+            for label, count in sorted(by_field.items(), key=lambda x: -x[1]):
+                self.findings.append(Finding("embedded_references", "INFO", f"  {label}: {count} missing edges"))
+
+        if not (refs.dangling or refs.contradictions or refs.missing):
+            self.findings.append(Finding(
+                "embedded_references", "PASS",
+                f"All {total} embedded references are backed by relationships"
+            ))
+
+    def run_checks(self, checks: List[str] = None) -> dict:
+        """Execute the selected checks (all registered checks by default) and return the report.
+
+        Findings are collected per call; shared indexes are kept, so later
+        calls on the same GraphGuard reuse them.
+        """
+        selected = list(CHECK_REGISTRY) if not checks else list(checks)
+        unknown = [c for c in selected if c not in CHECK_REGISTRY]
+        if unknown:
+            raise ValueError(f"Unknown GraphGuard checks: {unknown}. Available: {list(CHECK_REGISTRY)}")
+
+        self.findings = []
+        self.pattern_histogram = {}
+        for name in CHECK_REGISTRY:
+            if name not in selected:
+                continue
+            spec = CHECK_REGISTRY[name]
+            for index_name in spec.requires:
+                self.index(index_name)
+            spec.method(self)
+
+        return self._build_report([c for c in CHECK_REGISTRY if c in selected])
+
     def run_all_checks(self) -> dict:
         """Execute all GraphGuard checks and return structured report."""
-        print("GraphGuard Validation: Running 8 integrity checks...")
-
-        self.check_referential_integrity()
-        self.check_duplicates()
-        self.check_orphans()
-        self.check_hierarchical_consistency()
-        self.check_provenance_completeness()
-        self.check_temporal_coherence()
-        self.check_relational_density()
-        self.check_schema_conformance()
+        return self.run_checks()
 
+    def _build_report(self, checks_run: List[str]) -> dict:
         # Summarize
         severity_counts = defaultdict(int)
         for f in self.findings:
@@ -460,6 +1078,8 @@ class GraphGuard:
             "assessed_by": "GraphGuard v1.0 — hc-enterprise-kg Integrity Module",
             "total_entities": len(self.entities),
             "total_relationships": len(self.relationships),
+            "checks_run": checks_run,
+            "indexes_built": list(self._indexes),
             "checks_passed": checks_passed,
             "total_checks": total_checks,
             "severity_summary": dict(severity_counts),
@@ -467,24 +1087,58 @@ class GraphGuard:
                 else "AT_RISK" if severity_counts.get("CRITICAL", 0) == 0
                 else "CRITICAL",
             "findings": [f.to_dict() for f in self.findings],
+            "relationship_patterns": [
+                {"source_type": src, "relationship_type": rtype, "target_type": tgt, "count": n}
+                for (src, rtype, tgt), n in sorted(self.pattern_histogram.items(), key=lambda x: -x[1])
+            ],
         }
 
         return report
 
 
+def run_graphguard(graph: dict, checks: List[str] = None) -> dict:
+    """Run GraphGuard in-process on a loaded graph and return the report."""
+    return GraphGuard(graph).run_checks(checks)
+
+
 def main():
     repo_root = Path(__file__).parent.parent
-    graph_path = repo_root / "graph.json"
 
+    parser = argparse.ArgumentParser(description="GraphGuard graph integrity validation")
+    parser.add_argument("--graph", type=Path, default=repo_root / "graph.json",
+                        help="Path to graph.json (default: repo root)")
+    parser.add_argument("--checks", default="",
+                        help=f"Comma-separated subset of checks to run: {','.join(CHECK_REGISTRY)}")
+    parser.add_argument("--output", type=Path, default=repo_root / "graphguard_report.json",
+                        help="Where to write the JSON report")
+    parser.add_argument("--list-checks", action="store_true", help="List registered checks and exit")
+    parser.add_argument("--emit-derived-edges", type=Path, metavar="PATH",
+                        help="Write relationships derived from embedded id fields that have no matching edge")
+    args = parser.parse_args()
+    startup_ms = (time.perf_counter() - _STARTED) * 1000
+
+    if args.list_checks:
+        for name, spec in CHECK_REGISTRY.items():
+            needs = ", ".join(spec.requires) or "-"
+            print(f"  {name:<12} {spec.description:<62} [indexes: {needs}]")
+        sys.exit(0)
+
+    graph_path = args.graph
     if not graph_path.exists():
-        print("ERROR: graph.json not found")
+        print(f"ERROR: {graph_path} not found")
         sys.exit(1)
 
     with open(graph_path) as f:
         graph = json.load(f)
 
+    checks = [c.strip() for c in args.checks.split(",") if c.strip()]
     guard = GraphGuard(graph)
-    report = guard.run_all_checks()
+    print(f"GraphGuard Validation: Running {len(checks) or len(CHECK_REGISTRY)} integrity checks...")
+    try:
+        report = guard.run_checks(checks)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
 
     # Print summary
     print(f"\n{'='*70}")
@@ -492,6 +1146,7 @@ def main():
     print(f"{'='*70}")
     print(f"\n  Overall Status: {report['overall_integrity']}")
     print(f"  Entities: {report['total_entities']} | Relationships: {report['total_relationships']}")
+    print(f"  Startup: {startup_ms:.0f} ms | Similarity backend: {kg_similarity.backend() or 'not loaded'}")
     print(f"\n  Severity Distribution:")
     for sev in ["CRITICAL", "HIGH", "MEDIUM", "LOW", "PASS"]:
         count = report["severity_summary"].get(sev, 0)
@@ -509,10 +1164,15 @@ def main():
                 print(f"       → {f['recommendation']}")
 
     # Save report
-    report_path = repo_root / "graphguard_report.json"
+    report_path = args.output
     with open(report_path, "w") as f:
         json.dump(report, f, indent=2)
     print(f"\n  Full report saved to: {report_path}")
+    if args.emit_derived_edges:
+        created_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        edges = guard.index("embedded_refs").derived_edges(created_at)
+        args.emit_derived_edges.write_text(json.dumps(edges, indent=2) + "\n")
+        print(f"  Derived edges saved to: {args.emit_derived_edges} ({len(edges)} edges)")
 
     # Exit code based on findings
     if report["overall_integrity"] == "CRITICAL":
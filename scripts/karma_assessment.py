@@ -16,17 +16,70 @@ Outputs:
   - Per-type aggregate statistics
   - Enterprise-wide maturity distribution
   - Deficiency heat map for enrichment prioritization
+
+Usage:
+    python3 scripts/karma_assessment.py [--graph graph.json] [--columnar | --incremental | --jobs N]
+    python3 scripts/karma_assessment.py --sample 400 [--min-per-type 10] [--seed S]
+                                        [--completeness-schema schema.json]
+
+--columnar scores with NumPy array operations (numpy required); the report
+and per-entity scores are identical to the default streaming path.
+--incremental keeps per-entity scores in a local SQLite store and rescores
+only entities whose content changed; freshness is recomputed every run. The
+learned completeness schema is cached too, and a graph.json whose size and
+mtime match the last run is not digested at all.
+--sample N is an interactive preview: a stratified sample per entity_type,
+estimated means with 95% confidence intervals, uncertain types flagged.
+Only the sample is scored, but graph.json is still parsed in full, so a
+preview costs roughly the JSON load; the schema learning walk is skipped
+when --store holds the schema of an --incremental run over the same file.
+
+Every run is appended to .karma_history.sqlite (see lib/kg_karma_history.py):
+    python3 scripts/karma_assessment.py --trend system --runs 30
+    python3 scripts/karma_assessment.py --grade-changes dropped
+
+--jobs N scores fixed-size chunks in N processes and merges the partial
+aggregates; output matches the serial run exactly.
+
+Enrichment queues (enterprise-wide, per entity type and per weakest
+dimension) are selected with bounded heaps. Further pages are read from the
+last run's per-entity scores without rescoring:
+    python3 scripts/karma_assessment.py --page --type data_asset --limit 50 [--after CURSOR]
 """
 
+import argparse
+import hashlib
+import heapq
 import json
+import marshal
+import random
+import sqlite3
 import sys
+import textwrap
 from pathlib import Path
-from datetime import datetime, timezone
 from collections import defaultdict
-from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from kg_index import GraphIndex
+from kg_karma_history import KarmaHistory, Snapshot
+from kg_temporal import TemporalIndex, parse_date
 
 ASSESSMENT_DATE = "2026-03-04"
 
+# Bump whenever a scoring function changes; invalidates the --incremental store
+KARMA_SCORER_VERSION = "1"
+
+# Bump whenever DIMENSION_WEIGHTS change. Composites under different weights
+# are not comparable, so history trends and grade changes never mix them.
+# 1: completeness .30, confidence .20, freshness .15, source quality .20, gap coverage .15
+# 2: consistency added; completeness .25, the other five .15 each
+KARMA_WEIGHTS_VERSION = "2"
+
+# Recorded with every history run
+KARMA_HISTORY_VERSION = f"scorer-{KARMA_SCORER_VERSION}/weights-{KARMA_WEIGHTS_VERSION}"
+
 # Confidence level to numeric mapping
 CONFIDENCE_MAP = {
     "Critical": 0.95,
@@ -38,6 +91,22 @@ CONFIDENCE_MAP = {
     None: 0.0,
 }
 
+# provenance.data_quality_score label mappings (Score 4)
+ACCURACY_MAP = {"High": 0.9, "Medium-High": 0.8, "Medium": 0.6, "Low": 0.3}
+TIMELINESS_MAP = {"Current": 0.9, "Recent": 0.7, "Stale": 0.3, "Unknown": 0.1}
+CONSISTENCY_MAP = {"Verified": 0.95, "Consistent": 0.75, "Inconsistent": 0.3}
+
+# Weighted composite (completeness is most important)
+DIMENSION_WEIGHTS = {
+    "completeness": 0.25,
+    "confidence": 0.15,
+    "freshness": 0.15,
+    "source_quality": 0.15,
+    "consistency": 0.15,
+    "gap_coverage": 0.15,
+}
+DIMENSIONS = tuple(DIMENSION_WEIGHTS)
+
 # Fields that count as "populated" even when they're structured objects
 # (we check their interior for non-null values)
 DEEP_CHECK_FIELDS = {
@@ -61,39 +130,36 @@ def is_populated(value: Any) -> bool:
     """Determine if an attribute value is meaningfully populated."""
     if value is None:
         return False
-    if isinstance(value, str) and value.strip() == "":
-        return False
-    if isinstance(value, list) and len(value) == 0:
-        return False
+    if isinstance(value, str):
+        return value.strip() != ""
+    if isinstance(value, list):
+        return len(value) != 0
     if isinstance(value, dict):
         # Check if at least one interior value is non-null/non-empty
-        return any(is_populated(v) for v in value.values())
+        for v in value.values():
+            if is_populated(v):
+                return True
+        return False
     return True
 
 
-def count_deep_populated(obj: dict, prefix: str = "") -> Tuple[int, int]:
-    """Count total and populated fields in a nested object, flattened."""
-    total = 0
-    populated = 0
+def _leaf_paths(obj: dict, prefix: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], bool, Any]]:
+    """Yield (path, is_branch, value) for a deep-checked object, flattened.
+
+    Branches are nested dicts that are expanded into their own leaves."""
     for key, value in obj.items():
         if key in ("schema_version",):
             continue  # Skip meta fields
+        path = prefix + (key,)
         if isinstance(value, dict) and key not in ("provenance",):
-            t, p = count_deep_populated(value, f"{prefix}{key}.")
-            total += t
-            populated += p
+            yield path, True, value
+            yield from _leaf_paths(value, path)
         else:
-            total += 1
-            if is_populated(value):
-                populated += 1
-    return total, populated
+            yield path, False, value
 
 
-def score_completeness(entity: dict) -> float:
-    """Score 1: Attribute completeness (0.0-1.0)."""
-    total_fields = 0
-    populated_fields = 0
-
+def _entity_leaf_paths(entity: dict) -> Iterator[Tuple[Tuple[str, ...], bool, Any]]:
+    """Yield (path, is_branch, value) for the type-specific attributes of one entity."""
     for key, value in entity.items():
         if key in BASE_FIELDS:
             continue  # Skip base fields, focus on type-specific
@@ -101,14 +167,142 @@ def score_completeness(entity: dict) -> float:
             continue
 
         if key in DEEP_CHECK_FIELDS and isinstance(value, dict):
-            t, p = count_deep_populated(value)
-            total_fields += t
-            populated_fields += p
+            yield (key,), True, value
+            yield from _leaf_paths(value, (key,))
         else:
-            total_fields += 1
-            if is_populated(value):
-                populated_fields += 1
+            yield (key,), False, value
+
+
+def _lookup(entity: dict, path: Tuple[str, ...]) -> Any:
+    value = entity
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+class CompletenessSchema:
+    """Compiled per-entity_type leaf paths for Score 1.
+
+    Learned once from the data (the union of every leaf seen on an entity of
+    that type) or declared as {entity_type: ["dotted.path", ...]}. Scoring is
+    then a loop over precomputed paths, and a leaf missing from a record
+    counts as unpopulated, so scores are comparable within a type. A path
+    that is an object on some records and a scalar on others is expanded to
+    its nested leaves.
+    """
+
+    def __init__(self, leaves: Dict[str, List[Tuple[str, ...]]]):
+        self.leaves = leaves
+        self._compiled = {etype: self._compile(paths) for etype, paths in leaves.items()}
+
+    @staticmethod
+    def _compile(paths: List[Tuple[str, ...]]) -> Tuple[List[str], List[Tuple[str, ...]]]:
+        return [p[0] for p in paths if len(p) == 1], [p for p in paths if len(p) > 1]
+
+    @classmethod
+    def learn(cls, entities: List[dict]) -> "CompletenessSchema":
+        seen: Dict[str, Dict[Tuple[str, ...], None]] = defaultdict(dict)
+        branches: Dict[str, set] = defaultdict(set)
+        for entity in entities:
+            etype = entity.get("entity_type")
+            type_seen = seen[etype]
+            for path, is_branch, _ in _entity_leaf_paths(entity):
+                if is_branch:
+                    branches[etype].add(path)
+                else:
+                    type_seen[path] = None
+        return cls({
+            etype: [p for p in paths if p not in branches[etype]]
+            for etype, paths in seen.items()
+        })
+
+    @classmethod
+    def learn_counts(cls, entities: List[dict]) -> Tuple["CompletenessSchema", List[int]]:
+        """learn(entities) plus every entity's populated leaf count under it.
+
+        The learning walk already visits each leaf, so presence is counted
+        there instead of in a second pass through counts(). A populated leaf
+        that another entity of the type expands into nested leaves is not in
+        the schema and is subtracted once the walk is done."""
+        seen: Dict[str, Dict[Tuple[str, ...], None]] = defaultdict(dict)
+        branches: Dict[str, set] = defaultdict(set)
+        populated: List[int] = []
+        # (row, entity_type, path) of populated leaves that may also be branches
+        suspects: List[Tuple[int, str, Tuple[str, ...]]] = []
+        for row, entity in enumerate(entities):
+            etype = entity.get("entity_type")
+            type_seen = seen[etype]
+            type_branches = branches[etype]
+            count = 0
+            for key, value in entity.items():
+                if key in BASE_FIELDS:
+                    continue
+                path = (key,)
+                if key not in DEEP_CHECK_FIELDS:
+                    type_seen[path] = None
+                    count += is_populated(value)
+                elif isinstance(value, dict):
+                    type_branches.add(path)
+                    for sub, is_branch, leaf in _leaf_paths(value, path):
+                        if is_branch:
+                            type_branches.add(sub)
+                            continue
+                        type_seen[sub] = None
+                        if is_populated(leaf):
+                            count += 1
+                            suspects.append((row, etype, sub))
+                else:
+                    type_seen[path] = None
+                    if is_populated(value):
+                        count += 1
+                        suspects.append((row, etype, path))
+            populated.append(count)
+        for row, etype, path in suspects:
+            if path in branches[etype]:
+                populated[row] -= 1
+        return cls({
+            etype: [p for p in paths if p not in branches[etype]]
+            for etype, paths in seen.items()
+        }), populated
+
+    @classmethod
+    def declared(cls, spec: Dict[str, List[str]]) -> "CompletenessSchema":
+        return cls({etype: [tuple(p.split(".")) for p in paths] for etype, paths in spec.items()})
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {etype: [".".join(p) for p in paths] for etype, paths in sorted(self.leaves.items())}
+
+    def counts(self, entity: dict) -> Tuple[int, int]:
+        """(populated, total) over the compiled leaves of the entity's type."""
+        compiled = self._compiled.get(entity.get("entity_type"))
+        if compiled is None:
+            # Type not in the schema: fall back to this record's own layout
+            return CompletenessSchema.learn([entity]).counts(entity)
+        flat, nested = compiled
+        populated = 0
+        for key in flat:
+            if is_populated(entity.get(key)):
+                populated += 1
+        for path in nested:
+            if is_populated(_lookup(entity, path)):
+                populated += 1
+        return populated, len(flat) + len(nested)
+
+
+def completeness_counts(entity: dict, schema: Optional[CompletenessSchema] = None) -> Tuple[int, int]:
+    """(populated, total) type-specific attribute counts behind Score 1.
+
+    Without a schema the entity is measured against its own layout only."""
+    if schema is None:
+        schema = CompletenessSchema.learn([entity])
+    return schema.counts(entity)
+
 
+def score_completeness(entity: dict, schema: Optional[CompletenessSchema] = None) -> float:
+    """Score 1: Attribute completeness (0.0-1.0)."""
+    populated_fields, total_fields = completeness_counts(entity, schema)
     if total_fields == 0:
         return 0.0
     return populated_fields / total_fields
@@ -121,37 +315,42 @@ def score_confidence(entity: dict) -> float:
     return CONFIDENCE_MAP.get(conf, 0.0)
 
 
+ASSESSMENT_ORDINAL = parse_date(ASSESSMENT_DATE)
+
+
+def freshness_from_ordinal(ordinal: int) -> float:
+    """Map a parsed review/assessment day ordinal to a freshness score (0.0-1.0)."""
+    if ordinal <= 0:
+        return 0.0  # missing or unparseable
+    days_old = ASSESSMENT_ORDINAL - ordinal
+    if days_old <= 7:
+        return 1.0
+    elif days_old <= 30:
+        return 0.9
+    elif days_old <= 90:
+        return 0.75
+    elif days_old <= 180:
+        return 0.5
+    elif days_old <= 365:
+        return 0.25
+    else:
+        return 0.1
+
+
 def score_freshness(entity: dict) -> float:
     """Score 3: Temporal freshness based on last_review_date (0.0-1.0)."""
     temporal = entity.get("temporal", {})
     last_review = temporal.get("last_review_date")
     last_assessed = entity.get("provenance", {}).get("last_assessed_date")
 
-    # Use whichever is more recent
-    date_str = last_review or last_assessed
-    if not date_str:
-        return 0.0
+    # Review date wins when present; fall back to the assessment date
+    return freshness_from_ordinal(parse_date(last_review or last_assessed))
 
-    try:
-        review_date = datetime.fromisoformat(str(date_str).replace("Z", "+00:00"))
-        if review_date.tzinfo is None:
-            review_date = review_date.replace(tzinfo=timezone.utc)
-        now = datetime(2026, 3, 4, tzinfo=timezone.utc)
-        days_old = (now - review_date).days
-        if days_old <= 7:
-            return 1.0
-        elif days_old <= 30:
-            return 0.9
-        elif days_old <= 90:
-            return 0.75
-        elif days_old <= 180:
-            return 0.5
-        elif days_old <= 365:
-            return 0.25
-        else:
-            return 0.1
-    except (ValueError, TypeError):
-        return 0.0
+
+def freshness_column(temporal: TemporalIndex) -> List[float]:
+    """Score 3 for every entity at once from the shared parsed-date index."""
+    basis = temporal.coalesce("last_review_date", "last_assessed_date")
+    return [freshness_from_ordinal(ordinal) for ordinal in basis]
 
 
 def score_source_quality(entity: dict) -> float:
@@ -169,25 +368,117 @@ def score_source_quality(entity: dict) -> float:
     if completeness_pct is not None:
         scores.append(min(completeness_pct / 100.0, 1.0))
 
-    accuracy_map = {"High": 0.9, "Medium-High": 0.8, "Medium": 0.6, "Low": 0.3}
-    if accuracy in accuracy_map:
-        scores.append(accuracy_map[accuracy])
+    if accuracy in ACCURACY_MAP:
+        scores.append(ACCURACY_MAP[accuracy])
 
-    timeliness_map = {"Current": 0.9, "Recent": 0.7, "Stale": 0.3, "Unknown": 0.1}
-    if timeliness in timeliness_map:
-        scores.append(timeliness_map[timeliness])
+    if timeliness in TIMELINESS_MAP:
+        scores.append(TIMELINESS_MAP[timeliness])
 
-    consistency_map = {"Verified": 0.95, "Consistent": 0.75, "Inconsistent": 0.3}
-    if consistency in consistency_map:
-        scores.append(consistency_map[consistency])
+    if consistency in CONSISTENCY_MAP:
+        scores.append(CONSISTENCY_MAP[consistency])
 
     if not scores:
         return 0.0
     return sum(scores) / len(scores)
 
 
+# Score 5 inputs: relationship types along which availability must not
+# increase (mirrors GraphGuard), and the fields holding a data classification
+AVAILABILITY_DEPENDENCY_TYPES = {"depends_on", "hosted_on"}
+CLASSIFICATION_FIELDS = ("classification", "data_classification")
+
+# Score 5 for entities with no relational evidence either way
+CONSISTENCY_NO_EVIDENCE = 0.5
+
+
+def _designed_uptime(entity: dict) -> Optional[float]:
+    value = (entity.get("availability_design") or {}).get("designed_uptime_pct")
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _classification(entity: dict) -> Optional[str]:
+    for field in CLASSIFICATION_FIELDS:
+        value = entity.get(field)
+        if isinstance(value, str) and value.strip():
+            return value.strip().lower()
+    return None
+
+
+def consistency_column(entities: List[dict], relationships: List[dict],
+                       rows: Optional[List[int]] = None, graph: Optional[GraphIndex] = None) -> List[float]:
+    """Score 5: Cross-entity relational consistency (0.0-1.0).
+
+    One pass over relationships aggregates, per entity:
+      - neighbour confidence: mean provenance confidence of its neighbours,
+        scored as 1 - |own - neighbour mean| (both sides must be labelled)
+      - availability: share of its depends_on/hosted_on targets whose
+        designed uptime is not below its own
+      - classification: share of classified neighbours with the same label
+    The score is the mean of whichever parts have evidence. Returns one
+    score per entity, or per position in rows when given (edges not
+    touching those rows are skipped). Endpoint rows come from graph (a
+    GraphIndex over the same lists), built here when not given."""
+    graph = graph or GraphIndex(entities, relationships)
+    wanted = None if rows is None else set(rows)
+
+    attrs: Dict[int, tuple] = {}
+
+    def attributes(i: int) -> tuple:
+        if i not in attrs:
+            e = entities[i]
+            attrs[i] = (
+                CONFIDENCE_MAP.get((e.get("provenance") or {}).get("confidence_level"), 0.0),
+                _designed_uptime(e),
+                _classification(e),
+            )
+        return attrs[i]
+
+    nb_sum: Dict[int, float] = defaultdict(float)
+    nb_count: Dict[int, int] = defaultdict(int)
+    avail_edges: Dict[int, int] = defaultdict(int)
+    avail_ok: Dict[int, int] = defaultdict(int)
+    cls_edges: Dict[int, int] = defaultdict(int)
+    cls_ok: Dict[int, int] = defaultdict(int)
+
+    for s, t, rel in zip(graph.sources, graph.targets, relationships):
+        if s < 0 or t < 0 or s == t:
+            continue
+        if wanted is not None and s not in wanted and t not in wanted:
+            continue
+        s_conf, s_uptime, s_label = attributes(s)
+        t_conf, t_uptime, t_label = attributes(t)
+        if t_conf:
+            nb_sum[s] += t_conf
+            nb_count[s] += 1
+        if s_conf:
+            nb_sum[t] += s_conf
+            nb_count[t] += 1
+        if rel.get("relationship_type") in AVAILABILITY_DEPENDENCY_TYPES and s_uptime is not None and t_uptime is not None:
+            avail_edges[s] += 1
+            avail_ok[s] += s_uptime <= t_uptime
+        if s_label and t_label:
+            agree = s_label == t_label
+            cls_edges[s] += 1
+            cls_edges[t] += 1
+            cls_ok[s] += agree
+            cls_ok[t] += agree
+
+    scores = []
+    for i in (range(len(entities)) if rows is None else rows):
+        parts = []
+        own = attributes(i)[0] if nb_count.get(i) else 0.0
+        if own and nb_count[i]:
+            parts.append(1.0 - abs(own - nb_sum[i] / nb_count[i]))
+        if avail_edges.get(i):
+            parts.append(avail_ok[i] / avail_edges[i])
+        if cls_edges.get(i):
+            parts.append(cls_ok[i] / cls_edges[i])
+        scores.append(sum(parts) / len(parts) if parts else CONSISTENCY_NO_EVIDENCE)
+    return scores
+
+
 def score_gap_coverage(entity: dict) -> float:
-    """Score 5: Known data gaps documentation (0.0-1.0).
+    """Score 6: Known data gaps documentation (0.0-1.0).
     Higher score = gaps are documented with remediation plans.
     Zero gaps can mean either perfect data OR undocumented gaps."""
     prov = entity.get("provenance", {})
@@ -213,28 +504,31 @@ def score_gap_coverage(entity: dict) -> float:
     return 0.5 + (plan_ratio * 0.3) + (priority_ratio * 0.2)
 
 
-def compute_karma_score(entity: dict) -> dict:
-    """Compute the composite KarMA score for an entity."""
-    completeness = score_completeness(entity)
-    confidence = score_confidence(entity)
-    freshness = score_freshness(entity)
-    source_quality = score_source_quality(entity)
-    gap_coverage = score_gap_coverage(entity)
-
-    # Weighted composite (completeness is most important)
-    weights = {
-        "completeness": 0.30,
-        "confidence": 0.20,
-        "freshness": 0.15,
-        "source_quality": 0.20,
-        "gap_coverage": 0.15,
-    }
+def score_static_dimensions(entity: dict, schema: Optional[CompletenessSchema] = None) -> Tuple[float, float, float, float]:
+    """(completeness, confidence, source_quality, gap_coverage), unrounded.
+
+    These depend only on the entity's content (and its type's completeness
+    schema), so they can be cached by content digest; freshness cannot."""
+    return (
+        score_completeness(entity, schema),
+        score_confidence(entity),
+        score_source_quality(entity),
+        score_gap_coverage(entity),
+    )
+
 
+def assemble_karma_score(entity: dict, static: Tuple[float, float, float, float], freshness: float,
+                         consistency: float = CONSISTENCY_NO_EVIDENCE) -> dict:
+    """Combine the static dimensions, freshness and consistency into a scored result."""
+    completeness, confidence, source_quality, gap_coverage = static
+
+    weights = DIMENSION_WEIGHTS
     composite = (
         completeness * weights["completeness"]
         + confidence * weights["confidence"]
         + freshness * weights["freshness"]
         + source_quality * weights["source_quality"]
+        + consistency * weights["consistency"]
         + gap_coverage * weights["gap_coverage"]
     )
 
@@ -247,6 +541,7 @@ def compute_karma_score(entity: dict) -> dict:
             "confidence": round(confidence, 3),
             "freshness": round(freshness, 3),
             "source_quality": round(source_quality, 3),
+            "consistency": round(consistency, 3),
             "gap_coverage": round(gap_coverage, 3),
         },
         "karma_composite": round(composite, 3),
@@ -254,6 +549,19 @@ def compute_karma_score(entity: dict) -> dict:
     }
 
 
+def compute_karma_score(entity: dict, freshness: Optional[float] = None,
+                        schema: Optional[CompletenessSchema] = None,
+                        consistency: float = CONSISTENCY_NO_EVIDENCE) -> dict:
+    """Compute the composite KarMA score for an entity.
+
+    freshness may be supplied precomputed (see freshness_column); schema is
+    the graph's CompletenessSchema. consistency needs the whole graph (see
+    consistency_column) and defaults to the no-evidence score."""
+    if freshness is None:
+        freshness = score_freshness(entity)
+    return assemble_karma_score(entity, score_static_dimensions(entity, schema), freshness, consistency)
+
+
 def grade_karma(score: float) -> str:
     """Map KarMA composite to letter grade."""
     if score >= 0.85:
@@ -268,87 +576,1206 @@ def grade_karma(score: float) -> str:
         return "F"
 
 
-def run_karma_assessment(graph_path: str) -> dict:
-    """Run full KarMA assessment on a graph."""
-    with open(graph_path) as f:
-        graph = json.load(f)
+def iter_karma_scores(entities: List[dict], schema: Optional[CompletenessSchema] = None,
+                      store: Optional["KarmaScoreStore"] = None,
+                      relationships: Optional[List[dict]] = None,
+                      signature: Optional[str] = None) -> Iterator[dict]:
+    """Score entities one at a time, yielding each result exactly once.
+
+    The completeness schema is learned from entities unless supplied. With a
+    store, only new or changed entities are rescored; freshness and
+    consistency are always recomputed since they depend on the assessment
+    date and on neighbouring entities.
+
+    signature identifies the graph file (see graph_signature()). When the
+    store last completed a run over the same signature, entities are not
+    digested and the learned schema is read back from the store; otherwise
+    the schema is reused only if every entity digest is unchanged."""
+    freshness = freshness_column(TemporalIndex.from_entities(entities))
+    consistency = consistency_column(entities, relationships or [])
+    if store is None:
+        schema = schema or CompletenessSchema.learn(entities)
+        for entity, fresh, consistent in zip(entities, freshness, consistency):
+            yield compute_karma_score(entity, fresh, schema, consistent)
+        return
+
+    last_signature, last_key = store.graph_state()
+    unchanged = signature is not None and last_signature == signature
+    digests = None if unchanged else [entity_digest(entity) for entity in entities]
+    key = last_key if unchanged else _digest_key(digests)
+    if schema is None:
+        schema = store.learned_schema(key)
+        if schema is None:
+            schema = CompletenessSchema.learn(entities)
+            store.save_schema(key, schema)
+
+    cached = store.load(schema)
+    seen = set()
+    for i, (entity, fresh, consistent) in enumerate(zip(entities, freshness, consistency)):
+        eid = entity.get("id")
+        digest = digests[i] if digests else None
+        hit = cached.get(eid)
+        if eid in seen or hit is None or (digest is not None and hit[0] != digest):
+            static = score_static_dimensions(entity, schema)
+            if isinstance(eid, str) and eid not in seen:
+                store.put(eid, digest or entity_digest(entity), entity.get("entity_type"), static)
+            store.rescored += 1
+        else:
+            static = hit[1]
+            store.reused += 1
+        seen.add(eid)
+        yield assemble_karma_score(entity, static, fresh, consistent)
+    store.prune(seen)
+    store.set_graph_state(signature, key)
+    store.commit()
+
+
+def entity_digest(entity: dict) -> str:
+    """Content digest of an entity.
+
+    marshal format 2 (no back-references) is several times cheaper than
+    canonical JSON. It is key-order sensitive, but kg-build emits entities
+    in a stable order, and a reordered record is merely rescored."""
+    return hashlib.blake2b(marshal.dumps(entity, 2), digest_size=16).hexdigest()
+
+
+def _digest_key(digests: List[str]) -> str:
+    """One key for a graph's entity digests, in order (learn() is order sensitive)."""
+    return hashlib.blake2b("".join(digests).encode("ascii"), digest_size=16).hexdigest()
+
+
+def graph_signature(graph_path: Path) -> str:
+    """Cheap identity of a graph file: resolved path, size and mtime."""
+    st = graph_path.stat()
+    return f"{graph_path.resolve()}:{st.st_size}:{st.st_mtime_ns}"
+
+
+# schema:<type> marker for types scored against each record's own layout
+PER_RECORD_LAYOUT = "per-record"
+
+
+class KarmaScoreStore:
+    """SQLite cache of static KarMA dimensions keyed by entity id + digest.
+
+    Rows are invalidated wholesale when KARMA_SCORER_VERSION changes, and per
+    entity_type when that type's completeness schema changes (completeness
+    is measured against the type's leaf set, not just the entity).
+
+    The store also keeps the last learned schema, keyed by the digests of
+    the entities it was learned from, and the signature of the graph file
+    the last completed run read.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS scores (
+                id TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                entity_type TEXT,
+                completeness REAL NOT NULL,
+                confidence REAL NOT NULL,
+                source_quality REAL NOT NULL,
+                gap_coverage REAL NOT NULL
+            );
+            """
+        )
+        self.rescored = 0
+        self.reused = 0
+        self.removed = 0
+
+        # marshal output may change between Python versions, so digests do too
+        version = f"{KARMA_SCORER_VERSION}/py{sys.version_info[0]}.{sys.version_info[1]}"
+        if self._meta("scorer_version") != version:
+            self.conn.execute("DELETE FROM scores")
+            self.conn.execute("DELETE FROM meta")
+            self._set_meta("scorer_version", version)
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def load(self, schema: CompletenessSchema) -> Dict[str, Tuple[str, Tuple[float, float, float, float]]]:
+        """Drop stale rows, then return {id: (digest, static dimensions)}.
+
+        Every entity_type with cached rows is checked, including types the
+        schema omits: those are scored against each record's own layout, and
+        rows scored under an earlier schema for them are dropped too."""
+        layouts = {
+            etype: hashlib.sha1("\n".join(".".join(p) for p in paths).encode("utf-8")).hexdigest()
+            for etype, paths in schema.leaves.items()
+        }
+        for (etype,) in self.conn.execute("SELECT DISTINCT entity_type FROM scores").fetchall():
+            layouts.setdefault(etype, PER_RECORD_LAYOUT)
+        for etype, fingerprint in layouts.items():
+            key = f"schema:{etype}"
+            stored = self._meta(key)
+            if stored == fingerprint:
+                continue
+            # Rows of a type without an entry were scored per record (load()
+            # records every type in the schema before any row is cached)
+            if not (stored is None and fingerprint == PER_RECORD_LAYOUT):
+                self.conn.execute("DELETE FROM scores WHERE entity_type IS ?", (etype,))
+            self._set_meta(key, fingerprint)
+
+        rows = self.conn.execute(
+            "SELECT id, digest, completeness, confidence, source_quality, gap_coverage FROM scores"
+        )
+        return {eid: (digest, tuple(dims)) for eid, digest, *dims in rows}
+
+    def graph_state(self) -> Tuple[Optional[str], Optional[str]]:
+        """(signature, digest key) of the graph the last completed run read."""
+        return self._meta("graph_signature"), self._meta("graph_digests")
+
+    def set_graph_state(self, signature: Optional[str], key: str) -> None:
+        if signature is None:
+            self.conn.execute("DELETE FROM meta WHERE key = 'graph_signature'")
+        else:
+            self._set_meta("graph_signature", signature)
+        self._set_meta("graph_digests", key)
+
+    def learned_schema(self, key: str) -> Optional[CompletenessSchema]:
+        """The stored learned schema if it was learned from entities with this digest key."""
+        if self._meta("schema_key") != key:
+            return None
+        # pairs, not an object: entity_type may be null and paths may contain dots
+        return CompletenessSchema({etype: [tuple(p) for p in paths]
+                                   for etype, paths in json.loads(self._meta("schema"))})
+
+    def save_schema(self, key: str, schema: CompletenessSchema) -> None:
+        self._set_meta("schema", json.dumps([[etype, paths] for etype, paths in schema.leaves.items()]))
+        self._set_meta("schema_key", key)
+
+    def put(self, eid: str, digest: str, entity_type: Optional[str], static: Tuple[float, ...]) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (eid, digest, entity_type, *static),
+        )
+
+    def prune(self, live_ids: set) -> None:
+        """Remove rows for entities no longer in the graph."""
+        stale = [(eid,) for (eid,) in self.conn.execute("SELECT id FROM scores") if eid not in live_ids]
+        self.conn.executemany("DELETE FROM scores WHERE id = ?", stale)
+        self.removed += len(stale)
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _milli(score: float) -> int:
+    """A score already rounded to 3 places, as exact integer thousandths."""
+    return round(score * 1000)
+
+
+class BottomK:
+    """Streaming bottom-K selection by (score, seq): O(log k) per offer,
+    O(k) memory. Ties keep stream order, as a stable sort would."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[tuple] = []  # max-heap of (-score, -seq, item)
+
+    def offer(self, score: float, seq: int, item: Any) -> None:
+        entry = (-score, -seq, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def merge(self, other: "BottomK") -> None:
+        for neg_score, neg_seq, item in other._heap:
+            self.offer(-neg_score, -neg_seq, item)
+
+    def items(self) -> List[Tuple[int, Any]]:
+        """(seq, item) pairs, lowest score first."""
+        return [(-neg_seq, item) for neg_score, neg_seq, item in sorted(self._heap, key=lambda x: (-x[0], -x[1]))]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class ScoreSketch:
+    """Mergeable distribution sketch for scores rounded to 3 places.
+
+    Scores only take the 1001 values 0.000-1.000, so a sparse count per
+    thousandth is an exact sketch of bounded size (at most 1001 counters,
+    however many entities are scored): quantiles are exact, and merging
+    partial sketches from workers is plain addition.
+    """
+
+    QUANTILES = (0.10, 0.50, 0.90)
+    BINS = 10
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = dict(counts or {})
+        self.count = sum(self.counts.values())
+
+    def add(self, milli: int) -> None:
+        self.counts[milli] = self.counts.get(milli, 0) + 1
+        self.count += 1
+
+    def merge(self, other: "ScoreSketch") -> None:
+        for milli, n in other.counts.items():
+            self.counts[milli] = self.counts.get(milli, 0) + n
+        self.count += other.count
+
+    def quantiles(self, qs: Tuple[float, ...] = QUANTILES) -> List[Optional[float]]:
+        """Nearest-rank quantiles: smallest score with at least ceil(q*n) at or below it."""
+        if not self.count:
+            return [None for _ in qs]
+        # ceil(q*n) without float noise (0.1 * 30 is 3.0000000000000004)
+        ranks = [max(1, -(-round(q * self.count * 1000) // 1000)) for q in qs]
+        out: List[Optional[float]] = [None] * len(qs)
+        seen = 0
+        for milli in sorted(self.counts):
+            seen += self.counts[milli]
+            for i, rank in enumerate(ranks):
+                if out[i] is None and seen >= rank:
+                    out[i] = milli / 1000
+        return out
+
+    def histogram(self, bins: int = BINS) -> List[int]:
+        """Counts over equal-width bins of [0, 1]; the last bin includes 1.0."""
+        hist = [0] * bins
+        for milli, n in self.counts.items():
+            hist[min(milli * bins // 1000, bins - 1)] += n
+        return hist
+
+    def summary(self) -> dict:
+        p10, p50, p90 = self.quantiles()
+        return {"count": self.count, "p10": p10, "p50": p50, "p90": p90, "histogram": self.histogram()}
+
+
+def weakest_dimension(result: dict) -> str:
+    return min(result["scores"], key=result["scores"].get)
+
+
+class KarmaAggregator:
+    """Running aggregates for a stream of compute_karma_score() results.
+
+    Keeps per-type count/sum/min/max, the grade histogram, dimension sums and
+    bounded BottomK heaps for the enrichment priority queues (enterprise-wide,
+    per entity type and per weakest dimension) and ScoreSketch distributions
+    per type and per dimension, so no result list is retained.
+
+    Sums are kept in integer thousandths (scores are rounded to 3 places),
+    so aggregators built over partitions merge() to exactly the serial result.
+    """
+    def __init__(self, queue_size: int = 20):
+        self.queue_size = queue_size
+        self.count = 0
+        self.composite_sum = 0
+        self.type_stats: Dict[str, list] = {}  # etype -> [count, sum, min, max]
+        self.grade_dist: Dict[str, int] = defaultdict(int)
+        self.dimension_sums: Dict[str, int] = defaultdict(int)
+        self.queue = BottomK(queue_size)
+        self.type_queues: Dict[str, BottomK] = {}
+        self.dimension_queues: Dict[str, BottomK] = {}
+        self.type_sketches: Dict[str, ScoreSketch] = defaultdict(ScoreSketch)
+        self.dimension_sketches: Dict[str, ScoreSketch] = defaultdict(ScoreSketch)
+
+    def add(self, result: dict, seq: Optional[int] = None) -> None:
+        """Fold in one result; seq is its global position (defaults to arrival order)."""
+        composite = result["karma_composite"]
+        milli = _milli(composite)
+        etype = result["entity_type"] or "unknown"
+        if seq is None:
+            seq = self.count
+
+        stats = self.type_stats.get(etype)
+        if stats is None:
+            self.type_stats[etype] = [1, milli, composite, composite]
+        else:
+            stats[0] += 1
+            stats[1] += milli
+            stats[2] = min(stats[2], composite)
+            stats[3] = max(stats[3], composite)
+
+        self.composite_sum += milli
+        self.grade_dist[result["karma_grade"]] += 1
+        self.type_sketches[etype].add(milli)
+        for dim, score in result["scores"].items():
+            dim_milli = _milli(score)
+            self.dimension_sums[dim] += dim_milli
+            self.dimension_sketches[dim].add(dim_milli)
+
+        self.queue.offer(composite, seq, result)
+        self._queue_for(self.type_queues, etype).offer(composite, seq, result)
+        self._queue_for(self.dimension_queues, weakest_dimension(result)).offer(composite, seq, result)
+        self.count += 1
+
+    def _queue_for(self, queues: Dict[str, BottomK], key: str) -> BottomK:
+        queue = queues.get(key)
+        if queue is None:
+            queue = queues[key] = BottomK(self.queue_size)
+        return queue
+
+    def merge(self, other: "KarmaAggregator") -> None:
+        """Fold in a partial aggregate built with global seq numbers."""
+        self.count += other.count
+        self.composite_sum += other.composite_sum
+        for etype, (n, total, lo, hi) in other.type_stats.items():
+            stats = self.type_stats.get(etype)
+            if stats is None:
+                self.type_stats[etype] = [n, total, lo, hi]
+            else:
+                stats[0] += n
+                stats[1] += total
+                stats[2] = min(stats[2], lo)
+                stats[3] = max(stats[3], hi)
+        for grade, n in other.grade_dist.items():
+            self.grade_dist[grade] += n
+        for dim, total in other.dimension_sums.items():
+            self.dimension_sums[dim] += total
+        self.queue.merge(other.queue)
+        for key, queue in other.type_queues.items():
+            self._queue_for(self.type_queues, key).merge(queue)
+        for key, queue in other.dimension_queues.items():
+            self._queue_for(self.dimension_queues, key).merge(queue)
+        for etype, sketch in other.type_sketches.items():
+            self.type_sketches[etype].merge(sketch)
+        for dim, sketch in other.dimension_sketches.items():
+            self.dimension_sketches[dim].merge(sketch)
+
+    def bottom(self) -> List[dict]:
+        """Lowest-scoring results, worst first."""
+        return [r for _, r in self.queue.items()]
+
+    def report(self) -> dict:
+        type_stats = {etype: [n, total / 1000, lo, hi] for etype, (n, total, lo, hi) in self.type_stats.items()}
+        dimension_sums = {dim: total / 1000 for dim, total in self.dimension_sums.items()}
+        return build_report(
+            self.count, self.composite_sum / 1000, type_stats, self.grade_dist, dimension_sums,
+            self.queue.items(),
+            {etype: q.items() for etype, q in self.type_queues.items()},
+            {dim: q.items() for dim, q in self.dimension_queues.items()},
+            self.type_sketches, self.dimension_sketches,
+        )
+
+
+def format_cursor(composite: float, seq: int) -> str:
+    """Opaque pagination cursor: the (karma, position) of the last item seen."""
+    return f"{composite:.3f}:{seq}"
+
+
+def parse_cursor(cursor: str) -> Tuple[float, int]:
+    composite, _, seq = cursor.partition(":")
+    try:
+        return float(composite), int(seq)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r} (expected '<karma>:<position>')")
+
+
+def queue_entry(seq: int, result: dict) -> dict:
+    """Enrichment queue row for a scored result at global position seq."""
+    return {
+        "entity_id": result["entity_id"],
+        "entity_type": result["entity_type"],
+        "name": result["entity_name"],
+        "karma": result["karma_composite"],
+        "grade": result["karma_grade"],
+        "weakest_dimension": weakest_dimension(result),
+        "cursor": format_cursor(result["karma_composite"], seq),
+    }
 
-    entities = graph.get("entities", [])
-    print(f"KarMA Assessment: Scoring {len(entities)} entities...")
 
-    results = []
-    type_scores = defaultdict(list)
+def build_report(count: int, composite_sum: float, type_stats: Dict[str, list],
+                 grade_dist: Dict[str, int], dimension_sums: Dict[str, float],
+                 bottom: List[Tuple[int, dict]],
+                 bottom_by_type: Dict[str, List[Tuple[int, dict]]],
+                 bottom_by_dimension: Dict[str, List[Tuple[int, dict]]],
+                 type_sketches: Dict[str, ScoreSketch],
+                 dimension_sketches: Dict[str, ScoreSketch]) -> dict:
+    """Assemble the KarMA report from aggregate state (row or columnar path).
 
-    for entity in entities:
-        karma = compute_karma_score(entity)
-        results.append(karma)
-        type_scores[entity.get("entity_type", "unknown")].append(karma["karma_composite"])
+    Queues are (seq, result) lists, lowest karma first."""
+    enterprise_sketch = ScoreSketch()
+    for sketch in type_sketches.values():
+        enterprise_sketch.merge(sketch)
 
-    # Aggregate by type
     type_summary = {}
-    for etype, scores in sorted(type_scores.items()):
+    for etype, (n_type, total, lo, hi) in sorted(type_stats.items()):
         type_summary[etype] = {
-            "count": len(scores),
-            "mean_karma": round(sum(scores) / len(scores), 3),
-            "min_karma": round(min(scores), 3),
-            "max_karma": round(max(scores), 3),
-            "grade": grade_karma(sum(scores) / len(scores)),
+            "count": n_type,
+            "mean_karma": round(total / n_type, 3),
+            "min_karma": round(lo, 3),
+            "max_karma": round(hi, 3),
+            "grade": grade_karma(total / n_type),
         }
 
-    # Enterprise aggregate
-    all_scores = [r["karma_composite"] for r in results]
-    enterprise_mean = sum(all_scores) / len(all_scores) if all_scores else 0
-
-    # Grade distribution
-    grade_dist = defaultdict(int)
-    for r in results:
-        grade_dist[r["karma_grade"]] += 1
+    enterprise_mean = composite_sum / count if count else 0
+    n = count or 1
 
-    # Bottom 20 entities (enrichment priority)
-    bottom_20 = sorted(results, key=lambda x: x["karma_composite"])[:20]
-
-    report = {
+    return {
         "assessment_date": ASSESSMENT_DATE,
         "assessed_by": "KarMA v1.0 — hc-enterprise-kg Quality Module",
-        "total_entities": len(entities),
+        "total_entities": count,
         "enterprise_karma": {
             "mean": round(enterprise_mean, 3),
             "grade": grade_karma(enterprise_mean),
         },
         "grade_distribution": dict(sorted(grade_dist.items())),
         "type_summary": type_summary,
-        "enrichment_priority_queue": [
-            {
-                "entity_id": r["entity_id"],
-                "entity_type": r["entity_type"],
-                "name": r["entity_name"],
-                "karma": r["karma_composite"],
-                "grade": r["karma_grade"],
-                "weakest_dimension": min(r["scores"], key=r["scores"].get),
-            }
-            for r in bottom_20
-        ],
+        "enrichment_priority_queue": [queue_entry(seq, r) for seq, r in bottom],
+        "enrichment_queues": {
+            "by_type": {
+                etype: [queue_entry(seq, r) for seq, r in queue]
+                for etype, queue in sorted(bottom_by_type.items())
+            },
+            "by_weakest_dimension": {
+                dim: [queue_entry(seq, r) for seq, r in bottom_by_dimension[dim]]
+                for dim in DIMENSIONS if dim in bottom_by_dimension
+            },
+        },
         "dimension_averages": {
-            "completeness": round(sum(r["scores"]["completeness"] for r in results) / len(results), 3),
-            "confidence": round(sum(r["scores"]["confidence"] for r in results) / len(results), 3),
-            "freshness": round(sum(r["scores"]["freshness"] for r in results) / len(results), 3),
-            "source_quality": round(sum(r["scores"]["source_quality"] for r in results) / len(results), 3),
-            "gap_coverage": round(sum(r["scores"]["gap_coverage"] for r in results) / len(results), 3),
+            dim: round(dimension_sums[dim] / n, 3) for dim in DIMENSIONS
+        },
+        "distribution": {
+            "enterprise": enterprise_sketch.summary(),
+            "by_type": {etype: type_sketches[etype].summary() for etype in sorted(type_sketches)},
+            "by_dimension": {dim: dimension_sketches[dim].summary() for dim in DIMENSIONS if dim in dimension_sketches},
         },
     }
 
+
+def page_priority_queue(results: Iterable[dict], limit: int = 50, after: Optional[str] = None,
+                        entity_type: Optional[str] = None, weakest: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """Next page of the enrichment queue from a stream of scored results.
+
+    Streams once with a BottomK of size limit, skipping everything at or
+    before the cursor, so no full sort is needed. Positions are stream
+    order, i.e. the order of karma_entity_scores.json. Returns the page and
+    the cursor for the following page (None when exhausted)."""
+    floor = parse_cursor(after) if after else None
+    selector = BottomK(limit)
+    for seq, result in enumerate(results):
+        if entity_type and result["entity_type"] != entity_type:
+            continue
+        if weakest and weakest_dimension(result) != weakest:
+            continue
+        if floor and (result["karma_composite"], seq) <= floor:
+            continue
+        selector.offer(result["karma_composite"], seq, result)
+
+    page = [queue_entry(seq, r) for seq, r in selector.items()]
+    next_cursor = page[-1]["cursor"] if len(page) == limit else None
+    return page, next_cursor
+
+
+class EntityScoreWriter:
+    """Stream results into a JSON array, byte-identical to json.dump(results, indent=2)."""
+    def __init__(self, path: Path):
+        self._f = open(path, "w")
+        self._f.write("[")
+        self._empty = True
+
+    def write(self, result: dict) -> None:
+        self.write_encoded(textwrap.indent(json.dumps(result, indent=2), "  "))
+
+    def write_encoded(self, block: str) -> None:
+        """Write one result already encoded exactly as write() encodes it."""
+        self._f.write("\n" if self._empty else ",\n")
+        self._f.write(block)
+        self._empty = False
+
+    def close(self) -> None:
+        self._f.write("]" if self._empty else "\n]")
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── Columnar mode ───────────────────────────────────────────────────────────
+# Raw inputs are extracted once into flat columns; the five dimensions, the
+# composite, grades and all aggregates are then computed with NumPy array
+# operations. Per-entity Python work is limited to the extraction pass
+# (completeness is counted inside the schema learning walk) and to filling
+# the per-entity scores file from preformatted columns. Presence of a JSON
+# value is a Python-level test, so extraction cannot be vectorized further;
+# json.load of graph.json is most of what remains.
+
+GRADES = ("A", "B", "C", "D", "F")
+GRADE_THRESHOLDS = (0.85, 0.70, 0.55, 0.40)
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        print("ERROR: --columnar requires numpy (pip install numpy)")
+        sys.exit(1)
+    return numpy
+
+
+def _label_codes(mapping: dict) -> Tuple[Dict[Any, int], List[float]]:
+    """Code 0 = not in mapping (contributes nothing); codes 1.. index the values."""
+    codes = {label: i + 1 for i, label in enumerate(mapping)}
+    return codes, [0.0] + list(mapping.values())
+
+
+def _round3(np, values):
+    """Python round(x, 3) elementwise.
+
+    rint(x * 1000) / 1000 is the double round() returns unless x * 1000
+    lands within rounding error of a half: 0.8875 is stored just below it,
+    so round() gives 0.887, but the product rounds up to exactly 887.5 and
+    rint gives 888. Those few elements are rounded by round() itself."""
+    scaled = values * 1000
+    rounded = np.rint(scaled) / 1000
+    near = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if len(near):
+        rounded[near] = [round(v, 3) for v in values[near].tolist()]
+    return rounded
+
+
+def extract_karma_columns(entities: List[dict], schema: Optional[CompletenessSchema] = None,
+                          relationships: Optional[List[dict]] = None) -> dict:
+    """Collect the raw scoring inputs as flat lists, one list per input.
+
+    Completeness counts come out of the schema learning walk itself
+    (CompletenessSchema.learn_counts); a supplied schema is counted per
+    entity."""
+    conf_codes, conf_values = _label_codes({k: v for k, v in CONFIDENCE_MAP.items() if k})
+    acc_codes, acc_values = _label_codes(ACCURACY_MAP)
+    tim_codes, tim_values = _label_codes(TIMELINESS_MAP)
+    con_codes, con_values = _label_codes(CONSISTENCY_MAP)
+
+    if schema is None:
+        schema, populated = CompletenessSchema.learn_counts(entities)
+        type_total = {etype: len(paths) for etype, paths in schema.leaves.items()}
+        total = [type_total[e.get("entity_type")] for e in entities]
+    else:
+        counts = [schema.counts(e) for e in entities]
+        populated = [p for p, _ in counts]
+        total = [t for _, t in counts]
+
+    provs = [e.get("provenance", {}) for e in entities]
+    dqss = [prov.get("data_quality_score", {}) for prov in provs]
+    gaps = [prov.get("known_data_gaps", []) or [] for prov in provs]
+    pcts = [dqs.get("completeness_pct") for dqs in dqss]
+
+    cols = {
+        "populated": populated,
+        "total": total,
+        "confidence": [conf_codes.get(prov.get("confidence_level", ""), 0) for prov in provs],
+        "dq_pct": [float("nan") if pct is None else pct for pct in pcts],
+        "accuracy": [acc_codes.get(dqs.get("accuracy_confidence", ""), 0) for dqs in dqss],
+        "timeliness": [tim_codes.get(dqs.get("timeliness_score", ""), 0) for dqs in dqss],
+        "consistency": [con_codes.get(dqs.get("consistency_score", ""), 0) for dqs in dqss],
+        "n_gaps": [len(g) for g in gaps],
+        "n_plan": [sum(1 for g in gs if g.get("remediation_plan")) if gs else 0 for gs in gaps],
+        "n_priority": [sum(1 for g in gs if g.get("priority")) if gs else 0 for gs in gaps],
+    }
+    cols["freshness_basis"] = TemporalIndex.from_entities(entities).coalesce("last_review_date", "last_assessed_date")
+    cols["relational_consistency"] = consistency_column(entities, relationships or [])
+    cols["lookups"] = {"confidence": conf_values, "accuracy": acc_values,
+                       "timeliness": tim_values, "consistency": con_values}
+    return cols
+
+
+def score_karma_columns(cols: dict) -> dict:
+    """Vectorized Scores 1-6, composite and grade codes as NumPy arrays."""
+    np = _require_numpy()
+    lookups = cols["lookups"]
+
+    populated = np.asarray(cols["populated"], dtype=np.float64)
+    total = np.asarray(cols["total"], dtype=np.float64)
+    completeness = np.divide(populated, total, out=np.zeros_like(total), where=total > 0)
+
+    confidence = np.asarray(lookups["confidence"])[np.asarray(cols["confidence"], dtype=np.intp)]
+
+    basis = np.asarray(cols["freshness_basis"], dtype=np.int64)
+    days_old = ASSESSMENT_ORDINAL - basis
+    freshness = np.select(
+        [basis <= 0, days_old <= 7, days_old <= 30, days_old <= 90, days_old <= 180, days_old <= 365],
+        [0.0, 1.0, 0.9, 0.75, 0.5, 0.25],
+        default=0.1,
+    )
+
+    # Score 4: mean of whichever sub-scores are present, summed in the row order
+    pct = np.asarray(cols["dq_pct"], dtype=np.float64)
+    has_pct = ~np.isnan(pct)
+    parts = [np.where(has_pct, np.minimum(np.nan_to_num(pct) / 100.0, 1.0), 0.0)]
+    present = has_pct.astype(np.int64)
+    for name in ("accuracy", "timeliness", "consistency"):
+        codes = np.asarray(cols[name], dtype=np.intp)
+        parts.append(np.asarray(lookups[name])[codes])
+        present += codes > 0
+    sq_sum = parts[0] + parts[1] + parts[2] + parts[3]
+    source_quality = np.divide(sq_sum, present, out=np.zeros_like(sq_sum), where=present > 0)
+
+    # Score 5 is a graph-level column already
+    consistency = np.asarray(cols["relational_consistency"], dtype=np.float64)
+
+    # Score 6
+    n_gaps = np.asarray(cols["n_gaps"], dtype=np.float64)
+    safe_gaps = np.maximum(n_gaps, 1.0)
+    documented = 0.5 + (np.asarray(cols["n_plan"]) / safe_gaps * 0.3) + (np.asarray(cols["n_priority"]) / safe_gaps * 0.2)
+    undocumented = np.select([has_pct & (pct >= 90), has_pct & (pct >= 70)], [0.9, 0.5], default=0.2)
+    gap_coverage = np.where(n_gaps > 0, documented, undocumented)
+
+    w = DIMENSION_WEIGHTS
+    composite = (
+        completeness * w["completeness"]
+        + confidence * w["confidence"]
+        + freshness * w["freshness"]
+        + source_quality * w["source_quality"]
+        + consistency * w["consistency"]
+        + gap_coverage * w["gap_coverage"]
+    )
+    grade_code = np.select([composite >= t for t in GRADE_THRESHOLDS], [0, 1, 2, 3], default=4)
+
+    return {
+        "scores": {
+            "completeness": _round3(np, completeness),
+            "confidence": _round3(np, confidence),
+            "freshness": _round3(np, freshness),
+            "source_quality": _round3(np, source_quality),
+            "consistency": _round3(np, consistency),
+            "gap_coverage": _round3(np, gap_coverage),
+        },
+        "karma_composite": _round3(np, composite),
+        "grade_code": grade_code,
+    }
+
+
+# One result as EntityScoreWriter.write() lays it out; scores in DIMENSIONS order
+_SCORE_BLOCK = "\n".join([
+    "  {",
+    '    "entity_id": %s,',
+    '    "entity_type": %s,',
+    '    "entity_name": %s,',
+    '    "scores": {',
+    *[f'      "{dim}": %s{"," if dim != DIMENSIONS[-1] else ""}' for dim in DIMENSIONS],
+    "    },",
+    '    "karma_composite": %s,',
+    '    "karma_grade": "%s"',
+    "  }",
+])
+
+
+def write_score_columns(path: Path, entities: List[dict], scored: dict) -> None:
+    """Per-entity scores file from score_karma_columns() output.
+
+    Byte-identical to writing each row through EntityScoreWriter.write(),
+    but floats are formatted a column at a time and each object is filled
+    into a fixed template instead of going through the indenting encoder."""
+    floats = [list(map(float.__repr__, scored["scores"][dim].tolist())) for dim in DIMENSIONS]
+    floats.append(list(map(float.__repr__, scored["karma_composite"].tolist())))
+    grades = [GRADES[code] for code in scored["grade_code"].tolist()]
+    dumps = json.dumps
+    with EntityScoreWriter(path) as writer:
+        for e, values, grade in zip(entities, zip(*floats), grades):
+            writer.write_encoded(_SCORE_BLOCK % (
+                dumps(e.get("id")), dumps(e.get("entity_type")), dumps(e.get("name", "")[:60]),
+                *values, grade,
+            ))
+
+
+def run_karma_columnar(graph_path: str, entity_scores_path: Optional[Path] = None,
+                       schema: Optional[CompletenessSchema] = None, queue_size: int = 20,
+                       history_path: Optional[Path] = None) -> dict:
+    """Columnar KarMA assessment: same report as run_karma_assessment()."""
+    np = _require_numpy()
+    with open(graph_path) as f:
+        graph = json.load(f)
+
+    entities = graph.get("entities", [])
+    print(f"KarMA Assessment (columnar): Scoring {len(entities)} entities...")
+
+    scored = score_karma_columns(extract_karma_columns(entities, schema, graph.get("relationships", [])))
+    composite = scored["karma_composite"]
+    n = len(entities)
+
+    type_names = sorted({e.get("entity_type") or "unknown" for e in entities})
+    type_code = {t: i for i, t in enumerate(type_names)}
+    types = np.fromiter((type_code[e.get("entity_type") or "unknown"] for e in entities), dtype=np.intp, count=n)
+
+    counts = np.bincount(types, minlength=len(type_names))
+    # Sums in exact integer thousandths, as KarmaAggregator keeps them
+    milli = np.rint(composite * 1000).astype(np.int64)
+    sums = np.bincount(types, weights=milli, minlength=len(type_names)) / 1000
+    mins = np.full(len(type_names), np.inf)
+    maxs = np.full(len(type_names), -np.inf)
+    np.minimum.at(mins, types, composite)
+    np.maximum.at(maxs, types, composite)
+    type_stats = {
+        t: [int(counts[i]), float(sums[i]), float(mins[i]), float(maxs[i])]
+        for i, t in enumerate(type_names) if counts[i]
+    }
+
+    grade_counts = np.bincount(scored["grade_code"], minlength=len(GRADES))
+    grade_dist = {GRADES[i]: int(c) for i, c in enumerate(grade_counts) if c}
+    dimension_sums = {dim: int(np.rint(arr * 1000).astype(np.int64).sum()) / 1000
+                      for dim, arr in scored["scores"].items()}
+
+    def row(i: int) -> dict:
+        e = entities[i]
+        return {
+            "entity_id": e.get("id"),
+            "entity_type": e.get("entity_type"),
+            "entity_name": e.get("name", "")[:60],
+            "scores": {dim: float(arr[i]) for dim, arr in scored["scores"].items()},
+            "karma_composite": float(composite[i]),
+            "karma_grade": GRADES[scored["grade_code"][i]],
+        }
+
+    # Stable: ties keep entity order, as in the row path
+    order = np.argsort(composite, kind="stable")
+    bottom = [(int(i), row(i)) for i in order[:queue_size]]
+
+    def bottom_by(codes, labels) -> Dict[str, List[Tuple[int, dict]]]:
+        ranked = codes[order]
+        return {
+            label: [(int(i), row(i)) for i in order[ranked == code][:queue_size]]
+            for code, label in enumerate(labels) if (ranked == code).any()
+        }
+
+    dims = list(scored["scores"])
+    weakest = np.argmin(np.stack([scored["scores"][d] for d in dims]), axis=0)
+    by_type = bottom_by(types, type_names)
+    by_dimension = bottom_by(weakest, dims)
+
+    if entity_scores_path:
+        write_score_columns(entity_scores_path, entities, scored)
+
+    type_sketches = {}
+    for code, etype in enumerate(type_names):
+        values, counts = np.unique(milli[types == code], return_counts=True)
+        if len(values):
+            type_sketches[etype] = ScoreSketch(dict(zip(values.tolist(), counts.tolist())))
+    dimension_sketches = {}
+    for dim, arr in scored["scores"].items():
+        values, counts = np.unique(np.rint(arr * 1000).astype(np.int64), return_counts=True)
+        dimension_sketches[dim] = ScoreSketch(dict(zip(values.tolist(), counts.tolist())))
+
+    report = build_report(n, int(milli.sum()) / 1000, type_stats, grade_dist, dimension_sums,
+                          bottom, by_type, by_dimension, type_sketches, dimension_sketches)
+    if history_path:
+        snapshot = Snapshot()
+        for e, karma, code in zip(entities, composite.tolist(), scored["grade_code"].tolist()):
+            snapshot.write({"entity_id": e.get("id"), "karma_composite": karma, "karma_grade": GRADES[code]})
+        record_history(history_path, report, snapshot)
+    return report
+
+
+# ── Parallel mode ───────────────────────────────────────────────────────────
+
+def _score_partition(task: tuple) -> Tuple[KarmaAggregator, Optional[List[dict]]]:
+    """Worker: score one contiguous chunk into a partial aggregate.
+
+    task is (start, entities, freshness, consistency, schema, keep_results);
+    seq numbers are global positions so merged queue ties break as in the
+    serial path."""
+    start, entities, freshness, consistency, schema, keep_results = task
+    partial = KarmaAggregator()
+    results = [] if keep_results else None
+    for offset, (entity, fresh, consistent) in enumerate(zip(entities, freshness, consistency)):
+        karma = compute_karma_score(entity, fresh, schema, consistent)
+        partial.add(karma, seq=start + offset)
+        if keep_results:
+            results.append(karma)
+    return partial, results
+
+
+def iter_karma_partials(entities: List[dict], jobs: int, schema: Optional[CompletenessSchema] = None,
+                        keep_results: bool = False, relationships: Optional[List[dict]] = None
+                        ) -> Iterator[Tuple[KarmaAggregator, Optional[List[dict]]]]:
+    """Score fixed-size chunks across a process pool, yielding partials in entity order.
+
+    Graph-level columns (freshness, consistency) are computed once here."""
+    freshness = freshness_column(TemporalIndex.from_entities(entities))
+    consistency = consistency_column(entities, relationships or [])
+    schema = schema or CompletenessSchema.learn(entities)
+    chunk = max(1, -(-len(entities) // (jobs * 4)))
+    tasks = [
+        (i, entities[i:i + chunk], freshness[i:i + chunk], consistency[i:i + chunk], schema, keep_results)
+        for i in range(0, len(entities), chunk)
+    ]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_score_partition, tasks)
+
+
+def run_karma_assessment(graph_path: str, entity_scores_path: Optional[Path] = None,
+                         schema: Optional[CompletenessSchema] = None,
+                         store_path: Optional[Path] = None, jobs: int = 1,
+                         history_path: Optional[Path] = None) -> dict:
+    """Run full KarMA assessment on a graph in a single scoring pass.
+
+    Each entity is scored once; results stream into the aggregator and,
+    when entity_scores_path is given, into the per-entity scores file.
+    With store_path, unchanged entities reuse their cached dimensions and
+    the aggregates are rebuilt from those in the same pass. With jobs > 1,
+    chunks are scored in worker processes and their partial aggregates
+    merged; the report is identical to the serial one. With history_path,
+    the run is appended to the KarMA history store."""
+    # stat before reading: a file rewritten meanwhile only misses the fast path
+    signature = graph_signature(Path(graph_path)) if store_path else None
+    with open(graph_path) as f:
+        graph = json.load(f)
+
+    entities = graph.get("entities", [])
+    relationships = graph.get("relationships", [])
+    print(f"KarMA Assessment: Scoring {len(entities)} entities...")
+
+    aggregator = KarmaAggregator()
+    store = KarmaScoreStore(store_path) if store_path else None
+    writer = EntityScoreWriter(entity_scores_path) if entity_scores_path else None
+    snapshot = Snapshot() if history_path else None
+    sinks = [sink for sink in (writer, snapshot) if sink is not None]
+    try:
+        if jobs > 1:
+            for partial, results in iter_karma_partials(entities, jobs, schema, bool(sinks), relationships):
+                aggregator.merge(partial)
+                for karma in results or ():
+                    for sink in sinks:
+                        sink.write(karma)
+        else:
+            for karma in iter_karma_scores(entities, schema, store, relationships, signature):
+                aggregator.add(karma)
+                for sink in sinks:
+                    sink.write(karma)
+    finally:
+        if writer:
+            writer.close()
+        if store:
+            store.close()
+
+    if store:
+        print(f"  Incremental: {store.rescored} rescored, {store.reused} reused, "
+              f"{store.removed} removed ({store_path})")
+    report = aggregator.report()
+    if snapshot is not None:
+        record_history(history_path, report, snapshot)
     return report
 
 
+def record_history(history_path: Path, report: dict, snapshot: Snapshot) -> None:
+    history = KarmaHistory(history_path)
+    try:
+        run_id = history.record(report, snapshot, scorer_version=KARMA_HISTORY_VERSION)
+    finally:
+        history.close()
+    print(f"  History: recorded run {run_id} ({history_path})")
+
+
+# ── Sampled preview ─────────────────────────────────────────────────────────
+# Stratified by entity_type: scores a fixed-size sample regardless of graph
+# size and reports estimated means with 95% confidence intervals.
+
+# Estimates whose 95% CI half-width exceeds this are flagged as uncertain
+PREVIEW_MAX_HALF_WIDTH = 0.05
+
+# Two-sided 95% Student t critical values by degrees of freedom (1-30)
+_T95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+
+def _t95(df: int) -> float:
+    return _T95[df - 1] if df <= len(_T95) else 1.96
+
+
+def allocate_sample(strata: Dict[str, int], total: int, minimum: int) -> Dict[str, int]:
+    """Per-stratum sample sizes: proportional to stratum size, at least
+    minimum, never more than the stratum holds."""
+    population = sum(strata.values()) or 1
+    return {
+        key: min(size, max(minimum, round(total * size / population)))
+        for key, size in strata.items()
+    }
+
+
+def estimate_mean(values: List[float], population: int) -> dict:
+    """Sample mean with a 95% CI (t-based, finite population corrected)."""
+    n = len(values)
+    mean = sum(values) / n
+    if n >= population:
+        half_width = 0.0  # census: no sampling error
+    elif n < 2:
+        half_width = float("inf")
+    else:
+        variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+        half_width = _t95(n - 1) * (variance / n * (1 - n / population)) ** 0.5
+    return {"mean": mean, "half_width": half_width, "n": n, "population": population}
+
+
+def stratified_estimate(strata: Dict[str, dict], values: Dict[str, List[float]]) -> dict:
+    """Combine per-stratum samples into a population mean with a 95% CI.
+
+    strata maps key -> estimate_mean() result (for n/population); values
+    holds the sampled scores for the quantity being estimated."""
+    total = sum(e["population"] for e in strata.values())
+    mean = 0.0
+    variance = 0.0
+    for key, e in strata.items():
+        weight = e["population"] / total
+        vals = values[key]
+        n = len(vals)
+        m = sum(vals) / n
+        mean += weight * m
+        if n < e["population"]:
+            if n < 2:
+                variance = float("inf")
+                continue
+            s2 = sum((v - m) ** 2 for v in vals) / (n - 1)
+            variance += weight ** 2 * s2 / n * (1 - n / e["population"])
+    return {"mean": mean, "half_width": 1.96 * variance ** 0.5, "n": sum(len(v) for v in values.values()),
+            "population": total}
+
+
+def stored_learned_schema(store_path: Path, graph_path: Path) -> Optional[CompletenessSchema]:
+    """The schema the last --incremental run learned, if it read this same graph file."""
+    if not store_path.exists():
+        return None
+    store = KarmaScoreStore(store_path)
+    try:
+        signature, key = store.graph_state()
+        if key is None or signature != graph_signature(graph_path):
+            return None
+        return store.learned_schema(key)
+    finally:
+        store.close()
+
+
+def run_karma_preview(graph_path: str, sample_size: int = 400, min_per_type: int = 10,
+                      seed: Optional[int] = None, schema: Optional[CompletenessSchema] = None,
+                      store_path: Optional[Path] = None) -> dict:
+    """Score a stratified random sample and estimate KarMA means with 95% CIs.
+
+    Scoring work is bounded by the sample size, and the consistency pass
+    only indexes relationships touching a sampled entity. The graph file is
+    still parsed in full: strata sizes and neighbour attributes need every
+    record, and parsing dominates the cost.
+
+    The completeness schema is, in order: the one given, the one the last
+    --incremental run over this same graph file stored in store_path, or
+    learned from every entity (a key walk over the whole graph), because a
+    sample's narrower leaf sets would bias completeness upwards."""
+    with open(graph_path) as f:
+        graph = json.load(f)
+    entities = graph.get("entities", [])
+    by_type: Dict[str, List[int]] = defaultdict(list)
+    for i, e in enumerate(entities):
+        by_type[e.get("entity_type") or "unknown"].append(i)
+
+    rng = random.Random(seed)
+    allocation = allocate_sample({t: len(rows) for t, rows in by_type.items()}, sample_size, min_per_type)
+    sample = {t: sorted(rng.sample(by_type[t], k)) for t, k in allocation.items()}
+    rows = [i for t in sorted(sample) for i in sample[t]]
+    print(f"KarMA Preview: scoring a stratified sample of {len(rows)} of {len(entities)} entities...")
+
+    schema_source = "given"
+    if schema is None and store_path is not None:
+        schema = stored_learned_schema(store_path, Path(graph_path))
+        schema_source = "score store"
+    if schema is None:
+        schema = CompletenessSchema.learn(entities)
+        schema_source = "learned"
+
+    sampled_ids = {entities[i].get("id") for i in rows}
+    edges = [rel for rel in graph.get("relationships", [])
+             if rel.get("source_id") in sampled_ids or rel.get("target_id") in sampled_ids]
+    consistency = dict(zip(rows, consistency_column(entities, edges, rows)))
+    results = {i: compute_karma_score(entities[i], schema=schema, consistency=consistency[i]) for i in rows}
+
+    type_estimates = {}
+    composite_values = {}
+    dimension_values: Dict[str, Dict[str, List[float]]] = {dim: {} for dim in DIMENSIONS}
+    for etype in sorted(sample):
+        scored = [results[i] for i in sample[etype]]
+        composite_values[etype] = [r["karma_composite"] for r in scored]
+        for dim in DIMENSIONS:
+            dimension_values[dim][etype] = [r["scores"][dim] for r in scored]
+        est = estimate_mean(composite_values[etype], len(by_type[etype]))
+        est["uncertain"] = est["half_width"] > PREVIEW_MAX_HALF_WIDTH
+        type_estimates[etype] = est
+
+    enterprise = stratified_estimate(type_estimates, composite_values)
+    dimensions = {dim: stratified_estimate(type_estimates, dimension_values[dim]) for dim in DIMENSIONS}
+    for est in [enterprise, *dimensions.values()]:
+        est["uncertain"] = est["half_width"] > PREVIEW_MAX_HALF_WIDTH
+
+    return {
+        "assessment_date": ASSESSMENT_DATE,
+        "sample_size": len(rows),
+        "total_entities": len(entities),
+        "seed": seed,
+        "completeness_schema": schema_source,
+        "enterprise_karma": enterprise,
+        "dimension_estimates": dimensions,
+        "type_estimates": type_estimates,
+    }
+
+
+def print_preview(preview: dict) -> None:
+    def fmt(est: dict) -> str:
+        hw = est["half_width"]
+        ci = "±  n/a" if hw == float("inf") else f"± {hw:.3f}"
+        flag = "  ! uncertain" if est["uncertain"] else ""
+        return f"{est['mean']:.3f} {ci} [{est['n']:>4}/{est['population']:<5}]{flag}"
+
+    print(f"\n{'='*70}")
+    print(f"  KarMA Preview (sampled, 95% CI) — {preview['assessment_date']}")
+    print(f"{'='*70}")
+    print(f"\n  Completeness schema: {preview['completeness_schema']}")
+    print(f"\n  Enterprise KarMA estimate: {fmt(preview['enterprise_karma'])}")
+    print(f"\n  Dimension estimates:")
+    for dim, est in preview["dimension_estimates"].items():
+        print(f"    {dim:>16s}: {fmt(est)}")
+    print(f"\n  Type estimates (sorted by KarMA):")
+    for etype, est in sorted(preview["type_estimates"].items(), key=lambda x: x[1]["mean"]):
+        print(f"    {etype:>25s}: {fmt(est)}")
+    uncertain = [t for t, est in preview["type_estimates"].items() if est["uncertain"]]
+    if uncertain:
+        print(f"\n  {len(uncertain)} type(s) exceed ±{PREVIEW_MAX_HALF_WIDTH} — raise --sample or --min-per-type, "
+              f"or run a full assessment")
+
+
+def print_queue_page(scores_path: Path, args) -> int:
+    if not scores_path.exists():
+        print(f"ERROR: {scores_path} not found — run an assessment first")
+        return 1
+    with open(scores_path) as f:
+        results = json.load(f)
+    try:
+        page, next_cursor = page_priority_queue(results, args.limit, args.after, args.entity_type, args.weakest)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    for item in page:
+        print(f"  {item['entity_id']:>45s} | {item['karma']:.3f} ({item['grade']}) | weakest: {item['weakest_dimension']:>15s} | {item['name']}")
+    print(f"\n  {len(page)} entities" + (f" — next page: --after {next_cursor}" if next_cursor else " — end of queue"))
+    return 0
+
+
+def print_history_query(args) -> int:
+    if not args.history.exists():
+        print(f"ERROR: {args.history} not found — no runs recorded yet")
+        return 1
+    history = KarmaHistory(args.history)
+    try:
+        if args.trend:
+            rows = history.type_trend(args.trend, args.runs)
+            for r in rows:
+                print(f"  run {r['run_id']:>4} {r['recorded_at']} | {r['mean']:.3f} ({r['grade']}) "
+                      f"[{r['count']:>4} entities] range [{r['min']:.2f}-{r['max']:.2f}]")
+        elif args.entity_trend:
+            rows = history.entity_trend(args.entity_trend, args.runs)
+            for r in rows:
+                print(f"  run {r['run_id']:>4} {r['recorded_at']} | {r['karma']:.3f} ({r['grade']})")
+        else:
+            try:
+                rows = history.grade_changes(args.from_run, args.to_run, dropped=args.grade_changes == "dropped")
+            except (KeyError, ValueError) as e:
+                print(f"ERROR: {e.args[0]}")
+                return 1
+            for r in rows:
+                print(f"  {r['entity_id']:>45s} | {r['from_grade']} -> {r['to_grade']} "
+                      f"| {r['from_karma']:.3f} -> {r['to_karma']:.3f}")
+    finally:
+        history.close()
+    print(f"\n  {len(rows)} rows")
+    return 0
+
+
 def main():
     repo_root = Path(__file__).parent.parent
-    graph_path = repo_root / "graph.json"
 
+    parser = argparse.ArgumentParser(description="KarMA attribute reliability and maturity assessment")
+    parser.add_argument("--graph", type=Path, default=repo_root / "graph.json",
+                        help="Path to graph.json (default: repo root)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--columnar", action="store_true",
+                      help="Vectorized NumPy scoring for large graphs (requires numpy)")
+    mode.add_argument("--incremental", action="store_true",
+                      help="Rescore only new or changed entities, caching scores in --store")
+    mode.add_argument("--sample", type=int, metavar="N",
+                      help="Preview: score a stratified sample of ~N entities and print estimates "
+                           "with 95%% confidence intervals (writes no files). Still parses the whole "
+                           "graph; reuses the schema of the last --incremental run over the same file "
+                           "(from --store) or --completeness-schema, else learns it from every entity")
+    parser.add_argument("--min-per-type", type=int, default=10,
+                        help="Minimum sample per entity_type for --sample (default: 10)")
+    parser.add_argument("--seed", type=int, help="Random seed for --sample")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Score in N worker processes (default: 1, serial)")
+    parser.add_argument("--store", type=Path, default=repo_root / ".karma_store.sqlite",
+                        help="Score store for --incremental (default: .karma_store.sqlite)")
+    parser.add_argument("--completeness-schema", type=Path,
+                        help="JSON {entity_type: [dotted leaf paths]} to score completeness against "
+                             "(default: learned from the graph)")
+    page = parser.add_argument_group("enrichment queue paging (reads karma_entity_scores.json, no rescoring)")
+    page.add_argument("--page", action="store_true",
+                      help="Print the next page of the lowest-karma entities and exit")
+    page.add_argument("--type", dest="entity_type", help="Only entities of this entity_type")
+    page.add_argument("--weakest", choices=DIMENSIONS, help="Only entities whose weakest dimension is this")
+    page.add_argument("--limit", type=int, default=50, help="Page size (default: 50)")
+    page.add_argument("--after", help="Cursor from a previous page or report queue entry")
+    hist = parser.add_argument_group("run history (queries read the history store and exit)")
+    hist.add_argument("--history", type=Path, default=repo_root / ".karma_history.sqlite",
+                      help="History store each run is appended to (default: .karma_history.sqlite)")
+    hist.add_argument("--no-history", action="store_true", help="Do not record this run")
+    hist.add_argument("--trend", metavar="ENTITY_TYPE", help="Mean KarMA of a type over the last --runs runs")
+    hist.add_argument("--entity-trend", metavar="ENTITY_ID", help="KarMA of one entity over the last --runs runs")
+    hist.add_argument("--grade-changes", choices=("dropped", "improved"),
+                      help="Entities whose grade changed between --from-run and --to-run (default: last two)")
+    hist.add_argument("--runs", type=int, default=30, help="Trend window in runs (default: 30)")
+    hist.add_argument("--from-run", type=int)
+    hist.add_argument("--to-run", type=int)
+    args = parser.parse_args()
+    if args.limit < 1:
+        parser.error("--limit must be at least 1")
+    if args.page:
+        sys.exit(print_queue_page(repo_root / "karma_entity_scores.json", args))
+    if args.trend or args.entity_trend or args.grade_changes:
+        sys.exit(print_history_query(args))
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.sample is not None and (args.sample < 1 or args.min_per_type < 1):
+        parser.error("--sample and --min-per-type must be at least 1")
+    if args.jobs > 1 and (args.columnar or args.incremental or args.sample):
+        parser.error("--jobs applies to the default streaming mode only")
+
+    graph_path = args.graph
     if not graph_path.exists():
-        print("ERROR: graph.json not found")
+        print(f"ERROR: {graph_path} not found")
         sys.exit(1)
 
-    report = run_karma_assessment(str(graph_path))
+    entity_scores_path = repo_root / "karma_entity_scores.json"
+    schema = None
+    if args.completeness_schema:
+        with open(args.completeness_schema) as f:
+            schema = CompletenessSchema.declared(json.load(f))
+
+    if args.sample:
+        print_preview(run_karma_preview(str(graph_path), args.sample, args.min_per_type, args.seed, schema,
+                                        args.store))
+        return
+
+    history_path = None if args.no_history else args.history
+    if args.columnar:
+        report = run_karma_columnar(str(graph_path), entity_scores_path, schema, history_path=history_path)
+    else:
+        store_path = args.store if args.incremental else None
+        report = run_karma_assessment(str(graph_path), entity_scores_path, schema, store_path, args.jobs,
+                                      history_path)
 
     # Print summary
     print(f"\n{'='*70}")
@@ -356,6 +1783,9 @@ def main():
     print(f"{'='*70}")
     print(f"\n  Enterprise KarMA Score: {report['enterprise_karma']['mean']:.3f} (Grade: {report['enterprise_karma']['grade']})")
     print(f"  Total Entities Scored: {report['total_entities']}")
+    dist = report["distribution"]["enterprise"]
+    if dist["count"]:
+        print(f"  Distribution: p10 {dist['p10']:.3f} | p50 {dist['p50']:.3f} | p90 {dist['p90']:.3f}")
 
     print(f"\n  Grade Distribution:")
     for grade in ["A", "B", "C", "D", "F"]:
@@ -384,14 +1814,6 @@ def main():
         json.dump(report, f, indent=2)
     print(f"\n  Full report saved to: {report_path}")
 
-    # Save per-entity scores for GraphGuard cross-reference
-    entity_scores_path = repo_root / "karma_entity_scores.json"
-    # Re-run to get full entity list (or we could refactor to return it)
-    with open(graph_path) as f:
-        graph = json.load(f)
-    all_entity_results = [compute_karma_score(e) for e in graph["entities"]]
-    with open(entity_scores_path, "w") as f:
-        json.dump(all_entity_results, f, indent=2)
     print(f"  Entity scores saved to: {entity_scores_path}")
 
 
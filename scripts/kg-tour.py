@@ -6,16 +6,23 @@ Run this after install to get oriented with the graph and understand what
 questions it can answer for your data & AI strategy.
 
 Usage:
-    python3 scripts/kg-tour.py
+    python3 scripts/kg-tour.py            # interactive, one section at a time
+    python3 scripts/kg-tour.py --report   # everything at once, no prompts
+
+Answers come from an insight snapshot cached next to graph.json (written by
+kg-build.py, or on the first tour after the graph changes), so the tour does
+not rescan the graph per section.
 """
 
-import json
+import argparse
 import os
 import sys
 import textwrap
-from collections import Counter, defaultdict
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from kg_tour_insights import load_insights
+
 # ── locate graph.json ─────────────────────────────────────────────────────────
 REPO_ROOT = Path(__file__).parent.parent
 GRAPH_FILE = REPO_ROOT / "graph.json"
@@ -35,6 +42,7 @@ if not GRAPH_FILE.exists():
 # ── helpers ───────────────────────────────────────────────────────────────────
 
 WIDTH = 70
+INTERACTIVE = True
 
 def hr(char="─"):
     print(char * WIDTH)
@@ -60,6 +68,8 @@ def wrap(text, indent=2):
 
 def pause(prompt="  [ Press Enter to continue ]"):
     print()
+    if not INTERACTIVE:
+        return
     try:
         input(prompt)
     except (EOFError, KeyboardInterrupt):
@@ -79,42 +89,9 @@ def answer(text):
     print()
 
 
-# ── load graph ────────────────────────────────────────────────────────────────
-
-def load():
-    with open(GRAPH_FILE) as f:
-        data = json.load(f)
-    entities = data.get("entities", [])
-    relationships = data.get("relationships", [])
-    return entities, relationships
-
-
-# ── queries ───────────────────────────────────────────────────────────────────
-
-def by_type(entities):
-    d = defaultdict(list)
-    for e in entities:
-        d[e.get("entity_type", "unknown")].append(e)
-    return d
-
-def rels_by_type(relationships):
-    d = defaultdict(list)
-    for r in relationships:
-        d[r.get("relationship_type", "unknown")].append(r)
-    return d
-
-def find(entities, entity_id):
-    for e in entities:
-        if e.get("id") == entity_id:
-            return e
-    return None
-
-def name(entities, entity_id, fallback=None):
-    e = find(entities, entity_id)
-    return e.get("name", fallback or entity_id) if e else (fallback or entity_id)
-
-
 # ── tour sections ─────────────────────────────────────────────────────────────
+# Every number shown comes from the precomputed insight snapshot
+# (scripts/lib/kg_tour_insights.py); sections only render.
 
 def intro():
     header("Enterprise Knowledge Graph  ·  Orientation Tour")
@@ -129,24 +106,24 @@ def intro():
     pause()
 
 
-def at_a_glance(entities, relationships):
+def at_a_glance(insights):
     section("The Enterprise at a Glance")
-    typed = by_type(entities)
-    rtyped = rels_by_type(relationships)
+    g = insights["glance"]
+    typed = g["types"]
 
-    bullet("Total entities",      f"{len(entities):,}")
-    bullet("Total relationships", f"{len(relationships):,}")
+    bullet("Total entities",      f"{g['entities']:,}")
+    bullet("Total relationships", f"{g['relationships']:,}")
     print()
-    bullet("Systems",             f"{len(typed.get('system', [])):,}")
-    bullet("Data assets",         f"{len(typed.get('data_asset', [])):,}")
-    bullet("Controls",            f"{len(typed.get('control', [])):,}")
-    bullet("Policies",            f"{len(typed.get('policy', [])):,}")
-    bullet("Risks",               f"{len(typed.get('risk', [])):,}")
-    bullet("Regulations",         f"{len(typed.get('regulation', [])):,}")
-    bullet("People",              f"{len(typed.get('person', [])):,}")
-    bullet("Departments",         f"{len(typed.get('department', [])):,}")
+    bullet("Systems",             f"{typed['system']:,}")
+    bullet("Data assets",         f"{typed['data_asset']:,}")
+    bullet("Controls",            f"{typed['control']:,}")
+    bullet("Policies",            f"{typed['policy']:,}")
+    bullet("Risks",               f"{typed['risk']:,}")
+    bullet("Regulations",         f"{typed['regulation']:,}")
+    bullet("People",              f"{typed['person']:,}")
+    bullet("Departments",         f"{typed['department']:,}")
     print()
-    bullet("Relationship types",  f"{len(rtyped):,}")
+    bullet("Relationship types",  f"{g['relationship_types']:,}")
 
     print()
     wrap(
@@ -157,74 +134,51 @@ def at_a_glance(entities, relationships):
     pause()
 
 
-def data_landscape(entities, relationships):
+def data_landscape(insights):
     section("Question 1: What data do we actually have?")
 
     question("Which data assets are classified as restricted or confidential — "
              "and who owns them?")
 
-    assets = by_type(entities).get("data_asset", [])
-    class_counts = Counter()
-    pii_count = 0
-    regulated_count = 0
-
-    for a in assets:
-        cls = a.get("data_classification") or a.get("classification") or "unknown"
-        class_counts[cls.lower()] += 1
-        if a.get("pii_categories"):
-            pii_count += 1
-        if a.get("regulatory_applicability") or a.get("regulations"):
-            regulated_count += 1
-
-    for cls, count in sorted(class_counts.items(), key=lambda x: -x[1]):
+    d = insights["data_landscape"]
+    for cls, count in d["classifications"]:
         bullet(cls.capitalize(), f"{count} assets")
 
     print()
-    bullet("Assets containing PII",          f"{pii_count}")
-    bullet("Assets with regulatory mapping", f"{regulated_count} / {len(assets)}")
+    bullet("Assets containing PII",          f"{d['pii']}")
+    bullet("Assets with regulatory mapping", f"{d['regulated']} / {d['assets']}")
 
     print()
 
     # show a few restricted assets
-    restricted = [a for a in assets
-                  if (a.get("data_classification") or a.get("classification") or "").lower() == "restricted"][:5]
-    if restricted:
+    if d["restricted_sample"]:
         print("  Sample restricted assets:")
-        for a in restricted:
-            print(f"    - {a.get('name', a.get('id'))}")
+        for label in d["restricted_sample"]:
+            print(f"    - {label}")
 
     print()
     answer(
-        f"We have {len(assets)} cataloged data assets. {pii_count} contain PII. "
-        f"{regulated_count} have explicit regulatory obligations mapped. "
+        f"We have {d['assets']} cataloged data assets. {d['pii']} contain PII. "
+        f"{d['regulated']} have explicit regulatory obligations mapped. "
         "Every asset has a documented classification, storage system, and known gaps."
     )
     pause()
 
 
-def where_it_lives(entities, relationships):
+def where_it_lives(insights):
     section("Question 2: Where does the data live and how does it move?")
 
     question("Which systems store our most sensitive data — and are those "
              "systems connected to each other?")
 
-    rtyped = rels_by_type(relationships)
-    stores_rels = rtyped.get("stores", [])
-    integrates_rels = rtyped.get("integrates_with", [])
-    hosted_rels = rtyped.get("hosted_on", [])
-
-    bullet("'stores' relationships (system → data asset)", f"{len(stores_rels):,}")
-    bullet("'integrates_with' relationships",              f"{len(integrates_rels):,}")
-    bullet("'hosted_on' relationships (system → site)",    f"{len(hosted_rels):,}")
-
-    # most connected systems by stores
-    store_counts = Counter(r["source_id"] for r in stores_rels)
-    top_systems = store_counts.most_common(5)
+    w = insights["where_it_lives"]
+    bullet("'stores' relationships (system → data asset)", f"{w['stores']:,}")
+    bullet("'integrates_with' relationships",              f"{w['integrates_with']:,}")
+    bullet("'hosted_on' relationships (system → site)",    f"{w['hosted_on']:,}")
 
     print()
     print("  Systems storing the most data assets:")
-    for sys_id, count in top_systems:
-        sys_name = name(entities, sys_id, sys_id)
+    for sys_name, count in w["top_systems"]:
         print(f"    - {sys_name[:55]:<55} ({count} assets)")
 
     print()
@@ -237,42 +191,20 @@ def where_it_lives(entities, relationships):
     pause()
 
 
-def regulatory_exposure(entities, relationships):
+def regulatory_exposure(insights):
     section("Question 3: What are we allowed to do with our data?")
 
     question("If we want to build an AI model on our operational data — "
              "which datasets can we legally use, and which are off-limits?")
 
-    assets = by_type(entities).get("data_asset", [])
-
-    gdpr, ccpa, fedramp, hipaa, pci = [], [], [], [], []
-    ai_restricted = []
-
-    for a in assets:
-        regs = []
-        for r in (a.get("regulatory_applicability") or []):
-            regs.append((r.get("regulation_name") or r.get("regulation_id") or "").upper())
-        for r in (a.get("regulations") or []):
-            regs.append(str(r).upper())
-
-        reg_str = " ".join(regs)
-        if "GDPR" in reg_str:       gdpr.append(a)
-        if "CCPA" in reg_str:       ccpa.append(a)
-        if "FEDRAMP" in reg_str:    fedramp.append(a)
-        if "HIPAA" in reg_str:      hipaa.append(a)
-        if "PCI" in reg_str:        pci.append(a)
-
-        ai = a.get("ai_training_usage") or {}
-        if ai.get("eu_ai_act_risk_category") in ("High", "Limited", "Minimal"):
-            ai_restricted.append(a)
-
-    bullet("Assets subject to GDPR",     f"{len(gdpr)}")
-    bullet("Assets subject to CCPA",     f"{len(ccpa)}")
-    bullet("Assets subject to FedRAMP",  f"{len(fedramp)}")
-    bullet("Assets subject to HIPAA",    f"{len(hipaa)}")
-    bullet("Assets subject to PCI DSS",  f"{len(pci)}")
+    r = insights["regulatory_exposure"]
+    bullet("Assets subject to GDPR",     f"{r['gdpr']}")
+    bullet("Assets subject to CCPA",     f"{r['ccpa']}")
+    bullet("Assets subject to FedRAMP",  f"{r['fedramp']}")
+    bullet("Assets subject to HIPAA",    f"{r['hipaa']}")
+    bullet("Assets subject to PCI DSS",  f"{r['pci']}")
     print()
-    bullet("Assets with EU AI Act risk classification", f"{len(ai_restricted)}")
+    bullet("Assets with EU AI Act risk classification", f"{r['ai_act']}")
 
     print()
     answer(
@@ -284,33 +216,24 @@ def regulatory_exposure(entities, relationships):
     pause()
 
 
-def risk_and_control(entities, relationships):
+def risk_and_control(insights):
     section("Question 4: What risk does our data create?")
 
     question("Which of our security controls are actually mapped to the "
              "risks they're supposed to address?")
 
-    rtyped = rels_by_type(relationships)
-    mitigates_rels = rtyped.get("mitigates", [])
-
-    risks = by_type(entities).get("risk", [])
-    controls = by_type(entities).get("control", [])
-
-    covered_risk_ids = set(r["target_id"] for r in mitigates_rels)
-    uncovered = [r for r in risks if r.get("id") not in covered_risk_ids]
-    covered   = [r for r in risks if r.get("id") in covered_risk_ids]
-
-    bullet("Total risks",                     f"{len(risks)}")
-    bullet("Risks with controls mapped",      f"{len(covered)}")
-    bullet("Risks with NO controls mapped",   f"{len(uncovered)}  ← gap")
-    bullet("Total controls in graph",         f"{len(controls):,}")
-    bullet("Active mitigates relationships",  f"{len(mitigates_rels)}")
+    r = insights["risk_and_control"]
+    bullet("Total risks",                     f"{r['risks']}")
+    bullet("Risks with controls mapped",      f"{r['covered']}")
+    bullet("Risks with NO controls mapped",   f"{r['uncovered']}  ← gap")
+    bullet("Total controls in graph",         f"{r['controls']:,}")
+    bullet("Active mitigates relationships",  f"{r['mitigates']}")
 
-    if uncovered:
+    if r["uncovered_sample"]:
         print()
         print("  Risks with zero control coverage:")
-        for r in uncovered[:8]:
-            print(f"    - {r.get('name', r.get('id'))}")
+        for label in r["uncovered_sample"]:
+            print(f"    - {label}")
 
     print()
     answer(
@@ -321,40 +244,22 @@ def risk_and_control(entities, relationships):
     pause()
 
 
-def ai_readiness(entities, relationships):
+def ai_readiness(insights):
     section("Question 5: Where does AI actually fit?")
 
     question("Which business capabilities have the data, systems, and "
              "regulatory clearance to support an AI use case right now?")
 
-    typed = by_type(entities)
-    rtyped = rels_by_type(relationships)
-
-    capabilities = typed.get("business_capability", [])
-    systems      = typed.get("system", [])
-    assets       = typed.get("data_asset", [])
-
-    # AI-related systems (name contains AI/ML keywords)
-    ai_keywords = ["ai", "ml", "model", "gpu", "inference", "llm", "generative",
-                   "intelligence", "run:ai", "raise", "ice", "rita", "launchpad"]
-    ai_systems = [s for s in systems
-                  if any(k in s.get("name","").lower() for k in ai_keywords)]
-
-    # Systems linked to data assets (have stores relationships)
-    systems_with_data = set(r["source_id"] for r in rtyped.get("stores", []))
-
-    # capabilities linked via supports
-    cap_with_systems = set(r["target_id"] for r in rtyped.get("supports", []))
-
-    bullet("AI/ML platform systems identified",   f"{len(ai_systems)}")
-    bullet("Systems with data assets linked",     f"{len(systems_with_data)}")
-    bullet("Business capabilities in graph",      f"{len(capabilities)}")
-    bullet("Capabilities with system linkage",    f"{len(cap_with_systems)}")
+    a = insights["ai_readiness"]
+    bullet("AI/ML platform systems identified",   f"{a['ai_systems']}")
+    bullet("Systems with data assets linked",     f"{a['systems_with_data']}")
+    bullet("Business capabilities in graph",      f"{a['capabilities']}")
+    bullet("Capabilities with system linkage",    f"{a['capabilities_supported']}")
 
     print()
     print("  AI/ML systems in the graph:")
-    for s in ai_systems[:8]:
-        print(f"    - {s.get('name', s.get('id'))}")
+    for label in a["ai_systems_sample"]:
+        print(f"    - {label}")
 
     print()
     answer(
@@ -451,15 +356,22 @@ def next_move():
 # ── main ──────────────────────────────────────────────────────────────────────
 
 def main():
-    entities, relationships = load()
+    global INTERACTIVE
+    parser = argparse.ArgumentParser(description="Orientation tour of the Enterprise Knowledge Graph")
+    parser.add_argument("--report", action="store_true",
+                        help="Print every section at once, without pausing")
+    args = parser.parse_args()
+    INTERACTIVE = not args.report
+
+    insights = load_insights(GRAPH_FILE)
 
     intro()
-    at_a_glance(entities, relationships)
-    data_landscape(entities, relationships)
-    where_it_lives(entities, relationships)
-    regulatory_exposure(entities, relationships)
-    risk_and_control(entities, relationships)
-    ai_readiness(entities, relationships)
+    at_a_glance(insights)
+    data_landscape(insights)
+    where_it_lives(insights)
+    regulatory_exposure(insights)
+    risk_and_control(insights)
+    ai_readiness(insights)
     strategy_questions()
     next_move()
 
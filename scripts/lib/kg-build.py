@@ -6,11 +6,13 @@ Usage:
     python3 kg-build.py <data-dir> <graph.json>
 
 Reads:
-    <data-dir>/entities/*.json       — arrays of entities by type
+    <data-dir>/entities/*.json       — arrays of entities by type (sparse
+                                       financial_profile blocks are expanded)
     <data-dir>/relationships/*.json  — arrays of relationships by type
 
 Writes:
     <graph.json>  — single combined graph file (gitignored in data repo)
+    <graph>.tour-snapshot.json — precomputed kg-tour answers for this graph
 
 The MCP server reads this file and auto-reloads when its mtime changes.
 """
@@ -19,6 +21,10 @@ import json
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+from kg_financial_profile import expand_entities
+from kg_tour_insights import write_snapshot
+
 
 def build(data_dir: Path, output_path: Path) -> None:
     entities: list[dict] = []
@@ -32,6 +38,7 @@ def build(data_dir: Path, output_path: Path) -> None:
                 if not isinstance(data, list):
                     print(f"WARNING: {f} is not a JSON array — skipping", file=sys.stderr)
                     continue
+                expand_entities(data)
                 entities.extend(data)
             except json.JSONDecodeError as e:
                 print(f"WARNING: {f} has invalid JSON: {e} — skipping", file=sys.stderr)
@@ -50,7 +57,15 @@ def build(data_dir: Path, output_path: Path) -> None:
 
     graph = {"entities": entities, "relationships": relationships}
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(graph, indent=2) + "\n")
+    text = json.dumps(graph, indent=2) + "\n"
+    output_path.write_text(text)
+
+    # Precompute the tour answers while the graph is in memory; the tour
+    # recomputes them itself if this fails or the graph changes later
+    try:
+        write_snapshot(output_path, graph, text.encode())
+    except Exception as e:  # the build itself succeeded; never fail it over the snapshot
+        print(f"WARNING: tour snapshot not written: {type(e).__name__}: {e}", file=sys.stderr)
 
     print(
         f"Built: {len(entities)} entities, {len(relationships)} relationships"
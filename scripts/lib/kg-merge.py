@@ -15,6 +15,9 @@ Merge strategy:
 
 "Branch wins" means the team member's additions/edits are always preserved.
 Conflicts are reported but never block the merge.
+
+financial_profile blocks are compared in full form, so a sparse and a dense
+copy of the same profile are not a conflict; output is written sparse.
 """
 
 import json
@@ -22,6 +25,9 @@ import sys
 from collections import defaultdict
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+from kg_financial_profile import encode_entities, expand_entities
+
 
 def load_dir(data_dir: Path) -> tuple[dict[str, dict], list[dict]]:
     """Return entities keyed by id, and flat relationship list."""
@@ -31,7 +37,9 @@ def load_dir(data_dir: Path) -> tuple[dict[str, dict], list[dict]]:
     entities_dir = data_dir / "entities"
     if entities_dir.exists():
         for f in sorted(entities_dir.glob("*.json")):
-            for entity in json.loads(f.read_text()):
+            data = json.loads(f.read_text())
+            expand_entities(data)
+            for entity in data:
                 entities[entity["id"]] = entity
 
     rels_dir = data_dir / "relationships"
@@ -76,6 +84,7 @@ def merge(base_dir: Path, branch_dir: Path, output_dir: Path) -> None:
     entities_out = output_dir / "entities"
     entities_out.mkdir(exist_ok=True)
     for etype, ents in sorted(by_type.items()):
+        encode_entities(ents)
         (entities_out / f"{etype}.json").write_text(json.dumps(ents, indent=2) + "\n")
 
     by_rel: dict[str, list] = defaultdict(list)
@@ -18,6 +18,8 @@ Output structure:
 
 Each output file is a JSON array of objects of that type.
 git diffs are now per-type, so two people editing different types never conflict.
+financial_profile blocks are written in sparse form (only non-default values);
+kg-build.py expands them back to the full template.
 """
 
 import json
@@ -25,6 +27,9 @@ import sys
 from collections import defaultdict
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+from kg_financial_profile import encode_entities
+
 
 def split(graph_path: Path, output_dir: Path) -> None:
     try:
@@ -51,6 +56,7 @@ def split(graph_path: Path, output_dir: Path) -> None:
     entities_dir.mkdir(parents=True, exist_ok=True)
 
     for etype, entities in sorted(by_type.items()):
+        encode_entities(entities)
         out = entities_dir / f"{etype}.json"
         out.write_text(json.dumps(entities, indent=2) + "\n")
 
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+kg_financial_facts.py — Columnar fact table extracted from financial_profile blocks.
+
+Every numeric value in a fiscal year block becomes one row
+
+    (entity_id, entity_type, fiscal_year, metric, value, confidence_tier)
+
+in a local SQLite file, indexed on metric and on entity_type. Nested
+sub-objects flatten to dotted metrics ("balance_sheet.cash"). Nulls are not
+stored, so the table only grows as enrichment fills in numbers.
+
+Facts are read straight from the per-type files (sparse or dense
+financial_profile, see kg_financial_profile.py). refresh() stats each
+entities/<type>.json and re-extracts only files whose size, mtime and then
+content digest changed; facts of deleted files are dropped.
+
+An entity id that occurs more than once counts once: the last record wins,
+in file order and then record order (the order kg-build concatenates them).
+Facts of the earlier records stay in the table marked shadowed and are left
+out of every query; refresh() lists the duplicated ids.
+
+Queries return packed columns (array.array), ready for vectorized work:
+numpy.frombuffer(cols["value"]) is a zero-copy float64 view, and pivot()
+aligns several metrics on one entity axis (NaN where missing).
+
+Usage:
+    from kg_financial_facts import FinancialFactStore
+
+    store = FinancialFactStore(".kg_financial_facts.sqlite")
+    store.refresh(Path("."))                       # incremental
+    store.totals("budget", fiscal_year="FY2024")   # per entity_type
+    ids, cols = store.pivot(["recurring_revenue", "cost_of_revenue"], "FY2024")
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from kg_financial_profile import ABSENT, FISCAL_YEAR_TEMPLATE, META_KEYS, is_sparse
+
+# Bump whenever extraction or the table layout changes; rebuilds the store from scratch
+FACTS_VERSION = "2"
+
+GROUP_COLUMNS = ("entity_type", "fiscal_year", "confidence_tier", "entity_id")
+
+_TABLES = ("facts", "entities", "files")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    entities INTEGER NOT NULL,
+    facts INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    file TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    records INTEGER NOT NULL,
+    PRIMARY KEY (entity_id, file)
+);
+CREATE TABLE IF NOT EXISTS facts (
+    file TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    entity_type TEXT NOT NULL,
+    fiscal_year TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    confidence_tier TEXT,
+    shadowed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS facts_metric ON facts (metric, fiscal_year, entity_type);
+CREATE INDEX IF NOT EXISTS facts_type ON facts (entity_type, metric);
+CREATE INDEX IF NOT EXISTS facts_entity ON facts (entity_id);
+CREATE INDEX IF NOT EXISTS facts_file ON facts (file);
+CREATE INDEX IF NOT EXISTS entities_file ON entities (file);
+"""
+
+
+def _numeric(value: Any) -> bool:
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value))
+
+
+def _leaves(block: dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """(dotted metric, value) for every numeric leaf; sparse bookkeeping keys skipped.
+
+    Sparse blocks omit template defaults, which are never numeric, so both
+    forms yield the same facts."""
+    for key, value in block.items():
+        if key in META_KEYS:
+            continue
+        if isinstance(value, dict):
+            yield from _leaves(value, f"{prefix}{key}.")
+        elif _numeric(value):
+            yield f"{prefix}{key}", float(value)
+
+
+def _tier(block: dict, sparse: bool) -> Optional[str]:
+    if "confidence_tier" in block or not sparse:
+        tier = block.get("confidence_tier")
+    elif "confidence_tier" in block.get(ABSENT, ()):
+        tier = None
+    else:
+        tier = FISCAL_YEAR_TEMPLATE["confidence_tier"]
+    return tier if isinstance(tier, str) else None
+
+
+def entity_facts(entity: dict, entity_type: str) -> Iterator[Tuple[str, str, str, str, float, Optional[str]]]:
+    """Fact rows (entity_id, entity_type, fiscal_year, metric, value, tier) for one entity."""
+    profile = entity.get("financial_profile")
+    entity_id = entity.get("id")
+    if not isinstance(profile, dict) or not isinstance(entity_id, str):
+        return
+    years = profile.get("fiscal_years")
+    if not isinstance(years, dict):
+        return
+    sparse = is_sparse(profile)
+    entity_type = entity.get("entity_type") or entity_type
+    for fiscal_year, block in years.items():
+        if not isinstance(block, dict):
+            continue
+        tier = _tier(block, sparse)
+        for metric, value in _leaves(block):
+            yield entity_id, entity_type, fiscal_year, metric, value, tier
+
+
+class FinancialFactStore:
+    """SQLite fact table of financial_profile values, refreshed per type file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        with self.conn:
+            if not row or row[0] != FACTS_VERSION:
+                for table in _TABLES:
+                    self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (FACTS_VERSION,))
+            self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ── Refresh ─────────────────────────────────────────────────────────────
+
+    def refresh(self, data_dir: Path) -> dict:
+        """Re-extract changed entities/*.json files; returns what was done."""
+        known = {name: (mtime, size, digest) for name, mtime, size, digest
+                 in self.conn.execute("SELECT name, mtime_ns, size, digest FROM files")}
+        files = sorted((data_dir / "entities").glob("*.json"))
+        refreshed, invalid, touched = [], [], 0
+        with self.conn:
+            for f in files:
+                st = f.stat()
+                prev = known.get(f.name)
+                if prev and prev[:2] == (st.st_mtime_ns, st.st_size):
+                    continue
+                data = f.read_bytes()
+                digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+                if prev and prev[2] == digest:
+                    # touched but identical: remember the new stat only
+                    self.conn.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE name = ?",
+                                      (st.st_mtime_ns, st.st_size, f.name))
+                    touched += 1
+                    continue
+                try:
+                    records = json.loads(data)
+                except ValueError:
+                    records = None
+                if not isinstance(records, list):
+                    # kg-build skips unreadable files too; their facts drop out until fixed
+                    invalid.append(f.name)
+                    records = []
+                # Last record per id wins within the file
+                latest, counts = {}, {}
+                for entity in records:
+                    if isinstance(entity, dict) and isinstance(entity.get("id"), str):
+                        latest[entity["id"]] = entity
+                        counts[entity["id"]] = counts.get(entity["id"], 0) + 1
+                rows = [(f.name, *fact) for entity in latest.values() for fact in entity_facts(entity, f.stem)]
+                self.conn.execute("DELETE FROM facts WHERE file = ?", (f.name,))
+                self.conn.execute("DELETE FROM entities WHERE file = ?", (f.name,))
+                self.conn.executemany("INSERT INTO facts (file, entity_id, entity_type, fiscal_year, metric,"
+                                      " value, confidence_tier) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self.conn.executemany("INSERT INTO entities VALUES (?, ?, ?)",
+                                      [(f.name, eid, n) for eid, n in counts.items()])
+                self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                                  (f.name, st.st_mtime_ns, st.st_size, digest, len(records), len(rows)))
+                refreshed.append(f.name)
+
+            live = {f.name for f in files}
+            removed = [name for name in known if name not in live]
+            for name in removed:
+                self.conn.execute("DELETE FROM facts WHERE file = ?", (name,))
+                self.conn.execute("DELETE FROM entities WHERE file = ?", (name,))
+                self.conn.execute("DELETE FROM files WHERE name = ?", (name,))
+            if refreshed or removed:
+                self._shadow()
+
+        return {
+            "files": len(files),
+            "refreshed": refreshed,
+            "touched": touched,
+            "removed": removed,
+            "invalid": invalid,
+            "duplicates": [eid for (eid,) in self.conn.execute(
+                "SELECT entity_id FROM entities GROUP BY entity_id HAVING SUM(records) > 1 ORDER BY entity_id")],
+            "facts": self.conn.execute("SELECT COUNT(*) FROM facts WHERE shadowed = 0").fetchone()[0],
+        }
+
+    def _shadow(self) -> None:
+        """Mark facts of ids also defined in a later file; only the last file's count."""
+        self.conn.execute("UPDATE facts SET shadowed = 0 WHERE shadowed = 1")
+        self.conn.execute(
+            "UPDATE facts SET shadowed = 1 WHERE file < ("
+            " SELECT MAX(e.file) FROM entities e WHERE e.entity_id = facts.entity_id)"
+            " AND entity_id IN (SELECT entity_id FROM entities GROUP BY entity_id HAVING COUNT(*) > 1)"
+        )
+
+    # ── Queries ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _where(**filters: Optional[str]) -> Tuple[str, tuple]:
+        """WHERE clause over the live (unshadowed) facts matching the given columns."""
+        clauses = [(f"{column} = ?", value) for column, value in filters.items() if value is not None]
+        return (" WHERE " + " AND ".join([c for c, _ in clauses] + ["shadowed = 0"]),
+                tuple(v for _, v in clauses))
+
+    def metrics(self) -> List[dict]:
+        """Every metric with its fact and entity counts, most populated first."""
+        rows = self.conn.execute(
+            "SELECT metric, COUNT(*), COUNT(DISTINCT entity_id) FROM facts WHERE shadowed = 0"
+            " GROUP BY metric ORDER BY COUNT(*) DESC, metric"
+        )
+        return [{"metric": m, "facts": n, "entities": e} for m, n, e in rows]
+
+    def value(self, entity_id: str, fiscal_year: str, metric: str) -> Optional[float]:
+        where, params = self._where(entity_id=entity_id, fiscal_year=fiscal_year, metric=metric)
+        row = self.conn.execute(f"SELECT value FROM facts{where}", params).fetchone()
+        return row[0] if row else None
+
+    def columns(self, metric: str, fiscal_year: Optional[str] = None,
+                entity_type: Optional[str] = None) -> Dict[str, Any]:
+        """One metric as columns: entity_id / entity_type / fiscal_year lists, value array('d')."""
+        where, params = self._where(metric=metric, fiscal_year=fiscal_year, entity_type=entity_type)
+        rows = self.conn.execute(
+            f"SELECT entity_id, entity_type, fiscal_year, value FROM facts{where}"
+            " ORDER BY entity_id, fiscal_year", params
+        ).fetchall()
+        return {
+            "entity_id": [r[0] for r in rows],
+            "entity_type": [r[1] for r in rows],
+            "fiscal_year": [r[2] for r in rows],
+            "value": array("d", (r[3] for r in rows)),
+        }
+
+    def pivot(self, metrics: List[str], fiscal_year: str,
+              entity_type: Optional[str] = None) -> Tuple[List[str], Dict[str, array]]:
+        """Entity ids having any of the metrics, and one aligned array('d') per metric (NaN if missing)."""
+        where, params = self._where(fiscal_year=fiscal_year, entity_type=entity_type)
+        marks = ", ".join("?" for _ in metrics)
+        rows = self.conn.execute(
+            f"SELECT entity_id, metric, value FROM facts{where}"
+            f" AND metric IN ({marks}) ORDER BY entity_id",
+            params + tuple(metrics),
+        ).fetchall()
+        ids = list(dict.fromkeys(r[0] for r in rows))
+        row_of = {eid: i for i, eid in enumerate(ids)}
+        cols = {m: array("d", [math.nan]) * len(ids) for m in metrics}
+        for eid, metric, value in rows:
+            cols[metric][row_of[eid]] = value
+        return ids, cols
+
+    def totals(self, metric: str, fiscal_year: Optional[str] = None,
+               entity_type: Optional[str] = None, by: str = "entity_type") -> List[dict]:
+        """count / sum / mean / min / max of a metric per group, largest sum first."""
+        if by not in GROUP_COLUMNS:
+            raise ValueError(f"cannot group by {by!r}; choose from {', '.join(GROUP_COLUMNS)}")
+        where, params = self._where(metric=metric, fiscal_year=fiscal_year, entity_type=entity_type)
+        rows = self.conn.execute(
+            f"SELECT {by}, COUNT(*), SUM(value), AVG(value), MIN(value), MAX(value) FROM facts{where}"
+            f" GROUP BY {by} ORDER BY SUM(value) DESC, {by}", params
+        )
+        keys = (by, "count", "sum", "mean", "min", "max")
+        return [dict(zip(keys, row)) for row in rows]
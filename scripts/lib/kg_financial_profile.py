@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+kg_financial_profile.py — Universal financial_profile template and its sparse on-disk form.
+
+Every entity of the 13 financial types carries the same financial_profile:
+currency/FX/update stamps plus fiscal_years, each fiscal year holding ~36 keys
+and six nested sub-objects that are almost all null. The per-type files store
+only what differs from that template; graph.json always holds the full form.
+
+    kg-split.py / kg-merge.py   encode_entities() before writing entities/*.json
+    kg-build.py                 expand_entities() after reading them
+
+Sparse form, marked by "_encoding": "sparse-v1" on the profile:
+    - keys whose value equals the template default are omitted
+    - nested template objects store only their differing keys, recursively
+      ({} for a fiscal year that is exactly the template)
+    - keys not in the template are stored as-is
+    - "_absent" lists template keys the original object did not have
+    - "_order" records the key order when it is not template order
+
+expand(encode(p)) == p, including key order, so split → build round-trips
+byte for byte. Validators can read the sparse form directly with
+sparse_keys() / sparse_values() instead of expanding it.
+
+Usage:
+    from kg_financial_profile import encode_entities, expand_entities
+
+    expand_entities(json.loads(path.read_text()))    # in place, returns count
+"""
+
+import copy
+from typing import Any, Dict, List, Tuple
+
+SPARSE = "sparse-v1"
+ENCODING = "_encoding"
+ABSENT = "_absent"
+ORDER = "_order"
+META_KEYS = frozenset((ENCODING, ABSENT, ORDER))
+
+
+class PerKey:
+    """Template for an object whose values all follow one template (fiscal_years)."""
+
+    def __init__(self, template: Dict[str, Any]):
+        self.template = template
+
+
+FISCAL_YEAR_TEMPLATE: Dict[str, Any] = {
+    "period_type": None,
+    "recurring_revenue": None,
+    "non_recurring_revenue": None,
+    "cost_of_revenue": None,
+    "operating_expense": None,
+    "capex": None,
+    "depreciation_amortization": None,
+    "headcount_cost": None,
+    "budget": None,
+    "spend_to_date": None,
+    "run_rate": None,
+    "run_rate_basis": None,
+    "intercompany_adjustment": None,
+    "fully_loaded_cost": None,
+    "fte_count": None,
+    "contractor_count": None,
+    "contract_value": None,
+    "debt_obligations": None,
+    "deferred_revenue": None,
+    "dso_days": None,
+    "dpo_days": None,
+    "forecast_revenue": None,
+    "forecast_cost": None,
+    "confidence_tier": "T4",
+    "confidence_rationale": "",
+    "allocation_method": "",
+    "fully_loaded_cost_method": None,
+    "consolidation_method": None,
+    "consolidation_scope": None,
+    "derived_confidence_tier": None,
+    "balance_sheet": {
+        "cash": None,
+        "accounts_receivable": None,
+        "ar_aging_0_30": None,
+        "ar_aging_31_60": None,
+        "ar_aging_61_90": None,
+        "ar_aging_90_plus": None,
+        "accounts_payable": None,
+        "inventory": None,
+        "fixed_assets": None,
+        "debt": None,
+        "equity": None,
+    },
+    "contract_detail": {
+        "start_date": None,
+        "end_date": None,
+        "contract_currency": None,
+        "contract_type": None,
+        "payment_schedule": None,
+        "auto_renewal": None,
+        "renewal_probability_pct": None,
+    },
+    "unit_economics": {
+        "units": None,
+        "revenue_per_unit": None,
+        "cost_per_unit": None,
+        "cac": None,
+        "ltv": None,
+        "monthly_churn_rate": None,
+        "nrr_pct": None,
+    },
+    "allocation_detail": {
+        "basis": None,
+        "parent_entity_id": None,
+        "allocation_pct": None,
+        "allocation_rationale": None,
+    },
+    "cost_of_revenue_detail": {
+        "hardware": None,
+        "cloud_infrastructure": None,
+        "support_labor": None,
+        "third_party_licenses": None,
+        "other": None,
+    },
+    "compliance_costs": {
+        "tax_provision": None,
+        "regulatory_cost": None,
+        "audit_cost": None,
+        "compliance_cost": None,
+    },
+}
+
+PROFILE_TEMPLATE: Dict[str, Any] = {
+    "currency": "USD",
+    "fx_rate": None,
+    "fx_rate_date": None,
+    "last_updated": None,
+    "updated_by": None,
+    "fiscal_years": PerKey(FISCAL_YEAR_TEMPLATE),
+}
+
+
+def fiscal_year_template() -> Dict[str, Any]:
+    """A fresh, fully populated fiscal year entry with all defaults."""
+    return copy.deepcopy(FISCAL_YEAR_TEMPLATE)
+
+
+def _default(template: Any) -> Any:
+    if isinstance(template, dict):
+        return {k: _default(v) for k, v in template.items()}
+    if isinstance(template, PerKey):
+        return {}
+    return template
+
+
+def _same(value: Any, default: Any) -> bool:
+    # type check keeps 0 / False / 0.0 distinct from each other
+    return type(value) is type(default) and value == default
+
+
+def _encode(value: Any, template: Any) -> Tuple[bool, Any]:
+    """(value equals the template default, sparse value)."""
+    if isinstance(template, dict) and isinstance(value, dict):
+        return _encode_object(value, template)
+    if isinstance(template, PerKey) and isinstance(value, dict):
+        out = {}
+        for k, v in value.items():
+            is_default, enc = _encode(v, template.template)
+            out[k] = {} if is_default else enc
+        return not value, out
+    return _same(value, template), value
+
+
+def _encode_object(value: dict, template: dict) -> Tuple[bool, dict]:
+    out = {}
+    for k, v in value.items():
+        if k in META_KEYS:
+            raise ValueError(f"reserved key {k!r} in financial_profile")
+        if k in template:
+            is_default, enc = _encode(v, template[k])
+            if not is_default:
+                out[k] = enc
+        else:
+            out[k] = v
+    absent = [k for k in template if k not in value]
+    if absent:
+        out[ABSENT] = absent
+    canonical = [k for k in template if k in value] + [k for k in value if k not in template]
+    if list(value) != canonical:
+        out[ORDER] = list(value)
+    return not out, out
+
+
+def _expand(value: Any, template: Any) -> Any:
+    if isinstance(template, dict) and isinstance(value, dict):
+        absent = set(value.get(ABSENT, ()))
+        out = {}
+        for k, t in template.items():
+            if k in absent:
+                continue
+            out[k] = _expand(value[k], t) if k in value else _default(t)
+        for k, v in value.items():
+            if k not in template and k not in META_KEYS:
+                out[k] = v
+        if ORDER in value:
+            order = [k for k in value[ORDER] if k in out]
+            out = {**{k: out[k] for k in order}, **out}
+        return out
+    if isinstance(template, PerKey) and isinstance(value, dict):
+        return {k: _expand(v, template.template) for k, v in value.items()}
+    return value
+
+
+def is_sparse(profile: Any) -> bool:
+    return isinstance(profile, dict) and profile.get(ENCODING) == SPARSE
+
+
+def encode_profile(profile: Any) -> Any:
+    """Sparse form of a universal-schema profile; anything else is returned unchanged."""
+    if (not isinstance(profile, dict) or is_sparse(profile)
+            or not isinstance(profile.get("fiscal_years"), dict)):
+        return profile
+    try:
+        _, sparse = _encode_object(profile, PROFILE_TEMPLATE)
+    except ValueError:
+        return profile
+    return {ENCODING: SPARSE, **sparse}
+
+
+def expand_profile(profile: Any) -> Any:
+    """Full template form of a sparse profile; anything else is returned unchanged."""
+    if not is_sparse(profile):
+        return profile
+    return _expand(profile, PROFILE_TEMPLATE)
+
+
+def encode_entities(entities: List[dict]) -> int:
+    """Encode every entity's financial_profile in place; returns how many changed."""
+    changed = 0
+    for entity in entities:
+        if isinstance(entity, dict) and "financial_profile" in entity:
+            sparse = encode_profile(entity["financial_profile"])
+            if sparse is not entity["financial_profile"]:
+                entity["financial_profile"] = sparse
+                changed += 1
+    return changed
+
+
+def expand_entities(entities: List[dict]) -> int:
+    """Expand every sparse financial_profile in place; returns how many changed."""
+    changed = 0
+    for entity in entities:
+        if isinstance(entity, dict) and is_sparse(entity.get("financial_profile")):
+            entity["financial_profile"] = expand_profile(entity["financial_profile"])
+            changed += 1
+    return changed
+
+
+# ── Reading the sparse form without expanding it ────────────────────────────
+
+def sparse_keys(value: dict, template: Dict[str, Any]) -> set:
+    """Keys the expanded object would have."""
+    absent = set(value.get(ABSENT, ()))
+    return ({k for k in template if k not in absent}
+            | {k for k in value if k not in template and k not in META_KEYS})
+
+
+def sparse_values(value: dict) -> List[Tuple[str, Any]]:
+    """(key, value) pairs that differ from the template default, in stored order."""
+    return [(k, v) for k, v in value.items() if k not in META_KEYS]
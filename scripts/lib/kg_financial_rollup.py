@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+kg_financial_rollup.py — Subtree sums of financial_profile metrics over the org hierarchy.
+
+Hierarchy edges (child -> parent) are taken from the relationship types and
+endpoint types in HIERARCHY_RULES: systems roll into their departments,
+departments and child units into organizational units, products into
+portfolios, initiatives into the units that fund them. For every fiscal year
+and metric,
+
+    rolled[n] = own[n] + sum(weight(c -> n) * rolled[c] for each child c)
+
+is computed in one bottom-up pass in topological order, so a subtree shared
+by several parents is summed once and reused. A child with several parents
+is split between them: the parent named in that fiscal year's
+allocation_detail gets allocation_pct, the other parents share the rest
+evenly; without an allocation every parent gets an even share (a sole
+parent named with allocation_pct below 100 gets only that share). Totals are
+therefore never double counted at a common ancestor. Edges that would close
+a cycle are dropped and listed in .cycles. An id defined on more than one
+entity resolves to its last record, as in the financial fact store; the
+ids are listed in .duplicates.
+
+update() takes changed entity records and recomputes only those entities
+and their ancestors; structural changes (new entities or edges) need a new
+FinancialRollup.
+
+Usage:
+    from kg_index import GraphIndex
+    from kg_financial_rollup import FinancialRollup
+
+    rollup = FinancialRollup(GraphIndex.from_graph(graph))
+    rollup.value("ou-001", "FY2024", "budget")              # subtree total
+    rollup.breakdown("ou-001", "FY2024", "budget")          # own + child shares
+    rollup.update([edited_department])                      # ancestors only
+"""
+
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from kg_index import GraphIndex
+
+ROLLUP_METRICS = ("budget", "operating_expense", "headcount_cost", "fte_count")
+
+# (relationship_type, end holding the parent, child entity_type, parent entity_type)
+HIERARCHY_RULES = (
+    ("managed_by", "target", "system", "department"),
+    ("located_in", "target", "department", "organizational_unit"),
+    ("located_in", "target", "organizational_unit", "organizational_unit"),
+    ("funded_by", "target", "initiative", "organizational_unit"),
+    ("belongs_to", "target", "product", "product_portfolio"),
+    ("contains", "source", "product", "product_portfolio"),
+)
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return float(value)
+    return None
+
+
+def _fiscal_years(entity: dict) -> dict:
+    profile = entity.get("financial_profile")
+    years = profile.get("fiscal_years") if isinstance(profile, dict) else None
+    return years if isinstance(years, dict) else {}
+
+
+def _metric(block: dict, metric: str) -> Optional[float]:
+    """A (possibly dotted) metric from a dense or sparse fiscal year block."""
+    value = block
+    for part in metric.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return _number(value)
+
+
+class FinancialRollup:
+    """Memoized bottom-up metric totals over the hierarchy DAG of one GraphIndex."""
+
+    def __init__(self, graph: GraphIndex, metrics: Iterable[str] = ROLLUP_METRICS,
+                 rules: Tuple[tuple, ...] = HIERARCHY_RULES):
+        self.graph = graph
+        self.metrics = tuple(metrics)
+        n = len(graph.entities)
+
+        # ── duplicated ids: the last record wins, earlier ones are shadowed ─
+        self.duplicates: List[str] = sorted(graph.duplicates)
+        self.row_of: Dict[str, int] = dict(graph.position)
+        self.shadowed = bytearray(n)
+        resolve = array("l", range(n))
+        for eid, rows in graph.duplicates.items():
+            self.row_of[eid] = rows[-1]
+            for row in rows[:-1]:
+                resolve[row] = rows[-1]
+                self.shadowed[row] = 1
+
+        # ── edges: one per distinct (child, parent) pair ────────────────────
+        types = [e.get("entity_type") for e in graph.entities]
+        self.edge_child = array("l")
+        self.edge_parent = array("l")
+        seen = set()
+        for rtype, parent_end, child_type, parent_type in rules:
+            for j in graph.rel_type_rows.get(rtype, ()):
+                s, t = graph.sources[j], graph.targets[j]
+                child, parent = (s, t) if parent_end == "target" else (t, s)
+                child = resolve[child] if child >= 0 else child
+                parent = resolve[parent] if parent >= 0 else parent
+                if (child < 0 or parent < 0 or child == parent or (child, parent) in seen
+                        or types[child] != child_type or types[parent] != parent_type):
+                    continue
+                seen.add((child, parent))
+                self.edge_child.append(child)
+                self.edge_parent.append(parent)
+
+        self.parent_edges: List[List[int]] = [[] for _ in range(n)]
+        self.child_edges: List[List[int]] = [[] for _ in range(n)]
+        for e, (c, p) in enumerate(zip(self.edge_child, self.edge_parent)):
+            self.parent_edges[c].append(e)
+            self.child_edges[p].append(e)
+
+        self.cycles: List[Tuple[str, str]] = []
+        self.order = self._topological_order()
+        self.rank = array("l", bytes(array("l").itemsize * n))
+        for i, row in enumerate(self.order):
+            self.rank[row] = i
+
+        # ── per fiscal year: edge weights; per (year, metric): columns ──────
+        self.weights: Dict[str, array] = {}
+        self.own: Dict[Tuple[str, str], array] = {}
+        self.reported: Dict[Tuple[str, str], bytearray] = {}
+        self.rolled: Dict[Tuple[str, str], array] = {}
+        self.rolled_reported: Dict[Tuple[str, str], bytearray] = {}
+
+        years = sorted({fy for row, e in enumerate(graph.entities) if not self.shadowed[row]
+                        for fy in _fiscal_years(e)})
+        for fy in years:
+            self._add_year(fy)
+        for row in range(n):
+            self._load_row(row)
+        self._recompute(self.order)
+
+    # ── structure ───────────────────────────────────────────────────────────
+
+    def _topological_order(self) -> List[int]:
+        """Entity rows with every child before its parents; cycle edges dropped."""
+        n = len(self.graph.entities)
+        state = bytearray(n)  # 0 new, 1 on stack, 2 done
+        order: List[int] = []
+        dropped = set()
+        for root in range(n):
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [(root, iter(self.child_edges[root]))]
+            while stack:
+                node, edges = stack[-1]
+                for e in edges:
+                    child = self.edge_child[e]
+                    if state[child] == 1:
+                        dropped.add(e)
+                    elif not state[child]:
+                        state[child] = 1
+                        stack.append((child, iter(self.child_edges[child])))
+                        break
+                else:
+                    stack.pop()
+                    state[node] = 2
+                    order.append(node)
+        if dropped:
+            ids = [e.get("id") for e in self.graph.entities]
+            self.cycles = [(ids[self.edge_child[e]], ids[self.edge_parent[e]]) for e in sorted(dropped)]
+            self.child_edges = [[e for e in edges if e not in dropped] for edges in self.child_edges]
+            self.parent_edges = [[e for e in edges if e not in dropped] for edges in self.parent_edges]
+        return order
+
+    def ancestors(self, rows: Iterable[int]) -> set:
+        """The rows and every row above them."""
+        found = set(rows)
+        frontier = list(found)
+        while frontier:
+            row = frontier.pop()
+            for e in self.parent_edges[row]:
+                parent = self.edge_parent[e]
+                if parent not in found:
+                    found.add(parent)
+                    frontier.append(parent)
+        return found
+
+    # ── values ──────────────────────────────────────────────────────────────
+
+    def _add_year(self, fy: str) -> None:
+        n = len(self.graph.entities)
+        self.weights[fy] = array("d", bytes(8 * len(self.edge_child)))
+        for metric in self.metrics:
+            self.own[fy, metric] = array("d", bytes(8 * n))
+            self.reported[fy, metric] = bytearray(n)
+            self.rolled[fy, metric] = array("d", bytes(8 * n))
+            self.rolled_reported[fy, metric] = bytearray(n)
+        for row in range(n):
+            self._load_weights(row, fy)
+
+    def _load_weights(self, row: int, fy: str) -> None:
+        edges = self.parent_edges[row]
+        if not edges:
+            return
+        weights = self.weights[fy]
+        block = _fiscal_years(self.graph.entities[row]).get(fy)
+        alloc = block.get("allocation_detail") if isinstance(block, dict) else None
+        named, pct = None, None
+        if isinstance(alloc, dict):
+            named = self.row_of.get(alloc.get("parent_entity_id"))
+            pct = _number(alloc.get("allocation_pct"))
+        if pct is not None and any(self.edge_parent[e] == named for e in edges):
+            share = min(max(pct, 0.0), 100.0) / 100.0
+            rest = (1.0 - share) / (len(edges) - 1) if len(edges) > 1 else 0.0
+            for e in edges:
+                weights[e] = share if self.edge_parent[e] == named else rest
+        else:
+            for e in edges:
+                weights[e] = 1.0 / len(edges)
+
+    def _load_row(self, row: int) -> None:
+        years = {} if self.shadowed[row] else _fiscal_years(self.graph.entities[row])
+        for fy in self.weights:
+            block = years.get(fy)
+            for metric in self.metrics:
+                value = _metric(block, metric) if isinstance(block, dict) else None
+                self.own[fy, metric][row] = value or 0.0
+                self.reported[fy, metric][row] = value is not None
+
+    def _recompute(self, rows: List[int]) -> None:
+        """Rolled totals for rows, which must be in topological order."""
+        child_edges, edge_child = self.child_edges, self.edge_child
+        for fy, weights in self.weights.items():
+            for metric in self.metrics:
+                own, rolled = self.own[fy, metric], self.rolled[fy, metric]
+                reported, rolled_reported = self.reported[fy, metric], self.rolled_reported[fy, metric]
+                for row in rows:
+                    total, seen = own[row], reported[row]
+                    for e in child_edges[row]:
+                        child = edge_child[e]
+                        if rolled_reported[child] and weights[e]:
+                            total += weights[e] * rolled[child]
+                            seen = 1
+                    rolled[row] = total
+                    rolled_reported[row] = seen
+
+    def update(self, entities: Iterable[dict]) -> dict:
+        """Replace changed entity records and recompute only them and their ancestors."""
+        changed, unknown = set(), []
+        for entity in entities:
+            row = self.row_of.get(entity.get("id"))
+            if row is None:
+                unknown.append(entity.get("id"))
+                continue
+            self.graph.entities[row] = entity
+            changed.add(row)
+            for fy in _fiscal_years(entity):
+                if fy not in self.weights:
+                    self._add_year(fy)
+        for row in changed:
+            self._load_row(row)
+            for fy in self.weights:
+                self._load_weights(row, fy)
+        affected = sorted(self.ancestors(changed), key=self.rank.__getitem__)
+        self._recompute(affected)
+        return {"changed": len(changed), "recomputed": len(affected), "unknown": unknown}
+
+    # ── queries ─────────────────────────────────────────────────────────────
+
+    def fiscal_years(self) -> List[str]:
+        return sorted(self.weights)
+
+    def value(self, entity_id: str, fiscal_year: str, metric: str, rolled: bool = True) -> Optional[float]:
+        """Subtree total (or the entity's own value); None if nothing below reports it."""
+        row = self.row_of.get(entity_id)
+        key = (fiscal_year, metric)
+        if row is None or key not in self.own:
+            return None
+        if rolled:
+            return self.rolled[key][row] if self.rolled_reported[key][row] else None
+        return self.own[key][row] if self.reported[key][row] else None
+
+    def breakdown(self, entity_id: str, fiscal_year: str, metric: str) -> dict:
+        """Own value and each child's weighted share of an entity's total."""
+        row = self.row_of[entity_id]
+        key = (fiscal_year, metric)
+        weights = self.weights[fiscal_year]
+        children = []
+        for e in self.child_edges[row]:
+            child = self.edge_child[e]
+            if self.rolled_reported[key][child]:
+                children.append({
+                    "entity_id": self.graph.entities[child].get("id"),
+                    "weight": weights[e],
+                    "contribution": weights[e] * self.rolled[key][child],
+                })
+        children.sort(key=lambda c: -c["contribution"])
+        return {
+            "entity_id": entity_id,
+            "own": self.value(entity_id, fiscal_year, metric, rolled=False),
+            "rolled": self.value(entity_id, fiscal_year, metric),
+            "children": children,
+        }
+
+    def top(self, entity_type: str, fiscal_year: str, metric: str, limit: int = 20) -> List[dict]:
+        """Entities of a type with the largest rolled totals (reported ones only)."""
+        key = (fiscal_year, metric)
+        if key not in self.rolled:
+            return []
+        rolled, seen = self.rolled[key], self.rolled_reported[key]
+        rows = [r for r in self.graph.type_rows.get(entity_type, ()) if seen[r]]
+        rows.sort(key=lambda r: -rolled[r])
+        return [
+            {
+                "entity_id": self.graph.entities[r].get("id"),
+                "name": self.graph.entities[r].get("name"),
+                "own": self.own[key][r] if self.reported[key][r] else None,
+                "rolled": rolled[r],
+                "children": len(self.child_edges[r]),
+            }
+            for r in rows[:limit]
+        ]
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+kg_index.py — Shared id / type / adjacency index over one loaded graph.
+
+Built once per graph load and shared by kg-tour, GraphGuard and KarMA, so no
+tool scans the entity list to resolve an id or regroups records per section.
+Records are never copied: every structure holds row positions into the
+original entity and relationship lists.
+
+    position          entity id -> row (first occurrence wins)
+    duplicates        entity id -> every row, for ids on more than one entity
+    type_rows         entity_type -> array of entity rows ("unknown" if unset)
+    rel_type_rows     relationship_type -> array of relationship rows
+    sources/targets   per relationship, the entity row of each endpoint
+                      (-1 when the id is not an entity)
+    degree            per entity row, incident edge count
+    out/in adjacency  CSR: offsets per entity row into arrays of
+                      relationship rows
+
+Usage:
+    from kg_index import GraphIndex
+
+    g = GraphIndex.from_graph(graph)
+    g.entity("sys-001"); g.name("sys-001")
+    g.of_type("data_asset"); g.rels_of_type("stores")
+    g.degree_of("sys-001"); g.out_edges("sys-001")
+"""
+
+from array import array
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+UNKNOWN = "unknown"
+
+
+class _RowMap(Mapping):
+    """Read-only id -> value mapping computed from the entity row on access."""
+
+    def __init__(self, position: Dict[str, int], value: Callable[[int], Any]):
+        self._position = position
+        self._value = value
+
+    def __getitem__(self, entity_id: str) -> Any:
+        return self._value(self._position[entity_id])
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._position
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._position)
+
+    def __len__(self) -> int:
+        return len(self._position)
+
+
+def _csr(n: int, rows: array) -> tuple:
+    """(offsets, relationship rows) grouping relationship i under rows[i]."""
+    offsets = array("l", bytes(array("l").itemsize * (n + 1)))
+    for r in rows:
+        if r >= 0:
+            offsets[r + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    fill = array("l", offsets[:n])
+    edges = array("l", bytes(array("l").itemsize * offsets[n]))
+    for rel, r in enumerate(rows):
+        if r >= 0:
+            edges[fill[r]] = rel
+            fill[r] += 1
+    return offsets, edges
+
+
+class GraphIndex:
+    """Positional lookup structures for a list of entities and relationships."""
+
+    def __init__(self, entities: List[dict], relationships: List[dict]):
+        self.entities = entities
+        self.relationships = relationships
+
+        self.position: Dict[str, int] = {}
+        self.duplicates: Dict[str, array] = {}
+        self.type_rows: Dict[str, array] = {}
+        for i, e in enumerate(entities):
+            first = self.position.setdefault(e.get("id"), i)
+            if first != i:
+                self.duplicates.setdefault(e.get("id"), array("l", [first])).append(i)
+            self.type_rows.setdefault(e.get("entity_type") or UNKNOWN, array("l")).append(i)
+
+        position = self.position
+        self.rel_type_rows: Dict[str, array] = {}
+        self.sources = array("l")
+        self.targets = array("l")
+        self.degree = array("l", bytes(array("l").itemsize * len(entities)))
+        for j, rel in enumerate(relationships):
+            self.rel_type_rows.setdefault(rel.get("relationship_type") or UNKNOWN, array("l")).append(j)
+            s = position.get(rel.get("source_id"), -1)
+            t = position.get(rel.get("target_id"), -1)
+            self.sources.append(s)
+            self.targets.append(t)
+            if s >= 0:
+                self.degree[s] += 1
+            if t >= 0:
+                self.degree[t] += 1
+
+        self._out: Optional[tuple] = None
+        self._in: Optional[tuple] = None
+
+    @classmethod
+    def from_graph(cls, graph: dict) -> "GraphIndex":
+        return cls(graph.get("entities", []), graph.get("relationships", []))
+
+    # ── entities ────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self.position
+
+    def entity(self, entity_id: str) -> Optional[dict]:
+        i = self.position.get(entity_id)
+        return None if i is None else self.entities[i]
+
+    def name(self, entity_id: str, fallback: Optional[str] = None) -> str:
+        e = self.entity(entity_id)
+        return e.get("name", fallback or entity_id) if e else (fallback or entity_id)
+
+    @property
+    def entity_map(self) -> Mapping:
+        """id -> entity, as a read-only mapping view."""
+        return _RowMap(self.position, self.entities.__getitem__)
+
+    def of_type(self, entity_type: str) -> List[dict]:
+        return [self.entities[i] for i in self.type_rows.get(entity_type, ())]
+
+    def type_buckets(self) -> Dict[str, List[dict]]:
+        """entity_type -> entities, types in order of first appearance."""
+        return {t: [self.entities[i] for i in rows] for t, rows in self.type_rows.items()}
+
+    def type_counts(self) -> Dict[str, int]:
+        return {t: len(rows) for t, rows in self.type_rows.items()}
+
+    # ── relationships ───────────────────────────────────────────────────────
+
+    def rels_of_type(self, relationship_type: str) -> List[dict]:
+        return [self.relationships[j] for j in self.rel_type_rows.get(relationship_type, ())]
+
+    def rel_type_counts(self) -> Dict[str, int]:
+        return {t: len(rows) for t, rows in self.rel_type_rows.items()}
+
+    def degree_of(self, entity_id: str) -> int:
+        i = self.position.get(entity_id)
+        return 0 if i is None else self.degree[i]
+
+    @property
+    def degree_map(self) -> Mapping:
+        """id -> incident edge count, as a read-only mapping view."""
+        return _RowMap(self.position, self.degree.__getitem__)
+
+    def _adjacency(self, outgoing: bool) -> tuple:
+        if outgoing:
+            if self._out is None:
+                self._out = _csr(len(self.entities), self.sources)
+            return self._out
+        if self._in is None:
+            self._in = _csr(len(self.entities), self.targets)
+        return self._in
+
+    def _edges_at(self, i: int, outgoing: bool) -> List[dict]:
+        offsets, rows = self._adjacency(outgoing)
+        return [self.relationships[j] for j in rows[offsets[i]:offsets[i + 1]]]
+
+    def out_edges(self, entity_id: str) -> List[dict]:
+        """Relationships with entity_id as source, in relationship order."""
+        i = self.position.get(entity_id)
+        return [] if i is None else self._edges_at(i, True)
+
+    def in_edges(self, entity_id: str) -> List[dict]:
+        """Relationships with entity_id as target, in relationship order."""
+        i = self.position.get(entity_id)
+        return [] if i is None else self._edges_at(i, False)
+
+    @property
+    def outgoing(self) -> Mapping:
+        """id -> outgoing relationships, as a read-only mapping view."""
+        return _RowMap(self.position, lambda i: self._edges_at(i, True))
+
+    @property
+    def incoming(self) -> Mapping:
+        """id -> incoming relationships, as a read-only mapping view."""
+        return _RowMap(self.position, lambda i: self._edges_at(i, False))
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+kg_karma_history.py — Append-only KarMA run history with fast trend queries.
+
+Each KarMA run appends one snapshot to a local SQLite file:
+
+    runs          one row per run: timestamp, scorer version, enterprise
+                  mean/grade, dimension averages
+    type_scores   one row per (run, entity_type): count, mean, min, max, grade
+    entity_ids    id dictionary: entity id string <-> small integer
+    snapshots     one row per run: three packed columns over entities sorted
+                  by dictionary id — ids (int32), karma in thousandths
+                  (int16) and grade codes (one byte each)
+
+Type trends are plain indexed SQL. Per-entity questions (an entity's trend,
+grades that dropped between two runs) unpack only the snapshots involved
+and bisect / merge-join the sorted id columns, so no old report is re-read.
+
+Composites are only comparable between runs scored with the same scoring
+functions and dimension weights. Each run records the caller's scorer
+version; trends cover only runs with the latest run's version, and
+grade_changes() refuses to compare runs with different versions.
+
+Usage:
+    from kg_karma_history import KarmaHistory
+
+    history = KarmaHistory(".karma_history.sqlite")
+    snapshot = history.snapshot()
+    for result in results:            # compute_karma_score() dicts
+        snapshot.write(result)
+    run_id = history.record(report, snapshot, scorer_version="scorer-1/weights-2")
+
+    history.type_trend("system", last=30)
+    history.grade_changes(dropped=True)
+"""
+
+import json
+import sqlite3
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+GRADES = "ABCDF"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    recorded_at TEXT NOT NULL,
+    assessment_date TEXT,
+    total_entities INTEGER NOT NULL,
+    enterprise_mean REAL NOT NULL,
+    enterprise_grade TEXT NOT NULL,
+    dimension_averages TEXT NOT NULL,
+    scorer_version TEXT
+);
+CREATE TABLE IF NOT EXISTS type_scores (
+    run_id INTEGER NOT NULL,
+    entity_type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    grade TEXT NOT NULL,
+    PRIMARY KEY (entity_type, run_id)
+);
+CREATE TABLE IF NOT EXISTS entity_ids (
+    eid INTEGER PRIMARY KEY,
+    entity_id TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    run_id INTEGER PRIMARY KEY,
+    eids BLOB NOT NULL,
+    karma BLOB NOT NULL,
+    grades BLOB NOT NULL
+);
+"""
+
+
+def _pack(values: array) -> bytes:
+    """Little-endian bytes regardless of host byte order."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(typecode: str, blob: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(blob)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class Snapshot:
+    """Per-entity (id, karma, grade) columns collected during one run."""
+
+    def __init__(self):
+        self.entity_ids: List[str] = []
+        self.karma = array("h")
+        self.grades = bytearray()
+
+    def write(self, result: dict) -> None:
+        entity_id = result.get("entity_id")
+        if not isinstance(entity_id, str):
+            return
+        self.entity_ids.append(entity_id)
+        self.karma.append(round(result["karma_composite"] * 1000))
+        self.grades.append(GRADES.index(result["karma_grade"]))
+
+    def __len__(self) -> int:
+        return len(self.entity_ids)
+
+
+class KarmaHistory:
+    """Append-only store of KarMA runs. Runs are numbered 1, 2, ... in order."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(_SCHEMA)
+        self._unpacked: Dict[int, Tuple[array, array, bytes]] = {}
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ── Recording ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def snapshot() -> Snapshot:
+        return Snapshot()
+
+    def _intern(self, entity_ids: List[str]) -> List[int]:
+        """Dictionary ids for entity id strings, assigning new ones as needed."""
+        known = dict(self.conn.execute("SELECT entity_id, eid FROM entity_ids"))
+        new = [(eid,) for eid in dict.fromkeys(entity_ids) if eid not in known]
+        if new:
+            self.conn.executemany("INSERT INTO entity_ids (entity_id) VALUES (?)", new)
+            known = dict(self.conn.execute("SELECT entity_id, eid FROM entity_ids"))
+        return [known[eid] for eid in entity_ids]
+
+    def record(self, report: dict, snapshot: Snapshot, scorer_version: Optional[str] = None,
+               recorded_at: Optional[str] = None) -> int:
+        """Append one run from a KarMA report and its per-entity snapshot.
+
+        scorer_version must change whenever scores stop being comparable
+        with earlier runs (scoring functions or weights changed)."""
+        recorded_at = recorded_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (recorded_at, assessment_date, total_entities, enterprise_mean,"
+                " enterprise_grade, dimension_averages, scorer_version) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    recorded_at,
+                    report.get("assessment_date"),
+                    report["total_entities"],
+                    report["enterprise_karma"]["mean"],
+                    report["enterprise_karma"]["grade"],
+                    json.dumps(report.get("dimension_averages", {})),
+                    scorer_version,
+                ),
+            )
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO type_scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, etype, s["count"], s["mean_karma"], s["min_karma"], s["max_karma"], s["grade"])
+                    for etype, s in report["type_summary"].items()
+                ],
+            )
+
+            # Sorted by dictionary id; duplicate entity ids keep their last score
+            rows = dict(zip(self._intern(snapshot.entity_ids), zip(snapshot.karma, snapshot.grades)))
+            order = sorted(rows)
+            self.conn.execute(
+                "INSERT INTO snapshots VALUES (?, ?, ?, ?)",
+                (
+                    run_id,
+                    _pack(array("i", order)),
+                    _pack(array("h", (rows[e][0] for e in order))),
+                    bytes(rows[e][1] for e in order),
+                ),
+            )
+        return run_id
+
+    # ── Queries ─────────────────────────────────────────────────────────────
+
+    def runs(self, last: Optional[int] = None) -> List[dict]:
+        """Recorded runs, oldest first (the last N when given)."""
+        rows = self.conn.execute(
+            "SELECT run_id, recorded_at, assessment_date, total_entities, enterprise_mean, enterprise_grade,"
+            " scorer_version FROM runs ORDER BY run_id DESC LIMIT ?",
+            (last if last else -1,),
+        ).fetchall()
+        keys = ("run_id", "recorded_at", "assessment_date", "total_entities", "enterprise_mean", "enterprise_grade",
+                "scorer_version")
+        return [dict(zip(keys, row)) for row in reversed(rows)]
+
+    def latest_run(self, before: Optional[int] = None) -> Optional[int]:
+        sql = "SELECT MAX(run_id) FROM runs" + (" WHERE run_id < ?" if before else "")
+        return self.conn.execute(sql, (before,) if before else ()).fetchone()[0]
+
+    def scorer_version(self, run_id: int) -> Optional[str]:
+        row = self.conn.execute("SELECT scorer_version FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No run {run_id}")
+        return row[0]
+
+    def _latest_version(self) -> Optional[str]:
+        latest = self.latest_run()
+        return self.scorer_version(latest) if latest else None
+
+    def type_trend(self, entity_type: str, last: int = 30) -> List[dict]:
+        """Mean/min/max/grade for one entity type over the last N runs, oldest first.
+
+        Only runs scored with the latest run's scorer version are included."""
+        version = self._latest_version()
+        rows = self.conn.execute(
+            "SELECT t.run_id, r.recorded_at, t.count, t.mean, t.min, t.max, t.grade"
+            " FROM type_scores t JOIN runs r USING (run_id)"
+            " WHERE t.entity_type = ? AND r.scorer_version IS ? ORDER BY t.run_id DESC LIMIT ?",
+            (entity_type, version, last),
+        ).fetchall()
+        keys = ("run_id", "recorded_at", "count", "mean", "min", "max", "grade")
+        return [dict(zip(keys, row)) for row in reversed(rows)]
+
+    def _columns(self, run_id: int) -> Tuple[array, array, bytes]:
+        """Unpacked (eids, karma, grades) for one run, cached per instance."""
+        if run_id not in self._unpacked:
+            row = self.conn.execute(
+                "SELECT eids, karma, grades FROM snapshots WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"No snapshot for run {run_id}")
+            self._unpacked[run_id] = (_unpack("i", row[0]), _unpack("h", row[1]), row[2])
+        return self._unpacked[run_id]
+
+    def entity_trend(self, entity_id: str, last: int = 30) -> List[dict]:
+        """Karma and grade of one entity over the last N runs it appears in, oldest first.
+
+        Only runs scored with the latest run's scorer version are included."""
+        row = self.conn.execute("SELECT eid FROM entity_ids WHERE entity_id = ?", (entity_id,)).fetchone()
+        if row is None:
+            return []
+        eid = row[0]
+        runs = self.conn.execute(
+            "SELECT run_id, recorded_at FROM runs WHERE scorer_version IS ? ORDER BY run_id DESC",
+            (self._latest_version(),),
+        )
+        trend = []
+        # Newest first until N runs containing the entity are found
+        for run_id, recorded_at in runs:
+            eids, karma, grades = self._columns(run_id)
+            i = bisect_left(eids, eid)
+            if i < len(eids) and eids[i] == eid:
+                trend.append({
+                    "run_id": run_id,
+                    "recorded_at": recorded_at,
+                    "karma": karma[i] / 1000,
+                    "grade": GRADES[grades[i]],
+                })
+                if len(trend) == last:
+                    break
+        return list(reversed(trend))
+
+    def grade_changes(self, from_run: Optional[int] = None, to_run: Optional[int] = None,
+                      dropped: bool = True) -> List[dict]:
+        """Entities whose grade got worse (or better, dropped=False) between two runs.
+
+        Defaults compare the latest run with the one before it. Runs scored
+        with different scorer versions are not comparable: ValueError."""
+        to_run = to_run or self.latest_run()
+        from_run = from_run or (self.latest_run(before=to_run) if to_run else None)
+        if not from_run or not to_run:
+            return []
+        versions = self.scorer_version(from_run), self.scorer_version(to_run)
+        if versions[0] != versions[1]:
+            raise ValueError(
+                f"runs {from_run} and {to_run} were scored with different scorer versions "
+                f"({versions[0] or 'unknown'} vs {versions[1] or 'unknown'}); grade changes between them "
+                "reflect the scorer, not the data"
+            )
+
+        old_ids, old_karma, old_grades = self._columns(from_run)
+        new_ids, new_karma, new_grades = self._columns(to_run)
+        changed = []
+        i = j = 0
+        # Merge-join on the sorted dictionary ids
+        while i < len(old_ids) and j < len(new_ids):
+            if old_ids[i] < new_ids[j]:
+                i += 1
+            elif old_ids[i] > new_ids[j]:
+                j += 1
+            else:
+                before, after = old_grades[i], new_grades[j]
+                if (after > before) if dropped else (after < before):
+                    changed.append((old_ids[i], before, after, old_karma[i], new_karma[j]))
+                i += 1
+                j += 1
+
+        if not changed:
+            return []
+        names = dict(self.conn.execute("SELECT eid, entity_id FROM entity_ids"))
+        return [
+            {
+                "entity_id": names[eid],
+                "from_grade": GRADES[before],
+                "to_grade": GRADES[after],
+                "from_karma": k0 / 1000,
+                "to_karma": k1 / 1000,
+            }
+            # Largest movement first
+            for eid, before, after, k0, k1 in sorted(changed, key=lambda c: (c[4] - c[3]) * (1 if dropped else -1))
+        ]
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+kg_similarity.py — Name similarity for duplicate checks, with no hard dependency.
+
+ratio() matches rapidfuzz's fuzz.ratio (normalized Indel similarity, 0-100).
+rapidfuzz is imported on the first call, not at import time; when it is not
+installed the bundled pure-Python implementation is used instead, so hooks
+start instantly and work offline. Nothing is ever installed at runtime.
+
+The pure-Python ratio is fine for the candidate sets NameIndex produces;
+similar_pairs() uses those instead of all pairs when rapidfuzz is missing.
+
+Usage:
+    from kg_similarity import NameIndex, ratio, similar_pairs
+
+    ratio("Payments API", "Payment API")             # 95.65...
+    for i, j, score in similar_pairs(names, 0.85):   # i < j, score in 0-1
+        ...
+"""
+
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+_ratio: Optional[Callable[[str, str], float]] = None
+_backend: Optional[str] = None
+
+
+def indel_ratio(s1: str, s2: str) -> float:
+    """Normalized Indel similarity (0-100) via a bit-parallel LCS."""
+    total = len(s1) + len(s2)
+    if not total:
+        return 100.0
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(s1):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    full = (1 << len(s1)) - 1
+    v = full
+    for ch in s2:
+        u = v & masks.get(ch, 0)
+        v = ((v + u) | (v - u)) & full
+    lcs = len(s1) - bin(v).count("1")
+    return 100.0 * 2 * lcs / total
+
+
+def _load() -> Callable[[str, str], float]:
+    global _ratio, _backend
+    try:
+        from rapidfuzz import fuzz
+        _ratio, _backend = fuzz.ratio, "rapidfuzz"
+    except ImportError:
+        _ratio, _backend = indel_ratio, "python"
+    return _ratio
+
+
+def ratio(s1: str, s2: str) -> float:
+    """fuzz.ratio-compatible similarity, 0-100."""
+    return (_ratio or _load())(s1, s2)
+
+
+def backend() -> Optional[str]:
+    """'rapidfuzz' or 'python' once a ratio has been computed, else None."""
+    return _backend
+
+
+class NameIndex:
+    """Bigram postings over the lowercased names of one entity type.
+
+    candidates() returns every name that can reach the duplicate threshold
+    (no false negatives) using the length bound and a q-gram count bound:
+    an Indel distance d destroys at most Q*d of a name's distinct bigrams,
+    and ratio >= t allows d <= (1 - t) * (len1 + len2). Names too short
+    for the bigram bound to prune fall back to a scan of the length window.
+    """
+
+    Q = 2
+
+    def __init__(self, entries: List[Tuple[str, str]]):
+        self.entries = entries  # (key, name)
+        self.lowered = [name.lower() for _, name in entries]
+        self.lengths = [len(name) for name in self.lowered]
+        self.postings: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.lowered):
+            for gram in self.grams(name):
+                self.postings.setdefault(gram, []).append(i)
+
+    @classmethod
+    def grams(cls, name: str) -> Set[str]:
+        return {name[i:i + cls.Q] for i in range(len(name) - cls.Q + 1)}
+
+    @classmethod
+    def from_records(cls, records: list) -> "NameIndex":
+        return cls([
+            (r.get("id"), r["name"])
+            for r in records
+            if isinstance(r, dict) and isinstance(r.get("name"), str) and r["name"]
+        ])
+
+    def candidates(self, name: str, threshold: float) -> List[int]:
+        """Positions of names that may score >= threshold against name (lowercased)."""
+        n1 = len(name)
+        lo = n1 * threshold / (2 - threshold)
+        hi = n1 * (2 - threshold) / threshold
+        grams = self.grams(name)
+
+        def bound(n2: int) -> float:
+            return len(grams) - self.Q * (1 - threshold) * (n1 + n2)
+
+        if bound(int(hi)) <= 0:
+            return [i for i, n2 in enumerate(self.lengths) if lo <= n2 <= hi]
+
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for i in self.postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        return [
+            i for i, count in shared.items()
+            if lo <= self.lengths[i] <= hi and count >= bound(self.lengths[i]) - 1e-9
+        ]
+
+
+def similar_pairs(names: List[str], threshold: float) -> Iterator[Tuple[int, int, float]]:
+    """(i, j, similarity 0-1) for i < j with ratio >= threshold, in all-pairs loop order.
+
+    Empty or non-string names are skipped, as in the all-pairs checks. With
+    rapidfuzz every pair is scored (its C loop beats the candidate filter);
+    the pure-Python fallback scores only NameIndex candidates."""
+    named = [(i, n.lower()) for i, n in enumerate(names) if isinstance(n, str) and n]
+    score = _ratio or _load()
+    if _backend == "rapidfuzz":
+        for a, (i, n1) in enumerate(named):
+            for j, n2 in named[a + 1:]:
+                similarity = score(n1, n2) / 100.0
+                if similarity >= threshold:
+                    yield i, j, similarity
+        return
+    index = NameIndex(named)
+    for a, (i, _) in enumerate(index.entries):
+        lowered = index.lowered[a]
+        for b in sorted(index.candidates(lowered, threshold)):
+            if b <= a:
+                continue
+            similarity = score(lowered, index.lowered[b]) / 100.0
+            if similarity >= threshold:
+                yield i, index.entries[b][0], similarity
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+kg_temporal.py — Parsed-date column index shared by GraphGuard and KarMA.
+
+Built once per graph load. Every entity's temporal dates and
+provenance.last_assessed_date are parsed a single time into integer
+columns (proleptic Gregorian day ordinals), so date ordering checks,
+freshness scoring and range queries become plain integer comparisons
+instead of per-entity string parsing.
+
+Usage:
+    from kg_temporal import TemporalIndex
+
+    idx = TemporalIndex.from_entities(graph["entities"])
+    idx.violations("effective_date", "expiration_date")    # positions out of order
+    idx.ids_between("next_review_date", "2026-03-04", "2026-04-03")
+
+Column values:
+    > 0   day ordinal (UTC calendar day)
+    0     MISSING — field absent, null or empty
+    -1    INVALID — present but not a recognizable date
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+
+MISSING = 0
+INVALID = -1
+
+TEMPORAL_FIELDS = ("effective_date", "expiration_date", "last_review_date", "next_review_date")
+PROVENANCE_FIELDS = ("last_assessed_date",)
+COLUMNS = TEMPORAL_FIELDS + PROVENANCE_FIELDS
+
+# Non-ISO layouts seen in hand-entered records; ISO dates and datetimes are
+# handled by fromisoformat first.
+_FALLBACK_FORMATS = ("%Y/%m/%d", "%m/%d/%Y", "%d %B %Y", "%B %d, %Y", "%b %d, %Y", "%Y-%m", "%Y")
+
+
+def parse_date(value: Any) -> int:
+    """Normalize a date-like value to a UTC day ordinal, MISSING or INVALID."""
+    if not value:
+        return MISSING
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+
+    text = str(value).strip()
+    if not text:
+        return INVALID
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc)
+        return parsed.toordinal()
+    except ValueError:
+        pass
+    for fmt in _FALLBACK_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).toordinal()
+        except ValueError:
+            continue
+    return INVALID
+
+
+def to_ordinal(value: Union[int, str, date]) -> int:
+    """Accept an ordinal, ISO string or date for query bounds."""
+    if isinstance(value, int):
+        return value
+    ordinal = parse_date(value)
+    if ordinal <= 0:
+        raise ValueError(f"Not a valid date bound: {value!r}")
+    return ordinal
+
+
+class TemporalIndex:
+    """Columnar parsed dates for a list of entities (row i == entities[i])."""
+
+    def __init__(self, ids: List[str], columns: Dict[str, array]):
+        self.ids = ids
+        self.columns = columns
+        self._sorted: Dict[str, tuple] = {}
+
+    @classmethod
+    def from_entities(cls, entities: List[dict]) -> "TemporalIndex":
+        columns = {name: array("l") for name in COLUMNS}
+        ids = []
+        for e in entities:
+            ids.append(e.get("id"))
+            temporal = e.get("temporal") or {}
+            prov = e.get("provenance") or {}
+            for name in TEMPORAL_FIELDS:
+                columns[name].append(parse_date(temporal.get(name)))
+            for name in PROVENANCE_FIELDS:
+                columns[name].append(parse_date(prov.get(name)))
+        return cls(ids, columns)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def column(self, name: str) -> array:
+        return self.columns[name]
+
+    def invalid_counts(self) -> Dict[str, int]:
+        """Number of present-but-unparseable values per column."""
+        return {name: col.count(INVALID) for name, col in self.columns.items() if INVALID in col}
+
+    def violations(self, earlier: str, later: str) -> List[int]:
+        """Row positions where both dates are valid and earlier > later."""
+        a = self.columns[earlier]
+        b = self.columns[later]
+        return [i for i, (x, y) in enumerate(zip(a, b)) if x > 0 and y > 0 and x > y]
+
+    def coalesce(self, *names: str) -> array:
+        """First non-MISSING value per row across columns (INVALID is kept, not skipped)."""
+        cols = [self.columns[n] for n in names]
+        out = array("l", cols[0])
+        for col in cols[1:]:
+            for i, v in enumerate(out):
+                if v == MISSING:
+                    out[i] = col[i]
+        return out
+
+    def _sorted_column(self, name: str) -> tuple:
+        """(sorted ordinals, matching row positions) for valid values, cached."""
+        if name not in self._sorted:
+            col = self.columns[name]
+            rows = sorted((i for i, v in enumerate(col) if v > 0), key=col.__getitem__)
+            self._sorted[name] = ([col[i] for i in rows], rows)
+        return self._sorted[name]
+
+    def between(self, name: str, start, end) -> List[int]:
+        """Row positions with start <= date <= end (inclusive), via bisect."""
+        keys, rows = self._sorted_column(name)
+        lo = bisect_left(keys, to_ordinal(start))
+        hi = bisect_right(keys, to_ordinal(end))
+        return rows[lo:hi]
+
+    def ids_between(self, name: str, start, end) -> List[str]:
+        return [self.ids[i] for i in self.between(name, start, end)]
+
+    def before(self, name: str, bound) -> List[int]:
+        """Row positions with a valid date strictly before bound."""
+        keys, rows = self._sorted_column(name)
+        return rows[:bisect_left(keys, to_ordinal(bound))]
+
+    def due_within(self, name: str, as_of, days: int) -> List[int]:
+        """Row positions whose date falls in [as_of, as_of + days]."""
+        start = to_ordinal(as_of)
+        return self.between(name, start, start + days)
+
+    @staticmethod
+    def to_date(ordinal: int) -> Optional[date]:
+        return date.fromordinal(ordinal) if ordinal > 0 else None
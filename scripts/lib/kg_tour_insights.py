@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+kg_tour_insights.py — Precomputed answers for the kg-tour orientation tour.
+
+Every number and sample list the tour shows is computed from one GraphIndex
+(type and relationship-type buckets, id lookups) and cached next to
+graph.json, keyed by the SHA-256 of the graph file and its size and mtime.
+kg-build.py writes the snapshot after building; kg-tour.py reuses it while
+the stat (or, failing that, the digest) still matches, so the tour neither
+reads nor parses graph.json unless the graph changed.
+
+Usage:
+    from kg_tour_insights import load_insights
+
+    insights = load_insights(Path("graph.json"))   # cached or recomputed
+"""
+
+import hashlib
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from kg_index import GraphIndex
+
+SNAPSHOT_VERSION = 1
+
+AI_KEYWORDS = ["ai", "ml", "model", "gpu", "inference", "llm", "generative",
+               "intelligence", "run:ai", "raise", "ice", "rita", "launchpad"]
+GLANCE_TYPES = ["system", "data_asset", "control", "policy", "risk", "regulation", "person", "department"]
+REGULATIONS = {"gdpr": "GDPR", "ccpa": "CCPA", "fedramp": "FEDRAMP", "hipaa": "HIPAA", "pci": "PCI"}
+
+
+def snapshot_path(graph_path: Path) -> Path:
+    return graph_path.with_name(graph_path.stem + ".tour-snapshot.json")
+
+
+def graph_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _label(e: dict) -> str:
+    return e.get("name", e.get("id"))
+
+
+def _as_list(value) -> list:
+    if not value:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def compute_insights(graph: GraphIndex) -> dict:
+    """All tour answers from the index buckets: one pass over the relationship
+    types and the entity types the tour reports on."""
+    rels = graph.relationships
+    rel_rows = graph.rel_type_rows
+    store_counts = Counter(rels[j].get("source_id") for j in rel_rows.get("stores", ()))
+    mitigated = {rels[j].get("target_id") for j in rel_rows.get("mitigates", ())}
+    supported = {rels[j].get("target_id") for j in rel_rows.get("supports", ())}
+    top_stores = store_counts.most_common(5)
+
+    entities = graph.entities
+    type_rows = graph.type_rows
+    class_counts = Counter()
+    pii = regulated = ai_act = 0
+    restricted = []
+    reg_counts = {key: 0 for key in REGULATIONS}
+    for i in type_rows.get("data_asset", ()):
+        e = entities[i]
+        cls = str(e.get("data_classification") or e.get("classification") or "unknown")
+        class_counts[cls.lower()] += 1
+        if cls.lower() == "restricted" and len(restricted) < 5:
+            restricted.append(_label(e))
+        if e.get("pii_categories"):
+            pii += 1
+        if e.get("regulatory_applicability") or e.get("regulations"):
+            regulated += 1
+
+        # Hand-edited records may hold bare strings where objects are expected
+        regs = [(r.get("regulation_name") or r.get("regulation_id") or "") if isinstance(r, dict) else str(r)
+                for r in _as_list(e.get("regulatory_applicability"))]
+        regs = [r.upper() for r in regs]
+        regs += [str(r).upper() for r in _as_list(e.get("regulations"))]
+        reg_str = " ".join(regs)
+        for key, token in REGULATIONS.items():
+            if token in reg_str:
+                reg_counts[key] += 1
+        ai = e.get("ai_training_usage")
+        if isinstance(ai, dict) and ai.get("eu_ai_act_risk_category") in ("High", "Limited", "Minimal"):
+            ai_act += 1
+
+    risks = covered = 0
+    uncovered = []
+    for i in type_rows.get("risk", ()):
+        risks += 1
+        if entities[i].get("id") in mitigated:
+            covered += 1
+        elif len(uncovered) < 8:
+            uncovered.append(_label(entities[i]))
+
+    ai_systems = [_label(entities[i]) for i in type_rows.get("system", ())
+                  if any(k in str(entities[i].get("name") or "").lower() for k in AI_KEYWORDS)]
+
+    def count(etype: str) -> int:
+        return len(type_rows.get(etype, ()))
+
+    def rel_count(rtype: str) -> int:
+        return len(rel_rows.get(rtype, ()))
+
+    return {
+        "glance": {
+            "entities": len(entities),
+            "relationships": len(rels),
+            "types": {t: count(t) for t in GLANCE_TYPES},
+            "relationship_types": len(rel_rows),
+        },
+        "data_landscape": {
+            "assets": count("data_asset"),
+            "classifications": sorted(class_counts.items(), key=lambda x: -x[1]),
+            "pii": pii,
+            "regulated": regulated,
+            "restricted_sample": restricted,
+        },
+        "where_it_lives": {
+            "stores": rel_count("stores"),
+            "integrates_with": rel_count("integrates_with"),
+            "hosted_on": rel_count("hosted_on"),
+            "top_systems": [[graph.name(sid, sid), n] for sid, n in top_stores],
+        },
+        "regulatory_exposure": dict(reg_counts, ai_act=ai_act),
+        "risk_and_control": {
+            "risks": risks,
+            "covered": covered,
+            "uncovered": risks - covered,
+            "uncovered_sample": uncovered,
+            "controls": count("control"),
+            "mitigates": rel_count("mitigates"),
+        },
+        "ai_readiness": {
+            "ai_systems": len(ai_systems),
+            "ai_systems_sample": ai_systems[:8],
+            "systems_with_data": len(store_counts),
+            "capabilities": count("business_capability"),
+            "capabilities_supported": len(supported),
+        },
+    }
+
+
+def _stat(graph_path: Path) -> list:
+    st = graph_path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def write_snapshot(graph_path: Path, graph: dict, data: bytes, stat: Optional[list] = None) -> dict:
+    """Compute insights for an already-loaded graph and cache them.
+
+    stat is the graph file's [size, mtime_ns] taken before data was read
+    (default: now, for a graph file just written from data)."""
+    insights = compute_insights(GraphIndex.from_graph(graph))
+    _write(graph_path, graph_digest(data), stat or _stat(graph_path), insights)
+    return insights
+
+
+def _write(graph_path: Path, digest: str, stat: list, insights: dict) -> None:
+    snapshot = {"version": SNAPSHOT_VERSION, "graph_digest": digest, "graph_stat": stat, "insights": insights}
+    snapshot_path(graph_path).write_text(json.dumps(snapshot, indent=2) + "\n")
+
+
+def _read_snapshot(graph_path: Path) -> Optional[dict]:
+    try:
+        snapshot = json.loads(snapshot_path(graph_path).read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+def load_insights(graph_path: Path) -> dict:
+    """Snapshot insights when current, else recompute (and cache) from graph.json.
+
+    The graph's size and mtime are checked first; graph.json is read and
+    hashed only when they changed, and a touched but identical graph just
+    refreshes the stored stat. A snapshot that cannot be written (read-only
+    directory) is skipped."""
+    snapshot = _read_snapshot(graph_path)
+    stat = _stat(graph_path)
+    if snapshot and snapshot.get("graph_stat") == stat:
+        return snapshot["insights"]
+    data = graph_path.read_bytes()
+    digest = graph_digest(data)
+    if snapshot and snapshot.get("graph_digest") == digest:
+        insights = snapshot["insights"]
+    else:
+        insights = compute_insights(GraphIndex.from_graph(json.loads(data)))
+    try:
+        _write(graph_path, digest, stat, insights)
+    except OSError:
+        pass  # read-only checkout: the tour still runs, it just recomputes next time
+    return insights
@@ -2,20 +2,43 @@
 """
 Pre-commit validation for hc-cdaio-kg
 Prevents low-quality commits from entering the repository
+
+Usage:
+    python scripts/sre/validate-commit.py            # full graph.json
+    python scripts/sre/validate-commit.py --staged   # staged per-type files only
+    python scripts/sre/validate-commit.py --staged --budget-ms 500   # hook mode
+
+--staged reads the staged entities/*.json and relationships/*.json straight
+from the git index (graph.json may be stale or absent) and validates only
+added or modified records. Referential checks use per-blob id sets cached
+under .git/kg-validate/, so unchanged files are never re-read.
+
+--budget-ms always runs the blocking checks (schema, required fields,
+referential integrity). The advisory checks (provenance coverage,
+duplicates) run inline only if their last measured cost fits in the time
+left. Otherwise they run in a background job against a snapshot of the
+index, and the next invocation prints the job's warnings.
+
+Only the standard library is imported at startup. Name similarity comes
+from scripts/lib/kg_similarity.py, which uses rapidfuzz when installed and
+a bundled pure-Python fallback otherwise; nothing is installed at runtime.
 """
 
+import time
+_STARTED = time.perf_counter()
+
+import argparse
 import json
+import os
+import signal
+import subprocess
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-try:
-    from rapidfuzz import fuzz
-except ImportError:
-    print("⚠️  Installing rapidfuzz for fuzzy matching...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "rapidfuzz", "--break-system-packages", "-q"])
-    from rapidfuzz import fuzz
+sys.path.insert(0, str(Path(__file__).parent.parent / "lib"))
+import kg_similarity
+from kg_similarity import NameIndex, ratio, similar_pairs
 
 
 class ValidationError(Exception):
@@ -23,14 +46,363 @@ class ValidationError(Exception):
     pass
 
 
+DATA_DIRS = ("entities", "relationships")
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+
+def record_key(record: dict) -> Any:
+    """Identity of a record across versions: its id, else the relationship triple."""
+    rid = record.get("id")
+    if isinstance(rid, str) and rid:
+        return rid
+    return (record.get("source_id"), record.get("target_id"), record.get("relationship_type"))
+
+
+class GitIndexReader:
+    """Reads staged per-type data files from the git index without touching the worktree.
+
+    With tree (and base), reads a frozen snapshot instead: the tree written
+    from the index at commit time, compared with the commit it was based on.
+    """
+
+    def __init__(self, repo_root: Path, tree: Optional[str] = None, base: str = "HEAD"):
+        self.repo_root = repo_root
+        self.tree = tree
+        self.base = base
+        self._batch: Optional[subprocess.Popen] = None
+
+    def _git(self, *args: str) -> bytes:
+        return subprocess.run(
+            ["git", *args], cwd=self.repo_root, capture_output=True, check=True
+        ).stdout
+
+    def git_dir(self) -> Path:
+        path = Path(self._git("rev-parse", "--git-dir").decode().strip())
+        return path if path.is_absolute() else self.repo_root / path
+
+    def snapshot(self) -> Tuple[str, str]:
+        """(base commit or empty tree, tree of the current index) for a deferred job."""
+        base = subprocess.run(
+            ["git", "rev-parse", "--verify", "-q", "HEAD"], cwd=self.repo_root, capture_output=True
+        ).stdout.decode().strip()
+        return base or EMPTY_TREE, self._git("write-tree").decode().strip()
+
+    def head_tree(self) -> Optional[str]:
+        """Tree of the current HEAD commit, None before the first commit."""
+        return subprocess.run(
+            ["git", "rev-parse", "--verify", "-q", "HEAD^{tree}"], cwd=self.repo_root, capture_output=True
+        ).stdout.decode().strip() or None
+
+    def staged_spec(self, path: str) -> str:
+        return f"{self.tree}:{path}" if self.tree else f":{path}"
+
+    def staged_changes(self) -> List[Tuple[str, str]]:
+        """(status, path) for staged A/M/D changes under the data directories."""
+        target = (self.base, self.tree) if self.tree else ("--cached", self.base)
+        out = self._git("diff", *target, "--name-status", "--no-renames", "-z", "--", *DATA_DIRS)
+        fields = out.decode().split("\0")
+        return [
+            (fields[i][0], fields[i + 1])
+            for i in range(0, len(fields) - 1, 2)
+            if fields[i + 1].endswith(".json")
+        ]
+
+    def index_blobs(self) -> Dict[str, str]:
+        """path -> staged blob sha for every data file in the index."""
+        if self.tree:
+            out, sha_field = self._git("ls-tree", "-r", "-z", self.tree, "--", *DATA_DIRS), 2
+        else:
+            out, sha_field = self._git("ls-files", "-s", "-z", "--", *DATA_DIRS), 1
+        blobs = {}
+        for entry in out.decode().split("\0"):
+            if not entry:
+                continue
+            meta, path = entry.split("\t", 1)
+            if path.endswith(".json"):
+                blobs[path] = meta.split()[sha_field]
+        return blobs
+
+    def read(self, spec: str) -> Optional[bytes]:
+        """Object content for a rev spec (':path', 'HEAD:path', sha), None if missing."""
+        obj = self.read_object(spec)
+        return obj[1] if obj else None
+
+    def read_object(self, spec: str) -> Optional[Tuple[str, bytes]]:
+        """(blob sha, content) for a rev spec, None if missing."""
+        if self._batch is None:
+            self._batch = subprocess.Popen(
+                ["git", "cat-file", "--batch"], cwd=self.repo_root,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            )
+        self._batch.stdin.write(spec.encode() + b"\n")
+        self._batch.stdin.flush()
+        header = self._batch.stdout.readline().split()
+        if len(header) < 3 or header[-1] == b"missing":
+            return None
+        data = self._batch.stdout.read(int(header[2]))
+        self._batch.stdout.read(1)  # trailing newline
+        return header[0].decode(), data
+
+    def close(self) -> None:
+        if self._batch is not None:
+            self._batch.stdin.close()
+            self._batch.wait()
+            self._batch = None
+
+
+class BlobIdCache:
+    """Per-blob id sets persisted in the git dir, keyed by blob sha.
+
+    Entity blobs map to the entity ids they define, relationship blobs to the
+    entity ids they reference. A blob's content never changes, so entries
+    never go stale; entries for blobs no longer in the index are dropped.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, List[str]] = {}
+        self.misses = 0
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text())
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, sha: str, compute) -> Set[str]:
+        if sha not in self.entries:
+            self.entries[sha] = sorted(compute())
+            self.misses += 1
+        return set(self.entries[sha])
+
+    def save(self, live_shas: Set[str]) -> None:
+        self.entries = {sha: ids for sha, ids in self.entries.items() if sha in live_shas}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries))
+
+
+class NameIndexCache:
+    """NameIndex entries persisted per entity-file blob sha under the git dir."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.misses = 0
+
+    def get(self, sha: str, records_for) -> NameIndex:
+        path = self.directory / f"{sha}.json"
+        try:
+            return NameIndex([tuple(e) for e in json.loads(path.read_text())])
+        except (OSError, ValueError):
+            pass
+        index = NameIndex.from_records(records_for())
+        self.put(sha, index)
+        self.misses += 1
+        return index
+
+    def put(self, sha: str, index: NameIndex) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{sha}.json").write_text(json.dumps(index.entries))
+
+    def prune(self, live_shas: Set[str]) -> None:
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob("*.json"):
+            if path.stem not in live_shas:
+                path.unlink()
+
+
+class DeferredChecks:
+    """Advisory checks handed to a background job when they do not fit the budget.
+
+    State lives under .git/kg-validate/: advisory-ms.json keeps the last
+    measured advisory cost per mode (the estimate budgets are checked
+    against), deferred.json holds a finished job's warnings until the next
+    invocation prints them, and deferred.pid names the running job (pid,
+    the staged tree it checks, start time, and the process start time ps
+    reported at launch, which identifies the job if the pid is reused).
+
+    Only one job runs at a time: launching replaces a job still running, and
+    a job whose tree is no longer the one in deferred.pid drops its results.
+    Results are printed only if their tree is what HEAD now points at, so a
+    commit rejected by the blocking checks never reports stale warnings.
+    """
+
+    # Where a job's identity cannot be confirmed (Windows, no ps), older jobs count as dead
+    JOB_TIMEOUT_S = 600
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.timing_path = directory / "advisory-ms.json"
+        self.results_path = directory / "deferred.json"
+        self.pid_path = directory / "deferred.pid"
+
+    def _timings(self) -> Dict[str, float]:
+        try:
+            return json.loads(self.timing_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def estimate(self, mode: str) -> Optional[float]:
+        return self._timings().get(mode)
+
+    def record_cost(self, mode: str, elapsed_ms: float) -> None:
+        timings = self._timings()
+        timings[mode] = round(elapsed_ms, 1)
+        self._write(self.timing_path, timings)
+
+    def _write(self, path: Path, payload: Any) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, indent=2))
+        os.replace(tmp, path)
+
+    def _job(self) -> Optional[Dict[str, Any]]:
+        """The job deferred.pid names, None if there is none (or it is unreadable)."""
+        try:
+            job = json.loads(self.pid_path.read_text())
+        except (OSError, ValueError):
+            return None
+        return job if isinstance(job, dict) and isinstance(job.get("pid"), int) else None
+
+    @staticmethod
+    def _process_start(pid: int) -> Optional[str]:
+        """Start time of a running process as ps reports it, None if there is none."""
+        if os.name == "nt":
+            return None
+        try:
+            out = subprocess.run(["ps", "-o", "lstart=", "-p", str(pid)],
+                                 capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return out.stdout.strip() or None
+
+    def _alive(self, job: Dict[str, Any]) -> bool:
+        """Whether the job is still running; a reused pid has another start time."""
+        if not job.get("process_start"):
+            return time.time() - job.get("started_at", 0) < self.JOB_TIMEOUT_S
+        return self._process_start(job["pid"]) == job["process_start"]
+
+    def launch(self, script: Path, repo_root: Path, job_args: List[str], tree: Optional[str]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        job = self._job()
+        if job and job.get("process_start") and self._alive(job):
+            # superseded: its index snapshot is not what is being committed now.
+            # Only a confirmed job is signalled; an unconfirmed one's results
+            # are dropped by finish() since its tree is no longer in deferred.pid
+            try:
+                os.killpg(job["pid"], signal.SIGTERM)
+            except OSError:
+                pass
+        self.results_path.unlink(missing_ok=True)
+        with open(self.directory / "deferred.log", "wb") as log:
+            proc = subprocess.Popen(
+                [sys.executable, str(script), "--advisory-only", *job_args],
+                cwd=repo_root, stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                start_new_session=True,
+            )
+        self._write(self.pid_path, {"pid": proc.pid, "tree": tree, "started_at": time.time(),
+                                    "process_start": self._process_start(proc.pid)})
+
+    def finish(self, target: str, tree: Optional[str], warnings: List[str], elapsed_ms: float) -> None:
+        job = self._job()
+        if job and job.get("tree") != tree:
+            return  # a newer job replaced this one
+        self._write(self.results_path, {
+            "target": target,
+            "tree": tree,
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "elapsed_ms": round(elapsed_ms, 1),
+            "warnings": warnings,
+        })
+        if job and job["pid"] == os.getpid():
+            self.pid_path.unlink(missing_ok=True)
+
+    def collect(self, head_tree: Optional[str]) -> None:
+        """Print (once) the warnings of the last finished background job.
+
+        head_tree is the tree HEAD points at now; results for any other
+        staged tree belong to a commit that never happened and are dropped."""
+        try:
+            results = json.loads(self.results_path.read_text())
+        except (OSError, ValueError):
+            job = self._job()
+            if job and self._alive(job):
+                print("⏳ Deferred advisory checks from the previous run are still running")
+            elif self.pid_path.exists():
+                self.pid_path.unlink(missing_ok=True)
+                print(f"⚠️  Deferred advisory checks exited without results "
+                      f"(see {self.directory / 'deferred.log'})")
+            return
+        self.results_path.unlink(missing_ok=True)
+        job = self._job()
+        if job and not self._alive(job):
+            self.pid_path.unlink(missing_ok=True)
+        if results.get("tree") and results["tree"] != head_tree:
+            return
+        warnings = results.get("warnings") or []
+        print(f"📬 Deferred advisory checks for {results.get('target')} "
+              f"({results.get('elapsed_ms', 0):.0f} ms, finished {results.get('finished_at')}):")
+        for warning in warnings or ["✅ no advisory warnings"]:
+            print(f"  {warning}")
+        print()
+
+
+def _parse_records(blob: Optional[bytes]) -> Optional[list]:
+    if blob is None:
+        return None
+    return json.loads(blob)
+
+
+def _defined_ids(records: list) -> Set[str]:
+    return {r["id"] for r in records if isinstance(r, dict) and isinstance(r.get("id"), str)}
+
+
+def _referenced_ids(records: list) -> Set[str]:
+    refs = set()
+    for r in records:
+        if isinstance(r, dict):
+            for key in ("source_id", "target_id"):
+                if isinstance(r.get(key), str):
+                    refs.add(r[key])
+    return refs
+
+
 class GraphValidator:
-    def __init__(self, repo_root: Path):
+    def __init__(self, repo_root: Path, budget_ms: Optional[float] = None, advisory_only: bool = False):
         self.repo_root = repo_root
         self.graph_path = repo_root / "graph.json"
+        self.budget_ms = budget_ms
+        self.advisory_only = advisory_only
+        self._deferred: Optional[DeferredChecks] = None
         
         self.errors = []
         self.warnings = []
         
+    def deferred(self) -> DeferredChecks:
+        if self._deferred is None:
+            self._deferred = DeferredChecks(GitIndexReader(self.repo_root).git_dir() / "kg-validate")
+        return self._deferred
+
+    def run_advisory(self, mode: str, run, started: float, job_args) -> None:
+        """Run the advisory checks now, or hand them to a background job when
+        their last measured cost does not fit in what is left of --budget-ms.
+
+        job_args is called only when deferring and returns the job's CLI args
+        and the staged tree it checks (None for graph.json)."""
+        if self.budget_ms is not None and not self.advisory_only:
+            estimate = self.deferred().estimate(mode)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if estimate is None or elapsed_ms + estimate > self.budget_ms:
+                cost = "not yet measured" if estimate is None else f"~{estimate:.0f} ms"
+                print(f"  → Advisory checks ({cost}) exceed the {self.budget_ms:.0f} ms budget; "
+                      f"deferred to a background job, results print on the next run")
+                self.deferred().launch(Path(__file__).resolve(), self.repo_root, *job_args())
+                return
+        advisory_started = time.perf_counter()
+        run()
+        if self.budget_ms is not None or self.advisory_only:
+            self.deferred().record_cost(mode, (time.perf_counter() - advisory_started) * 1000)
+
+
     def load_graph(self) -> Dict:
         """Load the current graph"""
         if not self.graph_path.exists():
@@ -77,9 +449,10 @@ class GraphValidator:
         
         return True
     
-    def validate_relationships(self, graph: Dict) -> bool:
-        """Check relationship integrity"""
-        entity_ids = {e["id"] for e in graph["entities"]}
+    def validate_relationships(self, graph: Dict, entity_ids: Optional[Set[str]] = None) -> bool:
+        """Check relationship integrity (against entity_ids when given)"""
+        if entity_ids is None:
+            entity_ids = {e["id"] for e in graph["entities"]}
         dangling = []
         
         for rel in graph["relationships"]:
@@ -141,36 +514,65 @@ class GraphValidator:
         
         # Check within each type
         for etype, entity_list in by_type.items():
-            for i, e1 in enumerate(entity_list):
-                for e2 in entity_list[i+1:]:
-                    name1 = e1.get("name", "")
-                    name2 = e2.get("name", "")
-                    
-                    if not name1 or not name2:
-                        continue
-                    
-                    similarity = fuzz.ratio(name1.lower(), name2.lower()) / 100.0
-                    
-                    if similarity >= threshold:
-                        duplicates.append((
-                            e1.get("id"),
-                            e2.get("id"),
-                            name1,
-                            name2,
-                            similarity
-                        ))
+            names = [e.get("name", "") for e in entity_list]
+            for i, j, similarity in similar_pairs(names, threshold):
+                duplicates.append((
+                    entity_list[i].get("id"),
+                    entity_list[j].get("id"),
+                    names[i],
+                    names[j],
+                    similarity
+                ))
         
+        self._report_duplicates(duplicates, threshold)
+        return duplicates
+
+    def find_changed_duplicates(self, changed: List[Dict], existing: Dict[str, NameIndex],
+                                threshold: float = 0.85, removed_ids: Set[str] = frozenset()) -> List[Tuple]:
+        """Score only changed entities against their type's existing-name index
+
+        existing maps entity_type -> NameIndex of the names before this
+        change; entries in removed_ids are deleted by this change and
+        skipped. Changed entities are also compared with each other."""
+        duplicates = []
+        changed_ids = {e.get("id") for e in changed}
+        named = [e for e in changed if isinstance(e.get("name"), str) and e["name"]]
+
+        for n, e1 in enumerate(named):
+            name1 = e1["name"]
+            lowered = name1.lower()
+            index = existing.get(e1.get("entity_type"))
+            if index is not None:
+                for i in index.candidates(lowered, threshold):
+                    eid2, name2 = index.entries[i]
+                    if eid2 in changed_ids:
+                        continue  # compared below with its new name
+                    if eid2 in removed_ids:
+                        continue  # deleted in this change (e.g. replaced under a new id)
+                    similarity = ratio(lowered, index.lowered[i]) / 100.0
+                    if similarity >= threshold:
+                        duplicates.append((e1.get("id"), eid2, name1, name2, similarity))
+            for e2 in named[n + 1:]:
+                if e2.get("entity_type") != e1.get("entity_type"):
+                    continue
+                similarity = ratio(lowered, e2["name"].lower()) / 100.0
+                if similarity >= threshold:
+                    duplicates.append((e1.get("id"), e2.get("id"), name1, e2["name"], similarity))
+
+        self._report_duplicates(duplicates, threshold)
+        return duplicates
+
+    def _report_duplicates(self, duplicates: List[Tuple], threshold: float) -> None:
         if duplicates:
             self.warnings.append(f"Found {len(duplicates)} potential duplicates (≥{threshold*100}% similar):")
             for eid1, eid2, n1, n2, score in duplicates[:5]:
                 self.warnings.append(f"  - {eid1} '{n1}' ↔ {eid2} '{n2}' ({score:.0%})")
             if len(duplicates) > 5:
                 self.warnings.append(f"  ... and {len(duplicates) - 5} more")
-        
-        return duplicates
     
     def run_all_checks(self) -> bool:
         """Run full validation suite"""
+        started = time.perf_counter()
         print("🔍 Running graph validation...")
         
         try:
@@ -182,27 +584,183 @@ class GraphValidator:
         passed = True
         
         # Critical checks (must pass)
-        print("  → Validating schema...")
-        if not self.validate_schema(graph):
-            passed = False
-        
-        print("  → Validating required fields...")
-        if not self.validate_required_fields(graph):
-            passed = False
-        
-        print("  → Checking relationship integrity...")
-        if not self.validate_relationships(graph):
-            passed = False
-        
-        print("  → Validating provenance...")
-        self.check_provenance(graph)
+        if not self.advisory_only:
+            print("  → Validating schema...")
+            if not self.validate_schema(graph):
+                passed = False
+            
+            print("  → Validating required fields...")
+            if not self.validate_required_fields(graph):
+                passed = False
+            
+            print("  → Checking relationship integrity...")
+            if not self.validate_relationships(graph):
+                passed = False
         
         # Warning checks (informational)
-        print("  → Detecting duplicates...")
-        self.find_duplicates(graph, threshold=0.85)
+        def advisory():
+            print("  → Validating provenance...")
+            self.check_provenance(graph)
+            
+            print("  → Detecting duplicates...")
+            self.find_duplicates(graph, threshold=0.85)
         
+        if passed:
+            self.run_advisory("full", advisory, started, lambda: ([], None))
+        else:
+            # graph.json is already what it is: report its warnings with the errors
+            advisory()
         return passed
     
+    def run_staged_checks(self, tree: Optional[str] = None, base: str = "HEAD") -> bool:
+        """Validate only staged added/modified records, read from the git index
+        (or from a tree written from it, for deferred jobs)"""
+        started = time.perf_counter()
+        print("🔍 Running staged-changes validation...")
+
+        reader = GitIndexReader(self.repo_root, tree, base)
+        try:
+            return self._run_staged_checks(reader, started)
+        except subprocess.CalledProcessError as e:
+            self.errors.append(f"git failed: {' '.join(e.cmd)}: {e.stderr.decode().strip()}")
+            return False
+        finally:
+            reader.close()
+
+    def _run_staged_checks(self, reader: GitIndexReader, started: float) -> bool:
+        changes = reader.staged_changes()
+        if not changes:
+            print("  → No staged changes under entities/ or relationships/")
+            return True
+
+        index = reader.index_blobs()
+        staged: Dict[str, list] = {}          # changed path -> staged records
+        head_entities: Dict[str, Tuple[str, list]] = {}  # changed entity path -> (HEAD sha, records)
+        changed_entities: List[Dict] = []
+        changed_rels: List[Dict] = []
+        removed_entity_ids: Set[str] = set()
+        passed = True
+
+        print(f"  → Reading {len(changes)} staged file(s)...")
+        for status, path in changes:
+            kind = path.split("/", 1)[0]
+            try:
+                new = _parse_records(reader.read(reader.staged_spec(path))) if status != "D" else []
+                head = reader.read_object(f"{reader.base}:{path}")
+                old = _parse_records(head[1]) if head else []
+            except ValueError as e:
+                self.errors.append(f"{path}: not valid JSON ({e})")
+                passed = False
+                continue
+            if not isinstance(new, list):
+                self.errors.append(f"{path}: root must be a JSON array")
+                passed = False
+                continue
+            staged[path] = new
+
+            before = {record_key(r): r for r in old if isinstance(r, dict)}
+            changed = [r for r in new if not isinstance(r, dict) or before.get(record_key(r)) != r]
+            if kind == "entities":
+                if head:
+                    head_entities[path] = (head[0], old)
+                changed_entities.extend(changed)
+                removed_entity_ids |= _defined_ids(old) - _defined_ids(new)
+            else:
+                changed_rels.extend(changed)
+
+        if not passed:
+            return False
+
+        non_dict = [r for r in changed_entities + changed_rels if not isinstance(r, dict)]
+        if non_dict:
+            self.errors.append(f"{len(non_dict)} staged records are not JSON objects")
+            return False
+
+        if self.advisory_only:
+            self._run_staged_advisory(reader, changed_entities, removed_entity_ids, head_entities, staged,
+                                      index, started)
+            return passed
+
+        # Entity ids of the whole staged graph: changed files from their staged
+        # content, everything else from the per-blob cache
+        cache = BlobIdCache(reader.git_dir() / "kg-validate" / "blob-ids.json")
+
+        def blob_set(path: str, sha: str, extract) -> Set[str]:
+            if path in staged:
+                return extract(staged[path])
+            return cache.get(sha, lambda: extract(_parse_records(reader.read(sha)) or []))
+
+        entity_ids: Set[str] = set()
+        for path, sha in index.items():
+            if path.startswith("entities/"):
+                entity_ids |= blob_set(path, sha, _defined_ids)
+        removed_entity_ids -= entity_ids  # moved between type files, not removed
+
+        print(f"  → Validating {len(changed_entities)} changed entities...")
+        if changed_entities and not self.validate_required_fields({"entities": changed_entities}):
+            passed = False
+
+        print(f"  → Checking {len(changed_rels)} changed relationships...")
+        if changed_rels and not self.validate_relationships({"relationships": changed_rels}, entity_ids):
+            passed = False
+
+        if removed_entity_ids:
+            print(f"  → Checking references to {len(removed_entity_ids)} removed entities...")
+            orphaned = []
+            for path, sha in index.items():
+                if not path.startswith("relationships/"):
+                    continue
+                if not blob_set(path, sha, _referenced_ids) & removed_entity_ids:
+                    continue
+                records = staged.get(path) or _parse_records(reader.read(sha)) or []
+                orphaned.extend(
+                    r for r in records
+                    if r.get("source_id") in removed_entity_ids or r.get("target_id") in removed_entity_ids
+                )
+            if orphaned and not self.validate_relationships({"relationships": orphaned}, entity_ids):
+                passed = False
+
+        cache.save(set(index.values()))
+        if passed:
+            # a rejected commit gets no advisory run: the tree it would check is never committed
+            self._run_staged_advisory(reader, changed_entities, removed_entity_ids, head_entities, staged,
+                                      index, started)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"  → {len(changed_entities) + len(changed_rels)} changed records checked in {elapsed_ms:.0f} ms "
+              f"({cache.misses} uncached blobs read)")
+        return passed
+
+    def _run_staged_advisory(self, reader: GitIndexReader, changed_entities: List[Dict],
+                             removed_entity_ids: Set[str], head_entities: Dict[str, Tuple[str, list]],
+                             staged: Dict[str, list], index: Dict[str, str], started: float) -> None:
+        """Provenance and duplicate warnings for the changed entities"""
+        if not changed_entities:
+            return
+
+        def advisory():
+            print("  → Validating provenance...")
+            self.check_provenance({"entities": changed_entities})
+
+            print("  → Detecting duplicates of changed entities...")
+            names = NameIndexCache(reader.git_dir() / "kg-validate" / "names")
+            existing = {}
+            for path, (sha, old) in head_entities.items():
+                etype = Path(path).stem
+                existing[etype] = names.get(sha, lambda old=old: old)
+            self.find_changed_duplicates(changed_entities, existing, threshold=0.85,
+                                         removed_ids=removed_entity_ids)
+            # Staged type files become HEAD after this commit; index them now
+            for path, records in staged.items():
+                if path.startswith("entities/") and path in index:
+                    names.put(index[path], NameIndex.from_records(records))
+            names.prune(set(index.values()) | {sha for sha, _ in head_entities.values()})
+
+        def job_args() -> Tuple[List[str], str]:
+            base, tree = reader.snapshot()
+            return ["--staged", "--tree", tree, "--base", base], tree
+
+        self.run_advisory("staged", advisory, started, job_args)
+
     def print_results(self):
         """Print validation results"""
         if self.errors:
@@ -223,9 +781,36 @@ class GraphValidator:
 def main():
     """Main validation entry point"""
     repo_root = Path(__file__).parent.parent.parent
-    
-    validator = GraphValidator(repo_root)
-    passed = validator.run_all_checks()
+
+    parser = argparse.ArgumentParser(description="Pre-commit validation for hc-cdaio-kg")
+    parser.add_argument("--staged", action="store_true",
+                        help="Validate only staged added/modified records, read from the git index")
+    parser.add_argument("--budget-ms", type=float, metavar="MS",
+                        help="Run blocking checks inline; defer advisory checks (provenance, duplicates) "
+                             "to a background job when they would exceed this budget")
+    # Internal: the deferred background job
+    parser.add_argument("--advisory-only", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--tree", help=argparse.SUPPRESS)
+    parser.add_argument("--base", default="HEAD", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    validator = GraphValidator(repo_root, budget_ms=args.budget_ms, advisory_only=args.advisory_only)
+    startup_ms = (time.perf_counter() - _STARTED) * 1000
+    if args.advisory_only:
+        target = f"staged tree {args.tree[:10]}" if args.tree else "graph.json"
+        try:
+            validator.run_staged_checks(args.tree, args.base) if args.staged else validator.run_all_checks()
+        finally:
+            validator.deferred().finish(target, args.tree, validator.errors + validator.warnings,
+                                        (time.perf_counter() - _STARTED) * 1000)
+        sys.exit(0)
+
+    try:
+        validator.deferred().collect(GitIndexReader(repo_root).head_tree())
+    except (OSError, subprocess.CalledProcessError):
+        pass  # not a git checkout: nothing deferred to report
+    passed = validator.run_staged_checks() if args.staged else validator.run_all_checks()
+    print(f"  → startup {startup_ms:.0f} ms; similarity backend: {kg_similarity.backend() or 'not loaded'}")
     validator.print_results()
     
     if not passed:
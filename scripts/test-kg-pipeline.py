@@ -11,9 +11,12 @@ or accepts a raw graph.json to derive everything from.
 Exit code: 0 = all pass, 1 = one or more failures.
 """
 
+import contextlib
 import copy
+import io
 import json
 import shutil
+import subprocess
 import sys
 import tempfile
 import traceback
@@ -38,6 +41,8 @@ split_mod = _load("kg-split")
 build_mod = _load("kg-build")
 merge_mod = _load("kg-merge")
 
+from kg_financial_profile import encode_entities, expand_entities, is_sparse
+
 # ---------------------------------------------------------------------------
 # Tiny test harness
 # ---------------------------------------------------------------------------
@@ -72,7 +77,9 @@ def load_split_dir(d: Path) -> tuple[dict[str, dict], dict[tuple, dict]]:
     rels: dict[tuple, dict]   = {}
 
     for f in sorted((d / "entities").glob("*.json")):
-        for e in json.loads(f.read_text()):
+        data = json.loads(f.read_text())
+        expand_entities(data)
+        for e in data:
             entities[e["id"]] = e
 
     for f in sorted((d / "relationships").glob("*.json")):
@@ -91,6 +98,8 @@ def write_split_dir(entities: list[dict], rels: list[dict], d: Path):
         by_e[e["entity_type"]].append(e)
     (d / "entities").mkdir(parents=True, exist_ok=True)
     for t, lst in sorted(by_e.items()):
+        lst = copy.deepcopy(lst)
+        encode_entities(lst)
         (d / "entities" / f"{t}.json").write_text(json.dumps(lst, indent=2) + "\n")
 
     by_r: dict[str, list] = defaultdict(list)
@@ -174,6 +183,16 @@ def _run(tmp: Path, src_entities: list[dict], src_rels: list[dict]):
           len(r_files) == len(r_types),
           f"files={len(r_files)}, types={len(r_types)}")
 
+    # Universal-schema financial profiles are stored sparse on disk
+    dense_fp = [
+        e.get("id") for f in e_files for e in json.loads(f.read_text())
+        if isinstance(e, dict) and isinstance(e.get("financial_profile"), dict)
+        and "fiscal_years" in e["financial_profile"] and not is_sparse(e["financial_profile"])
+    ]
+    check("financial_profile blocks written in sparse form",
+          not dense_fp,
+          f"{len(dense_fp)} dense profiles: {dense_fp[:3]}" if dense_fp else "")
+
     # Run build
     try:
         build_mod.build(split_out, graph_out)
@@ -690,6 +709,224 @@ def _run(tmp: Path, src_entities: list[dict], src_rels: list[dict]):
         check("ADVERSARIAL: cross-ref relationship preserved in merge output",
               len(cx_rels) == 1)
 
+    section("ADVERSARIAL: malformed kg-tour fields — kg-build still exits 0")
+
+    # The tour snapshot is best effort; strings where it expects objects
+    # must neither crash it nor fail the build
+    tour_split = tmp / "tour_split"
+    tour_built = tmp / "tour_built.json"
+    tour_entities = [
+        {"id": "da-bad-001", "entity_type": "data_asset", "name": "List of strings",
+         "regulatory_applicability": ["GDPR"], "ai_training_usage": "yes"},
+        {"id": "da-bad-002", "entity_type": "data_asset", "name": "Bare string",
+         "regulatory_applicability": "HIPAA", "regulations": "SOX", "ai_training_usage": ["High"]},
+    ]
+    write_split_dir(tour_entities, [], tour_split)
+    tour_run = subprocess.run([sys.executable, str(LIB / "kg-build.py"), str(tour_split), str(tour_built)],
+                              capture_output=True, text=True)
+    check("ADVERSARIAL: kg-build exits 0 on malformed tour fields",
+          tour_run.returncode == 0, tour_run.stderr[-500:])
+    check("ADVERSARIAL: graph.json written despite malformed tour fields",
+          tour_built.exists() and len(json.loads(tour_built.read_text())["entities"]) == 2)
+    tour_insights = _load("kg_tour_insights")
+    from kg_index import GraphIndex
+    try:
+        tour_answers = tour_insights.compute_insights(GraphIndex(tour_entities, []))
+    except Exception as e:
+        tour_answers = None
+        check("ADVERSARIAL: tour insights computed over malformed fields", False, repr(e))
+    if tour_answers is not None:
+        check("ADVERSARIAL: tour insights computed over malformed fields",
+              tour_answers["data_landscape"]["regulated"] == 2
+              and tour_answers["regulatory_exposure"]["gdpr"] == 1
+              and tour_answers["regulatory_exposure"]["hipaa"] == 1,
+              json.dumps(tour_answers["regulatory_exposure"]))
+
+    section("KarMA --incremental: learned → declared completeness schema")
+
+    # A declared schema that omits types sends them to per-record scoring;
+    # rows cached under the learned schema must not be reused for them
+    spec = importlib.util.spec_from_file_location("karma_assessment",
+                                                  Path(__file__).parent / "karma_assessment.py")
+    karma_mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(karma_mod)
+
+    karma_graph = tmp / "karma.json"
+    karma_graph.write_text(json.dumps({"entities": src_entities, "relationships": src_rels}))
+    learned = karma_mod.CompletenessSchema.learn(src_entities)
+    first_type = next((e.get("entity_type") for e in src_entities if e.get("entity_type")), None)
+    declared = karma_mod.CompletenessSchema.declared(
+        {first_type: learned.to_dict().get(first_type, [])[:-1]} if first_type else {})
+    store = tmp / "karma_store.sqlite"
+
+    def karma_scores(name: str, schema=None, incremental: bool = False) -> bytes:
+        out = tmp / f"{name}.json"
+        with contextlib.redirect_stdout(io.StringIO()):
+            karma_mod.run_karma_assessment(str(karma_graph), out, schema, store if incremental else None)
+        return out.read_bytes()
+
+    full_declared = karma_scores("full_declared", declared)
+    full_learned = karma_scores("full_learned")
+    karma_scores("inc_learned", incremental=True)
+    check("KarMA: incremental run after a learned-schema run matches a full run (declared schema)",
+          karma_scores("inc_declared", declared, incremental=True) == full_declared)
+    check("KarMA: switching back to the learned schema matches a full run",
+          karma_scores("inc_relearned", incremental=True) == full_learned)
+
+    section("Financial rollup: diamond, allocation, cycle, duplicates, update()")
+
+    from kg_index import GraphIndex
+    from kg_financial_rollup import FinancialRollup
+
+    def fin(budget, allocation=None, fy="FY2024"):
+        block = {"budget": budget}
+        if allocation:
+            block["allocation_detail"] = allocation
+        return {"fiscal_years": {fy: block}}
+
+    def located_in(child, parent):
+        return {"source_id": child, "target_id": parent, "relationship_type": "located_in"}
+
+    roll_entities = [
+        {"id": "ou-root", "entity_type": "organizational_unit", "financial_profile": fin(4)},
+        {"id": "ou-a", "entity_type": "organizational_unit", "financial_profile": fin(1)},
+        {"id": "ou-b", "entity_type": "organizational_unit", "financial_profile": fin(2)},
+        # diamond: one department under both units, no allocation -> even split
+        {"id": "dept-shared", "entity_type": "department", "financial_profile": fin(100)},
+        # named allocation: 80% to ou-a, the rest to the other parent
+        {"id": "dept-alloc", "entity_type": "department",
+         "financial_profile": fin(10, {"parent_entity_id": "ou-a", "allocation_pct": 80})},
+        {"id": "sys-1", "entity_type": "system", "financial_profile": fin(20)},
+        # cycle: ou-c <-> ou-d
+        {"id": "ou-c", "entity_type": "organizational_unit", "financial_profile": fin(5)},
+        {"id": "ou-d", "entity_type": "organizational_unit", "financial_profile": fin(7)},
+    ]
+    roll_rels = [
+        located_in("ou-a", "ou-root"), located_in("ou-b", "ou-root"),
+        located_in("dept-shared", "ou-a"), located_in("dept-shared", "ou-b"),
+        located_in("dept-alloc", "ou-a"), located_in("dept-alloc", "ou-b"),
+        {"source_id": "sys-1", "target_id": "dept-shared", "relationship_type": "managed_by"},
+        located_in("ou-c", "ou-d"), located_in("ou-d", "ou-c"),
+    ]
+    rollup = FinancialRollup(GraphIndex(copy.deepcopy(roll_entities), roll_rels))
+
+    def rolled(r, eid, fy="FY2024"):
+        return r.value(eid, fy, "budget")
+
+    check("Rollup: shared child counted once at the common ancestor",
+          rolled(rollup, "ou-root") == 4 + 1 + 2 + 100 + 20 + 10,
+          f"ou-root rolled {rolled(rollup, 'ou-root')}")
+    check("Rollup: diamond child split evenly between its two parents",
+          rollup.breakdown("ou-b", "FY2024", "budget")["children"][0] ==
+          {"entity_id": "dept-shared", "weight": 0.5, "contribution": 60.0})
+    check("Rollup: allocation_pct weights the named parent, the rest goes to the other",
+          rolled(rollup, "ou-a") == 1 + 60 + 8 and rolled(rollup, "ou-b") == 2 + 60 + 2,
+          f"ou-a {rolled(rollup, 'ou-a')}, ou-b {rolled(rollup, 'ou-b')}")
+    check("Rollup: an edge closing a cycle is dropped and reported",
+          len(rollup.cycles) == 1 and set(rollup.cycles[0]) == {"ou-c", "ou-d"}
+          and {rolled(rollup, "ou-c"), rolled(rollup, "ou-d")} in ({12.0, 5.0}, {12.0, 7.0}),
+          f"cycles {rollup.cycles}")
+
+    dup_rollup = FinancialRollup(GraphIndex([
+        {"id": "ou-p", "entity_type": "organizational_unit", "financial_profile": None},
+        {"id": "dept-x", "entity_type": "department", "financial_profile": fin(1000)},
+        {"id": "dept-x", "entity_type": "department", "financial_profile": fin(9)},
+    ], [located_in("dept-x", "ou-p")]))
+    check("Rollup: a duplicated id resolves to its last record",
+          dup_rollup.duplicates == ["dept-x"] and rolled(dup_rollup, "ou-p") == 9
+          and rolled(dup_rollup, "dept-x") == 9)
+
+    def all_values(r):
+        return {(e["id"], fy, m): r.value(e["id"], fy, m)
+                for e in roll_entities for fy in r.fiscal_years() for m in r.metrics}
+
+    before = all_values(rollup)
+    edited = copy.deepcopy(roll_entities[5])
+    edited["financial_profile"] = fin(50)
+    edited["financial_profile"]["fiscal_years"]["FY2025"] = {"budget": 3}  # year first seen here
+    result = rollup.update([edited])
+    after = all_values(rollup)
+    ancestors = {"sys-1", "dept-shared", "ou-a", "ou-b", "ou-root"}
+    changed = {eid for (eid, fy, _), v in after.items() if fy == "FY2024" and before[eid, fy, _] != v}
+    check("Rollup update(): only the entity and its ancestors are recomputed",
+          result["recomputed"] == len(ancestors) and changed == ancestors,
+          f"recomputed {result['recomputed']}, changed {sorted(changed)}")
+    fresh_entities = [edited if e["id"] == "sys-1" else e for e in roll_entities]
+    fresh = FinancialRollup(GraphIndex(copy.deepcopy(fresh_entities), roll_rels))
+    check("Rollup update(): totals match a fresh FinancialRollup, including a new fiscal year",
+          rollup.fiscal_years() == fresh.fiscal_years() == ["FY2024", "FY2025"]
+          and after == all_values(fresh) and rolled(rollup, "ou-root", "FY2025") == 3)
+
+    section("Financial facts: incremental refresh vs full rebuild")
+
+    import os
+    from kg_financial_facts import FinancialFactStore
+
+    facts_dir = tmp / "facts"
+    (facts_dir / "entities").mkdir(parents=True)
+
+    def write_type(name, records):
+        (facts_dir / "entities" / f"{name}.json").write_text(json.dumps(records, indent=2) + "\n")
+
+    def fact_entity(eid, etype, budget, headcount=None):
+        block = {"budget": budget, "confidence_tier": "T1"}
+        if headcount is not None:
+            block["fte_count"] = headcount
+        return {"id": eid, "entity_type": etype, "financial_profile": {"fiscal_years": {"FY2024": block}}}
+
+    def last_wins():
+        """Brute force: every record in file order then record order, later ids replace earlier."""
+        latest = {}
+        for f in sorted((facts_dir / "entities").glob("*.json")):
+            for e in json.loads(f.read_text()):
+                latest[e["id"]] = e
+        return latest
+
+    incremental = FinancialFactStore(tmp / "facts_incremental.sqlite")
+
+    def matches_rebuild(step: str, result: dict, **expected):
+        rebuild_path = tmp / f"facts_rebuild_{step}.sqlite"
+        rebuilt = FinancialFactStore(rebuild_path)
+        rebuilt.refresh(facts_dir)
+        latest = last_wins()
+        same_totals = all(
+            incremental.totals(m, by=by) == rebuilt.totals(m, by=by)
+            for m in ("budget", "fte_count") for by in ("entity_type", "entity_id"))
+        same_values = all(
+            incremental.value(eid, "FY2024", m) == rebuilt.value(eid, "FY2024", m)
+            == e["financial_profile"]["fiscal_years"]["FY2024"].get(m)
+            for eid, e in latest.items() for m in ("budget", "fte_count"))
+        rebuilt.close()
+        check(f"Facts ({step}): totals() and value() match a full rebuild and last-wins",
+              same_totals and same_values)
+        for key, value in expected.items():
+            check(f"Facts ({step}): {key} == {value}", result[key] == value, f"got {result[key]!r}")
+
+    write_type("department", [fact_entity("d-1", "department", 10, 2), fact_entity("dup-x", "department", 100)])
+    write_type("organizational_unit", [fact_entity("dup-x", "organizational_unit", 7),
+                                       fact_entity("ou-1", "organizational_unit", 3)])
+    matches_rebuild("initial", incremental.refresh(facts_dir), duplicates=["dup-x"])
+
+    write_type("department", [fact_entity("d-1", "department", 15, 4), fact_entity("dup-x", "department", 100)])
+    matches_rebuild("edit", incremental.refresh(facts_dir), refreshed=["department.json"])
+
+    ou_file = facts_dir / "entities" / "organizational_unit.json"
+    st = ou_file.stat()
+    os.utime(ou_file, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    matches_rebuild("touch", incremental.refresh(facts_dir), refreshed=[], touched=1)
+
+    ou_file.unlink()
+    matches_rebuild("remove", incremental.refresh(facts_dir), removed=["organizational_unit.json"],
+                    duplicates=[])
+    check("Facts (remove): an id shadowed by a removed file counts again",
+          incremental.value("dup-x", "FY2024", "budget") == 100)
+
+    write_type("organizational_unit", [fact_entity("dup-x", "organizational_unit", 8)])
+    matches_rebuild("re-add", incremental.refresh(facts_dir), duplicates=["dup-x"])
+    check("Facts (re-add): the later file's duplicate shadows the earlier one again",
+          incremental.value("dup-x", "FY2024", "budget") == 8)
+    incremental.close()
+
     # -----------------------------------------------------------------------
     # Summary
     # -----------------------------------------------------------------------
@@ -7,10 +7,24 @@ Checks:
 3. Non-financial entity types have NO financial_profile
 4. Schema structure is identical across all financial entities
 5. Entity and relationship counts are intact
+
+Reads graph.json, or a data directory's per-type files. Sparse on-disk
+profiles (see scripts/lib/kg_financial_profile.py) are checked as stored,
+without expanding them: omitted keys are template defaults, which never fail.
+
+Usage:
+    python3 scripts/validate_financial_profiles.py [graph.json | data-dir]
 """
+import argparse
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from kg_financial_profile import (
+    FISCAL_YEAR_TEMPLATE, PROFILE_TEMPLATE, is_sparse, sparse_keys, sparse_values,
+)
+
 GRAPH_PATH = Path("/Users/thomasjones/hc-cdaio-kg/graph.json")
 
 FINANCIAL_ENTITY_TYPES = {
@@ -69,14 +83,32 @@ EXPECTED_FY_KEYS = {
 
 EXPECTED_FY_LIST = {"FY2024", "FY2023"}
 
+SUB_OBJECTS = ("balance_sheet", "contract_detail", "unit_economics",
+               "allocation_detail", "cost_of_revenue_detail", "compliance_costs")
 
-def main():
-    print(f"Loading graph from {GRAPH_PATH}")
-    with open(GRAPH_PATH) as f:
+
+def load_source(source: Path) -> tuple[list, list]:
+    """(entities, relationships) from graph.json or entities/ + relationships/ as stored."""
+    if source.is_dir():
+        entities, relationships = [], []
+        for f in sorted((source / "entities").glob("*.json")):
+            entities.extend(json.loads(f.read_text()))
+        for f in sorted((source / "relationships").glob("*.json")):
+            relationships.extend(json.loads(f.read_text()))
+        return entities, relationships
+    with open(source) as f:
         graph = json.load(f)
+    return graph.get("entities", []), graph.get("relationships", [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the financial_profile cleanup")
+    parser.add_argument("source", nargs="?", type=Path, default=GRAPH_PATH,
+                        help=f"graph.json or a data directory with entities/ (default: {GRAPH_PATH})")
+    args = parser.parse_args()
 
-    entities = graph.get("entities", [])
-    relationships = graph.get("relationships", [])
+    print(f"Loading graph from {args.source}")
+    entities, relationships = load_source(args.source)
     print(f"Total entities: {len(entities)}")
     print(f"Total relationships: {len(relationships)}")
 
@@ -122,7 +154,8 @@ def main():
             continue
 
         # CHECK 4: Top-level FP keys
-        fp_keys = set(fp.keys())
+        sparse = is_sparse(fp)
+        fp_keys = sparse_keys(fp, PROFILE_TEMPLATE) if sparse else set(fp.keys())
         missing_top = EXPECTED_FP_TOP_KEYS - fp_keys
         extra_top = fp_keys - EXPECTED_FP_TOP_KEYS
         if missing_top:
@@ -148,7 +181,7 @@ def main():
                 errors.append(f"FY DATA: {eid}.{fy_name} is not a dict")
                 valid = False
                 continue
-            fy_data_keys = set(fy_data.keys())
+            fy_data_keys = sparse_keys(fy_data, FISCAL_YEAR_TEMPLATE) if sparse else set(fy_data.keys())
             missing_fy = EXPECTED_FY_KEYS - fy_data_keys
             extra_fy = fy_data_keys - EXPECTED_FY_KEYS
             if missing_fy:
@@ -158,26 +191,28 @@ def main():
                 errors.append(f"FY FIELDS: {eid}.{fy_name} extra: {extra_fy}")
                 valid = False
 
-            # CHECK 7: All values are null (clean slate)
-            for key in EXPECTED_FY_KEYS:
-                if key in fy_data:
-                    val = fy_data[key]
-                    if key == "confidence_tier" and val == "T4":
-                        continue
-                    if key == "confidence_rationale" and val == "":
-                        continue
-                    if key == "allocation_method" and val == "":
-                        continue
-                    if key in ("balance_sheet", "contract_detail",
-                               "unit_economics", "allocation_detail",
-                               "cost_of_revenue_detail", "compliance_costs"):
-                        if isinstance(val, dict):
-                            non_null = {k: v for k, v in val.items() if v is not None}
-                            if non_null:
-                                warnings.append(f"NON-NULL: {eid}.{fy_name}.{key} has values: {non_null}")
-                        continue
-                    if val is not None:
-                        warnings.append(f"NON-NULL: {eid}.{fy_name}.{key} = {val}")
+            # CHECK 7: All values are null (clean slate). Sparse entries only
+            # store values that differ from the template, so only those are read
+            if sparse:
+                fy_items = [(k, v) for k, v in sparse_values(fy_data) if k in EXPECTED_FY_KEYS]
+            else:
+                fy_items = [(k, fy_data[k]) for k in EXPECTED_FY_KEYS if k in fy_data]
+            for key, val in fy_items:
+                if key == "confidence_tier" and val == "T4":
+                    continue
+                if key == "confidence_rationale" and val == "":
+                    continue
+                if key == "allocation_method" and val == "":
+                    continue
+                if key in SUB_OBJECTS:
+                    if isinstance(val, dict):
+                        items = sparse_values(val) if sparse else val.items()
+                        non_null = {k: v for k, v in items if v is not None}
+                        if non_null:
+                            warnings.append(f"NON-NULL: {eid}.{fy_name}.{key} has values: {non_null}")
+                    continue
+                if val is not None:
+                    warnings.append(f"NON-NULL: {eid}.{fy_name}.{key} = {val}")
 
         if valid:
             stats["fp_schema_valid"] += 1